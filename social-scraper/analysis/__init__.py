@@ -3,12 +3,14 @@ NJ Influencer Analysis Module
 Parsers and tools for analyzing scraped social media data
 """
 
+from .post import Post
 from .tiktok_parser import parse_all_tiktok, get_tiktok_stats
 from .youtube_parser import parse_all_youtube, get_youtube_stats
 from .instagram_parser import parse_all_instagram, get_instagram_stats
 from .consolidate import consolidate_all_posts, calculate_influencer_metrics
 
 __all__ = [
+    'Post',
     'parse_all_tiktok',
     'parse_all_youtube',
     'parse_all_instagram',
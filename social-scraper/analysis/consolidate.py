@@ -6,100 +6,278 @@ Combines data from all platforms into unified CSV datasets
 import json
 import csv
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, Union
 from datetime import datetime
 
-from tiktok_parser import parse_all_tiktok, get_tiktok_stats
-from youtube_parser import parse_all_youtube, get_youtube_stats
-from instagram_parser import parse_all_instagram, get_instagram_stats
-
-
-def consolidate_all_posts(output_dir: str) -> List[Dict[str, Any]]:
-    """Consolidate all posts from all platforms into unified format"""
+import numpy as np
+import pandas as pd
+
+from tiktok_parser import parse_tiktok_files, get_tiktok_stats
+from youtube_parser import parse_youtube_files, get_youtube_stats
+from instagram_parser import parse_instagram_files, get_instagram_stats, is_post_json
+from manifest import Manifest
+from corpus import CORPUS_DIR, corpus_available, write_corpus
+from corpus_db import DB_NAME, build_corpus_db, corpus_db_current
+from post import Post, post_columns
+
+# Platform directory -> (display name, per-file parser); also the output order
+PLATFORM_PARSERS = {
+    'tiktok': ('TikTok', parse_tiktok_files),
+    'youtube': ('YouTube', parse_youtube_files),
+    'instagram': ('Instagram', parse_instagram_files),
+}
+
+# Files per pool task; big channels are split so one can't hold up the pool
+CHUNK_SIZE = 500
+
+
+def is_post_file(platform: str, filename: str) -> bool:
+    """Whether a file in a platform directory is a post's metadata JSON"""
+    if platform == 'instagram':
+        return is_post_json(filename)
+    return filename.endswith('.info.json')
+
+
+def scan_output(output_dir: str) -> List[Tuple[str, str, str, List[str]]]:
+    """
+    Walk the output directory once and list every post JSON file.
+
+    Returns (platform, platform_dir, influencer_name, filenames) tasks of at
+    most CHUNK_SIZE files, ordered by platform, then influencer.
+    """
+    found = {platform: [] for platform in PLATFORM_PARSERS}
+
+    with os.scandir(output_dir) as influencers:
+        for influencer in sorted(influencers, key=lambda e: e.name):
+            if not influencer.is_dir() or influencer.name.startswith('.'):
+                continue
+            for platform in PLATFORM_PARSERS:
+                platform_dir = os.path.join(influencer.path, platform)
+                if not os.path.isdir(platform_dir):
+                    continue
+                with os.scandir(platform_dir) as entries:
+                    filenames = sorted(e.name for e in entries if is_post_file(platform, e.name))
+                for start in range(0, len(filenames), CHUNK_SIZE):
+                    found[platform].append(
+                        (platform, platform_dir, influencer.name, filenames[start:start + CHUNK_SIZE])
+                    )
+
+    return [task for platform in PLATFORM_PARSERS for task in found[platform]]
+
+
+def _parse_task(task: Tuple[str, str, str, List[str]]) -> Tuple[List[Post], List[str]]:
+    """Pool worker: parse one chunk of a platform directory"""
+    platform, platform_dir, influencer_name, filenames = task
+    return PLATFORM_PARSERS[platform][1](platform_dir, filenames, influencer_name)
+
+
+def consolidate_all_posts(output_dir: str, workers: int = None, manifest: Manifest = None) -> List[Post]:
+    """
+    Consolidate all posts from all platforms into unified format.
+
+    The output tree is walked once and its JSON files are parsed on a pool
+    of `workers` processes (all cores by default; 1 parses in this process).
+    Files that fail to parse are reported and skipped. With a manifest, only
+    files that are new or changed since it was saved are parsed; the rest
+    come from the manifest, which is updated (but not saved) in place.
+    """
+    scanned = scan_output(output_dir)
+    tasks = manifest.plan(scanned) if manifest is not None else scanned
+    total_files = sum(len(task[3]) for task in scanned)
+    parse_files = sum(len(task[3]) for task in tasks)
+    workers = workers or os.cpu_count() or 1
+    if manifest is not None:
+        print(f"Found {total_files} files in {output_dir}; {total_files - parse_files} unchanged since the last run")
+    print(f"Parsing {parse_files} files with {workers} worker(s)...")
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_task, tasks, chunksize=4))
+    else:
+        results = [_parse_task(task) for task in tasks]
+
+    # Report per influencer and platform, merging chunks of the same directory
     all_posts = []
-
-    # Parse each platform
-    print("Parsing TikTok data...")
-    tiktok_posts = parse_all_tiktok(output_dir)
-    all_posts.extend(tiktok_posts)
-
-    print("\nParsing YouTube data...")
-    youtube_posts = parse_all_youtube(output_dir)
-    all_posts.extend(youtube_posts)
-
-    print("\nParsing Instagram data...")
-    instagram_posts = parse_all_instagram(output_dir)
-    all_posts.extend(instagram_posts)
-
+    errors = []
+    counts = {}
+    for (platform, platform_dir, influencer_name, filenames), (posts, task_errors) in zip(tasks, results):
+        all_posts.extend(posts)
+        errors.extend(task_errors)
+        key = (platform, influencer_name)
+        counts[key] = counts.get(key, 0) + len(posts)
+        if manifest is not None:
+            manifest.record(platform_dir, filenames, influencer_name, posts)
+
+    for (platform, influencer_name), count in counts.items():
+        if count:
+            print(f"Parsed {count} {PLATFORM_PARSERS[platform][0]} posts for {influencer_name}")
+    for error in errors:
+        print(error)
+    if errors:
+        print(f"\n{len(errors)} file(s) could not be parsed")
+
+    if manifest is not None:
+        return manifest.posts(scanned)
     return all_posts
 
 
-def calculate_influencer_metrics(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Calculate aggregate metrics per influencer across all platforms"""
-    from collections import defaultdict
-
-    # Group posts by influencer
-    influencer_posts = defaultdict(list)
+# Per-post count columns summed into influencer metrics
+COUNT_COLUMNS = ['view_count', 'like_count', 'comment_count', 'repost_count', 'video_view_count']
+
+# Per-platform metric name -> the count column it sums
+PLATFORM_TOTALS = {
+    'tiktok': {'views': 'view_count', 'likes': 'like_count', 'comments': 'comment_count', 'reposts': 'repost_count'},
+    'youtube': {'views': 'view_count', 'likes': 'like_count', 'comments': 'comment_count'},
+    'instagram': {'likes': 'like_count', 'comments': 'comment_count', 'video_views': 'video_view_count'},
+}
+
+
+def posts_frame(posts: Union[List[Post], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Columnar table of the fields influencer metrics are built from.
+
+    Takes parsed posts, or a table of them such as load_posts returns (or
+    this function's own output). Missing counts become 0, and each post
+    gets `views` (view_count, or video_view_count on Instagram) and
+    `engagement` (likes + comments, plus reposts on TikTok) as the totals
+    count them.
+    """
+    if isinstance(posts, pd.DataFrame):
+        df = posts.reindex(columns=['influencer_name', 'platform', 'upload_date'] + COUNT_COLUMNS)
+        for column in COUNT_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
+    else:
+        # Column by column straight into arrays; going through a frame of
+        # dicts first costs more than the aggregation itself. Counts another
+        # platform doesn't have are None.
+        df = pd.DataFrame(post_columns(posts, ['influencer_name', 'platform', 'upload_date']))
+        for column, values in post_columns(posts, COUNT_COLUMNS).items():
+            df[column] = np.fromiter((v or 0 for v in values), dtype='int64', count=len(values))
+
+    # Counts of posts from other platforms are not part of any total
+    platform = df['platform']
+    known = platform.isin(list(PLATFORM_PARSERS))
+    df['views'] = (df['view_count'].where(platform.isin(['tiktok', 'youtube']), 0)
+                   + df['video_view_count'].where(platform == 'instagram', 0))
+    df['engagement'] = (df['like_count'].where(known, 0) + df['comment_count'].where(known, 0)
+                        + df['repost_count'].where(platform == 'tiktok', 0))
+    return df
+
+
+def platform_sums(posts: List[Post]) -> pd.DataFrame:
+    """
+    Summed counts and number of posts per (influencer_name, platform), in
+    first-seen order: the grouped sum of a posts_frame table, accumulated in
+    one pass over the posts. Missing (None) counts add nothing.
+    """
+    totals = {}
     for post in posts:
-        influencer_posts[post['influencer_name']].append(post)
-
-    metrics = []
-    for name, inf_posts in influencer_posts.items():
-        # Split by platform
-        tiktok = [p for p in inf_posts if p['platform'] == 'tiktok']
-        youtube = [p for p in inf_posts if p['platform'] == 'youtube']
-        instagram = [p for p in inf_posts if p['platform'] == 'instagram']
-
-        # TikTok metrics
-        tiktok_views = sum(p.get('view_count', 0) or 0 for p in tiktok)
-        tiktok_likes = sum(p.get('like_count', 0) or 0 for p in tiktok)
-        tiktok_comments = sum(p.get('comment_count', 0) or 0 for p in tiktok)
-        tiktok_reposts = sum(p.get('repost_count', 0) or 0 for p in tiktok)
-
-        # YouTube metrics
-        youtube_views = sum(p.get('view_count', 0) or 0 for p in youtube)
-        youtube_likes = sum(p.get('like_count', 0) or 0 for p in youtube)
-        youtube_comments = sum(p.get('comment_count', 0) or 0 for p in youtube)
-
-        # Instagram metrics
-        instagram_likes = sum(p.get('like_count', 0) or 0 for p in instagram)
-        instagram_comments = sum(p.get('comment_count', 0) or 0 for p in instagram)
-        instagram_video_views = sum(p.get('video_view_count', 0) or 0 for p in instagram)
-
-        # Combined metrics
-        total_views = tiktok_views + youtube_views + instagram_video_views
-        total_likes = tiktok_likes + youtube_likes + instagram_likes
-        total_comments = tiktok_comments + youtube_comments + instagram_comments
-        total_engagement = total_likes + total_comments + tiktok_reposts
-
-        metrics.append({
-            'influencer_name': name,
-            'total_posts': len(inf_posts),
-            'tiktok_posts': len(tiktok),
-            'youtube_posts': len(youtube),
-            'instagram_posts': len(instagram),
-            'total_views': total_views,
-            'total_likes': total_likes,
-            'total_comments': total_comments,
-            'total_engagement': total_engagement,
-            'tiktok_views': tiktok_views,
-            'tiktok_likes': tiktok_likes,
-            'tiktok_comments': tiktok_comments,
-            'tiktok_reposts': tiktok_reposts,
-            'youtube_views': youtube_views,
-            'youtube_likes': youtube_likes,
-            'youtube_comments': youtube_comments,
-            'instagram_likes': instagram_likes,
-            'instagram_comments': instagram_comments,
-            'instagram_video_views': instagram_video_views,
-            'avg_engagement_per_post': total_engagement / len(inf_posts) if inf_posts else 0,
-            'engagement_rate': total_engagement / total_views if total_views else 0
-        })
-
-    # Sort by total engagement
-    metrics.sort(key=lambda x: x['total_engagement'], reverse=True)
-    return metrics
+        key = (post.influencer_name, post.platform)
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = [0, 0, 0, 0, 0, 0]
+        # Same order as COUNT_COLUMNS, then posts
+        row[0] += post.view_count or 0
+        row[1] += post.like_count or 0
+        row[2] += post.comment_count or 0
+        row[3] += post.repost_count or 0
+        row[4] += post.video_view_count or 0
+        row[5] += 1
+
+    index = pd.MultiIndex.from_tuples(list(totals), names=['influencer_name', 'platform'])
+    return pd.DataFrame(list(totals.values()), index=index, columns=COUNT_COLUMNS + ['posts'])
+
+
+def calculate_influencer_metrics(posts: Union[List[Post], pd.DataFrame],
+                                 extra_metrics: bool = False) -> List[Dict[str, Any]]:
+    """
+    Calculate aggregate metrics per influencer across all platforms.
+
+    One sum over (influencer, platform) gives every platform total; the
+    combined totals and rates are derived from those columns. With
+    extra_metrics, per-post median and 90th percentile views and engagement
+    are added from one more grouped aggregation. Pass a posts_frame table to
+    share it with calculate_monthly_metrics.
+
+    Parsed posts are summed in one pass without building a table
+    (platform_sums), unless extra_metrics needs the per-post table anyway;
+    copying every post into columns costs more than the sums themselves.
+    """
+    if len(posts) == 0:
+        return []
+
+    if isinstance(posts, pd.DataFrame) or extra_metrics:
+        df = posts_frame(posts)
+        influencers = pd.unique(df['influencer_name'])
+        grouped = df.groupby(['influencer_name', 'platform'], sort=False)
+        sums = grouped[COUNT_COLUMNS].sum()
+        sums['posts'] = grouped.size()
+    else:
+        sums = platform_sums(posts)
+        influencers = pd.unique(sums.index.get_level_values('influencer_name'))
+
+    by_platform = sums.unstack('platform', fill_value=0).reindex(influencers)
+
+    def platform_total(column: str, platform: str) -> pd.Series:
+        if (column, platform) in by_platform.columns:
+            return by_platform[(column, platform)]
+        return pd.Series(0, index=by_platform.index)
+
+    m = pd.DataFrame(index=by_platform.index)
+    m['total_posts'] = by_platform['posts'].sum(axis=1)
+    for platform in PLATFORM_PARSERS:
+        m[f'{platform}_posts'] = platform_total('posts', platform)
+
+    for platform, totals in PLATFORM_TOTALS.items():
+        for name, column in totals.items():
+            m[f'{platform}_{name}'] = platform_total(column, platform)
+
+    m['total_views'] = m['tiktok_views'] + m['youtube_views'] + m['instagram_video_views']
+    m['total_likes'] = m['tiktok_likes'] + m['youtube_likes'] + m['instagram_likes']
+    m['total_comments'] = m['tiktok_comments'] + m['youtube_comments'] + m['instagram_comments']
+    m['total_engagement'] = m['total_likes'] + m['total_comments'] + m['tiktok_reposts']
+    m['avg_engagement_per_post'] = m['total_engagement'] / m['total_posts']
+    m['engagement_rate'] = (m['total_engagement'] / m['total_views'].where(m['total_views'] > 0)).fillna(0)
+
+    if extra_metrics:
+        per_post = df.groupby('influencer_name', sort=False)[['views', 'engagement']]
+        medians = per_post.median()
+        p90 = per_post.quantile(0.9)
+        m['median_views'] = medians['views']
+        m['median_engagement'] = medians['engagement']
+        m['p90_views'] = p90['views']
+        m['p90_engagement'] = p90['engagement']
+
+    columns = ['total_posts', 'tiktok_posts', 'youtube_posts', 'instagram_posts', 'total_views',
+               'total_likes', 'total_comments', 'total_engagement', 'tiktok_views', 'tiktok_likes',
+               'tiktok_comments', 'tiktok_reposts', 'youtube_views', 'youtube_likes', 'youtube_comments',
+               'instagram_likes', 'instagram_comments', 'instagram_video_views',
+               'avg_engagement_per_post', 'engagement_rate']
+    if extra_metrics:
+        columns += ['median_views', 'median_engagement', 'p90_views', 'p90_engagement']
+
+    # Sort by total engagement (stable, so ties keep first-seen order)
+    m = m[columns].sort_values('total_engagement', ascending=False, kind='stable')
+    m.index.name = 'influencer_name'
+    return m.reset_index().to_dict('records')
+
+
+def calculate_monthly_metrics(posts: Union[List[Post], pd.DataFrame]) -> List[Dict[str, Any]]:
+    """Posts, views and engagement per influencer, platform and upload month"""
+    if len(posts) == 0:
+        return []
+
+    df = posts_frame(posts)
+    # Months are formatted after grouping; strftime on every post is slow
+    df['month'] = pd.to_datetime(df['upload_date'], errors='coerce', format='ISO8601').dt.to_period('M')
+    monthly = (df[df['month'].notna()]
+               .groupby(['influencer_name', 'platform', 'month'])
+               .agg(posts=('views', 'size'), views=('views', 'sum'), engagement=('engagement', 'sum'))
+               .reset_index())
+    monthly['month'] = monthly['month'].astype(str)
+    return monthly.to_dict('records')
 
 
 def export_to_csv(data: List[Dict[str, Any]], filepath: str):
@@ -128,7 +306,12 @@ def export_to_json(data: Any, filepath: str):
     print(f"Exported to {filepath}")
 
 
-def main(output_dir: str = None):
+# Derived tables written by main(); all are rebuilt when any input changed
+OUTPUT_FILES = ('all_posts.csv', 'influencer_metrics.csv', 'tiktok_posts.csv',
+                'youtube_posts.csv', 'instagram_posts.csv', 'summary.json', DB_NAME)
+
+
+def main(output_dir: str = None, workers: int = None, full: bool = False, extra_metrics: bool = False):
     """Main consolidation workflow"""
     import argparse
 
@@ -137,8 +320,17 @@ def main(output_dir: str = None):
         parser.add_argument("--output-dir", "-o",
                             default="../output",
                             help="Path to scraped output directory")
+        parser.add_argument("--workers", "-w", type=int, default=None,
+                            help="Parser processes (default: all cores)")
+        parser.add_argument("--full", action="store_true",
+                            help="Ignore the manifest and reparse every file")
+        parser.add_argument("--extra-metrics", action="store_true",
+                            help="Add median/p90 influencer metrics and a per-month breakdown")
         args = parser.parse_args()
         output_dir = args.output_dir
+        workers = args.workers
+        full = args.full
+        extra_metrics = args.extra_metrics
 
     analysis_output = Path(__file__).parent / 'data'
     analysis_output.mkdir(exist_ok=True)
@@ -148,7 +340,13 @@ def main(output_dir: str = None):
     print("CONSOLIDATING ALL PLATFORM DATA")
     print("=" * 60)
 
-    all_posts = consolidate_all_posts(output_dir)
+    # The manifest keeps the rows parsed from each file, so only new or
+    # changed files are parsed again
+    manifest = Manifest(str(analysis_output / 'manifest.json'), output_dir)
+    if full:
+        manifest.files = {}
+
+    all_posts = consolidate_all_posts(output_dir, workers=workers, manifest=manifest)
     print(f"\nTotal posts consolidated: {len(all_posts)}")
 
     # Calculate per-influencer metrics
@@ -156,12 +354,15 @@ def main(output_dir: str = None):
     print("CALCULATING INFLUENCER METRICS")
     print("=" * 60)
 
-    influencer_metrics = calculate_influencer_metrics(all_posts)
+    # The per-post table is only needed for the extra metrics
+    post_table = posts_frame(all_posts) if extra_metrics else all_posts
+    influencer_metrics = calculate_influencer_metrics(post_table, extra_metrics=extra_metrics)
+    monthly_metrics = calculate_monthly_metrics(post_table) if extra_metrics else []
 
     # Get platform-specific stats
-    tiktok_posts = [p for p in all_posts if p['platform'] == 'tiktok']
-    youtube_posts = [p for p in all_posts if p['platform'] == 'youtube']
-    instagram_posts = [p for p in all_posts if p['platform'] == 'instagram']
+    tiktok_posts = [p for p in all_posts if p.platform == 'tiktok']
+    youtube_posts = [p for p in all_posts if p.platform == 'youtube']
+    instagram_posts = [p for p in all_posts if p.platform == 'instagram']
 
     tiktok_stats = get_tiktok_stats(tiktok_posts)
     youtube_stats = get_youtube_stats(youtube_posts)
@@ -191,21 +392,45 @@ def main(output_dir: str = None):
         print(f"{i}. {inf['influencer_name']}")
         print(f"   Posts: {inf['total_posts']} | Engagement: {inf['total_engagement']:,}")
 
+    expected = OUTPUT_FILES + ((CORPUS_DIR,) if corpus_available() else ())
+    if extra_metrics:
+        expected += ('influencer_monthly.csv',)
+    outputs_exist = all((analysis_output / name).exists() for name in expected)
+    results_dir = str(Path(__file__).parent)
+    if not manifest.changed and outputs_exist:
+        if manifest.dirty:
+            manifest.save()
+        # AI and video results, and snapshots, change without any post changing
+        if not corpus_db_current(str(analysis_output), output_dir, results_dir):
+            print("\nNo new, changed or removed posts; rebuilding the database for changed results")
+            build_corpus_db(all_posts, str(analysis_output), output_dir, results_dir)
+        else:
+            print("\nNo new, changed or removed files; exported data is up to date")
+        return all_posts, influencer_metrics
+
     # Export data
     print("\n" + "=" * 60)
     print("EXPORTING DATA")
     print("=" * 60)
 
+    # Typed Parquet corpus the analyzers load (needs pyarrow)
+    write_corpus(all_posts, str(analysis_output))
+
+    # SQLite database of posts, snapshots, AI results, transcripts and OCR
+    build_corpus_db(all_posts, str(analysis_output), output_dir, results_dir)
+
     # All posts CSV
-    export_to_csv(all_posts, str(analysis_output / 'all_posts.csv'))
+    export_to_csv([p.to_dict() for p in all_posts], str(analysis_output / 'all_posts.csv'))
 
     # Influencer metrics CSV
     export_to_csv(influencer_metrics, str(analysis_output / 'influencer_metrics.csv'))
+    if extra_metrics:
+        export_to_csv(monthly_metrics, str(analysis_output / 'influencer_monthly.csv'))
 
     # Platform-specific CSVs
-    export_to_csv(tiktok_posts, str(analysis_output / 'tiktok_posts.csv'))
-    export_to_csv(youtube_posts, str(analysis_output / 'youtube_posts.csv'))
-    export_to_csv(instagram_posts, str(analysis_output / 'instagram_posts.csv'))
+    export_to_csv([p.to_dict() for p in tiktok_posts], str(analysis_output / 'tiktok_posts.csv'))
+    export_to_csv([p.to_dict() for p in youtube_posts], str(analysis_output / 'youtube_posts.csv'))
+    export_to_csv([p.to_dict() for p in instagram_posts], str(analysis_output / 'instagram_posts.csv'))
 
     # Summary JSON
     summary = {
@@ -222,6 +447,9 @@ def main(output_dir: str = None):
     }
     export_to_json(summary, str(analysis_output / 'summary.json'))
 
+    # Saved last, so an interrupted export is redone on the next run
+    manifest.save()
+
     print("\nConsolidation complete!")
     return all_posts, influencer_metrics
 
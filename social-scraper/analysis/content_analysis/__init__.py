@@ -4,6 +4,7 @@
 from .semantic_analyzer import SemanticAnalyzer
 from .topic_modeler import TopicModeler
 from .sentiment_analyzer import SentimentAnalyzer
+from .combined_analyzer import CombinedAnalyzer
 from .engagement_analyzer import EngagementAnalyzer
 from .cross_platform import CrossPlatformAnalyzer
 from .trend_detector import TrendDetector
@@ -12,6 +13,7 @@ __all__ = [
     'SemanticAnalyzer',
     'TopicModeler',
     'SentimentAnalyzer',
+    'CombinedAnalyzer',
     'EngagementAnalyzer',
     'CrossPlatformAnalyzer',
     'TrendDetector'
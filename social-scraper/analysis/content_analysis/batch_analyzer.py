@@ -9,6 +9,9 @@ Usage:
     # Semantic analysis with batch mode
     python run_ai_analysis.py --provider claude --batch-mode --output analysis/ai_results_batch
 
+    # Semantic + sentiment in one request per post (half the requests)
+    python run_ai_analysis.py --provider claude --batch-mode --combined
+
     # Or use directly
     from batch_analyzer import ClaudeBatchAnalyzer
     analyzer = ClaudeBatchAnalyzer()
@@ -19,7 +22,7 @@ import os
 import json
 import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
@@ -28,8 +31,15 @@ from anthropic.types.message_create_params import MessageCreateParamsNonStreamin
 from anthropic.types.messages.batch_create_params import Request
 
 import re
-from semantic_analyzer import ContentAnalysis, ANALYSIS_PROMPT
-from sentiment_analyzer import SentimentResult, SENTIMENT_PROMPT
+from semantic_analyzer import ContentAnalysis, ANALYSIS_PROMPT, ANALYSIS_PROMPT_VERSION, content_analysis_from_data
+from sentiment_analyzer import SentimentResult, SENTIMENT_PROMPT, SENTIMENT_PROMPT_VERSION, sentiment_result_from_data
+from combined_analyzer import (
+    COMBINED_PROMPT_VERSION, COMBINED_MAX_TOKENS, build_combined_prompt, parse_combined_response
+)
+from response_cache import ResponseCache, default_cache
+
+# Batch id of a "batch" that was never submitted because every response was cached
+CACHED_BATCH_ID = "cached"
 
 
 def extract_json_from_text(text: str) -> str:
@@ -102,7 +112,8 @@ class ClaudeBatchAnalyzer:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "claude-haiku-4-5-20251001"  # Haiku 4.5 for cost efficiency
+        model: str = "claude-haiku-4-5-20251001",  # Haiku 4.5 for cost efficiency
+        cache: Optional[ResponseCache] = None
     ):
         """
         Initialize batch analyzer.
@@ -113,6 +124,8 @@ class ClaudeBatchAnalyzer:
                    Batch pricing (50% off):
                    - Haiku 4.5: $0.50/MTok input, $2.50/MTok output
                    - Sonnet 4: $1.50/MTok input, $7.50/MTok output
+            cache: Response cache; None for the shared default, False for none.
+                   Cached items are left out of the batch.
         """
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
@@ -120,6 +133,7 @@ class ClaudeBatchAnalyzer:
 
         self.client = anthropic.Anthropic(api_key=self.api_key)
         self.model = model
+        self.cache = default_cache() if cache is None else (cache or None)
 
     def _build_semantic_prompt(self, content: Dict[str, Any]) -> str:
         """Build semantic analysis prompt for a single content item."""
@@ -154,6 +168,65 @@ class ClaudeBatchAnalyzer:
             ocr_text=ocr_text or "(no OCR text)"
         )
 
+    def _uncached(
+        self,
+        content_list: List[Dict[str, Any]],
+        template: str,
+        build_prompt
+    ) -> List[Dict[str, Any]]:
+        """The items with no cached response, which still need a batch request."""
+        if not self.cache:
+            return content_list
+
+        uncached = [
+            c for c in content_list
+            if self.cache.get("claude", self.model, template, build_prompt(c), count=False) is None
+        ]
+        if len(uncached) != len(content_list):
+            print(f"{len(content_list) - len(uncached)} responses cached, {len(uncached)} to submit")
+        return uncached
+
+    def _cached_responses(
+        self,
+        content_list: List[Dict[str, Any]],
+        template: str,
+        build_prompt
+    ) -> Dict[str, str]:
+        """Cached responses by video_id (the run's cache hits and misses are counted here)."""
+        if not self.cache:
+            return {}
+
+        cached = {}
+        for content in content_list:
+            response_text = self.cache.get("claude", self.model, template, build_prompt(content))
+            if response_text is not None:
+                cached[content["video_id"]] = response_text
+        return cached
+
+    def _cache_response(self, template: str, build_prompt, content: Dict[str, Any], response_text: str):
+        if self.cache and content:
+            self.cache.put("claude", self.model, template, build_prompt(content), response_text)
+
+    def _batch_results(self, batch_id: str):
+        if batch_id == CACHED_BATCH_ID:
+            return []
+        return self.client.messages.batches.results(batch_id)
+
+    def _cached_batch_status(self, batch_type: str) -> BatchStatus:
+        print("Every response is cached; no batch submitted")
+        return BatchStatus(
+            batch_id=CACHED_BATCH_ID,
+            batch_type=batch_type,
+            total_requests=0,
+            processing=0,
+            succeeded=0,
+            errored=0,
+            canceled=0,
+            expired=0,
+            status="ended",
+            created_at=datetime.now().isoformat()
+        )
+
     def _validate_and_dedupe_content(
         self,
         content_list: List[Dict[str, Any]]
@@ -244,8 +317,11 @@ class ClaudeBatchAnalyzer:
                 print(f"Resuming existing batch: {checkpoint['batch_id']}")
                 return BatchStatus(**checkpoint)
 
-        # Validate and dedupe content
+        # Validate and dedupe content, leaving out cached responses
         content_list = self._validate_and_dedupe_content(content_list)
+        content_list = self._uncached(content_list, ANALYSIS_PROMPT_VERSION, self._build_semantic_prompt)
+        if not content_list:
+            return self._cached_batch_status("semantic")
 
         # Build batch requests
         requests = []
@@ -317,8 +393,11 @@ class ClaudeBatchAnalyzer:
                 print(f"Resuming existing batch: {checkpoint['batch_id']}")
                 return BatchStatus(**checkpoint)
 
-        # Validate and dedupe content
+        # Validate and dedupe content, leaving out cached responses
         content_list = self._validate_and_dedupe_content(content_list)
+        content_list = self._uncached(content_list, SENTIMENT_PROMPT_VERSION, self._build_sentiment_prompt)
+        if not content_list:
+            return self._cached_batch_status("sentiment")
 
         # Build batch requests
         requests = []
@@ -362,6 +441,74 @@ class ClaudeBatchAnalyzer:
 
         return status
 
+    def create_combined_batch(
+        self,
+        content_list: List[Dict[str, Any]],
+        output_dir: str
+    ) -> BatchStatus:
+        """
+        Create a batch asking for semantic and sentiment analysis in one
+        request per item (COMBINED_PROMPT).
+
+        Returns BatchStatus with batch_id for polling.
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        # Check for existing batch checkpoint
+        checkpoint_file = output_path / "combined_batch_checkpoint.json"
+        if checkpoint_file.exists():
+            with open(checkpoint_file) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("batch_id") and checkpoint.get("status") != "ended":
+                print(f"Resuming existing batch: {checkpoint['batch_id']}")
+                return BatchStatus(**checkpoint)
+
+        # Validate and dedupe content, leaving out cached responses
+        content_list = self._validate_and_dedupe_content(content_list)
+        content_list = self._uncached(content_list, COMBINED_PROMPT_VERSION, build_combined_prompt)
+        if not content_list:
+            return self._cached_batch_status("combined")
+
+        # Build batch requests
+        requests = []
+        for content in content_list:
+            requests.append(Request(
+                custom_id=content.get("video_id", ""),
+                params=MessageCreateParamsNonStreaming(
+                    model=self.model,
+                    max_tokens=COMBINED_MAX_TOKENS,
+                    messages=[{"role": "user", "content": build_combined_prompt(content)}]
+                )
+            ))
+
+        print(f"Creating batch with {len(requests)} combined semantic + sentiment requests...")
+
+        # Submit batch
+        batch = self.client.messages.batches.create(requests=requests)
+
+        status = BatchStatus(
+            batch_id=batch.id,
+            batch_type="combined",
+            total_requests=len(requests),
+            processing=batch.request_counts.processing,
+            succeeded=batch.request_counts.succeeded,
+            errored=batch.request_counts.errored,
+            canceled=batch.request_counts.canceled,
+            expired=batch.request_counts.expired,
+            status=batch.processing_status,
+            created_at=batch.created_at.isoformat() if batch.created_at else datetime.now().isoformat(),
+            results_url=batch.results_url
+        )
+
+        # Save checkpoint
+        self._save_batch_checkpoint(checkpoint_file, status, content_list)
+
+        print(f"Batch created: {batch.id}")
+        print(f"Status: {batch.processing_status}")
+
+        return status
+
     def poll_batch(
         self,
         batch_id: str,
@@ -430,6 +577,18 @@ class ClaudeBatchAnalyzer:
 
             time.sleep(poll_interval)
 
+    def _parse_semantic_response(
+        self,
+        video_id: str,
+        content: Dict[str, Any],
+        response_text: str
+    ) -> ContentAnalysis:
+        """Build a ContentAnalysis from a response; raises ValueError or TypeError if it doesn't parse."""
+        return content_analysis_from_data(
+            video_id, content.get("influencer", ""), content.get("platform", ""),
+            json.loads(response_text), response_text
+        )
+
     def retrieve_semantic_results(
         self,
         batch_id: str,
@@ -438,20 +597,25 @@ class ClaudeBatchAnalyzer:
     ) -> List[ContentAnalysis]:
         """
         Retrieve and process semantic analysis results from a completed batch.
+
+        Items left out of the batch because their response was cached are
+        filled in from the cache; new responses are added to it.
         """
         output_path = Path(output_dir)
 
         # Build lookup for content metadata
         content_lookup = {c["video_id"]: c for c in content_list}
+        cached = self._cached_responses(content_list, ANALYSIS_PROMPT_VERSION, self._build_semantic_prompt)
 
         results = []
         error_count = 0
 
         print(f"Retrieving results for batch {batch_id}...")
 
-        for result in self.client.messages.batches.results(batch_id):
+        for result in self._batch_results(batch_id):
             video_id = result.custom_id
             content = content_lookup.get(video_id, {})
+            cached.pop(video_id, None)
 
             if result.result.type == "succeeded":
                 response_text = result.result.message.content[0].text.strip()
@@ -462,40 +626,10 @@ class ClaudeBatchAnalyzer:
                     response_text = "\n".join(lines[1:-1])
 
                 try:
-                    data = json.loads(response_text)
-
-                    analysis = ContentAnalysis(
-                        video_id=video_id,
-                        influencer=content.get("influencer", ""),
-                        platform=content.get("platform", ""),
-                        main_topic=data.get("main_topic", "Unknown"),
-                        subtopics=data.get("subtopics", []),
-                        content_type=data.get("content_type", "other"),
-                        content_format=data.get("content_format", "other"),
-                        nj_relevance_score=float(data.get("nj_relevance_score", 0)),
-                        nj_locations_mentioned=data.get("nj_locations_mentioned", []),
-                        nj_issues_mentioned=data.get("nj_issues_mentioned", []),
-                        local_vs_universal=data.get("local_vs_universal", "universal"),
-                        key_messages=data.get("key_messages", []),
-                        call_to_action=data.get("call_to_action"),
-                        narrative_frame=data.get("narrative_frame", "Unknown"),
-                        tone=data.get("tone", "Unknown"),
-                        target_audience=data.get("target_audience", "General"),
-                        assumed_knowledge=data.get("assumed_knowledge", "low"),
-                        engagement_hooks=data.get("engagement_hooks", []),
-                        people_mentioned=data.get("people_mentioned", []),
-                        organizations_mentioned=data.get("organizations_mentioned", []),
-                        brands_mentioned=data.get("brands_mentioned", []),
-                        other_creators_mentioned=data.get("other_creators_mentioned", []),
-                        production_quality=data.get("production_quality", "medium"),
-                        originality_score=float(data.get("originality_score", 0.5)),
-                        analysis_confidence=float(data.get("analysis_confidence", 0.5)),
-                        raw_response=response_text,
-                        timestamp=datetime.now().isoformat()
-                    )
-                    results.append(analysis)
+                    results.append(self._parse_semantic_response(video_id, content, response_text))
+                    self._cache_response(ANALYSIS_PROMPT_VERSION, self._build_semantic_prompt, content, response_text)
 
-                except json.JSONDecodeError:
+                except (ValueError, TypeError):
                     error_count += 1
                     results.append(self._create_error_semantic_result(video_id, content, "JSON parse error"))
 
@@ -509,13 +643,33 @@ class ClaudeBatchAnalyzer:
                 error_count += 1
                 results.append(self._create_error_semantic_result(video_id, content, result.result.type))
 
-        print(f"Retrieved {len(results)} results ({error_count} errors)")
+        # A cached response parsed once, but guard it like a new one rather than lose the batch
+        for video_id, response_text in cached.items():
+            content = content_lookup[video_id]
+            try:
+                results.append(self._parse_semantic_response(video_id, content, response_text))
+            except (ValueError, TypeError):
+                error_count += 1
+                results.append(self._create_error_semantic_result(video_id, content, "JSON parse error"))
+
+        print(f"Retrieved {len(results)} results ({error_count} errors, {len(cached)} from cache)")
 
         # Export results
         self._export_semantic_results(results, output_path)
 
         return results
 
+    def _parse_sentiment_response(
+        self,
+        video_id: str,
+        content: Dict[str, Any],
+        response_text: str
+    ) -> SentimentResult:
+        """Build a SentimentResult from a response; raises ValueError or TypeError if it doesn't parse."""
+        return sentiment_result_from_data(
+            video_id, content.get("influencer", ""), content.get("platform", ""), json.loads(response_text)
+        )
+
     def retrieve_sentiment_results(
         self,
         batch_id: str,
@@ -524,20 +678,25 @@ class ClaudeBatchAnalyzer:
     ) -> List[SentimentResult]:
         """
         Retrieve and process sentiment analysis results from a completed batch.
+
+        Items left out of the batch because their response was cached are
+        filled in from the cache; new responses are added to it.
         """
         output_path = Path(output_dir)
 
         # Build lookup for content metadata
         content_lookup = {c["video_id"]: c for c in content_list}
+        cached = self._cached_responses(content_list, SENTIMENT_PROMPT_VERSION, self._build_sentiment_prompt)
 
         results = []
         error_count = 0
 
         print(f"Retrieving sentiment results for batch {batch_id}...")
 
-        for result in self.client.messages.batches.results(batch_id):
+        for result in self._batch_results(batch_id):
             video_id = result.custom_id
             content = content_lookup.get(video_id, {})
+            cached.pop(video_id, None)
 
             if result.result.type == "succeeded":
                 response_text = result.result.message.content[0].text.strip()
@@ -546,45 +705,10 @@ class ClaudeBatchAnalyzer:
                 response_text = extract_json_from_text(response_text)
 
                 try:
-                    data = json.loads(response_text)
-                    emotions = data.get("emotions", {})
-
-                    sentiment = SentimentResult(
-                        video_id=video_id,
-                        influencer=content.get("influencer", ""),
-                        platform=content.get("platform", ""),
-                        sentiment_score=float(data.get("sentiment_score", 0)),
-                        sentiment_label=data.get("sentiment_label", "neutral"),
-                        joy=float(emotions.get("joy", 0)),
-                        anger=float(emotions.get("anger", 0)),
-                        fear=float(emotions.get("fear", 0)),
-                        sadness=float(emotions.get("sadness", 0)),
-                        surprise=float(emotions.get("surprise", 0)),
-                        disgust=float(emotions.get("disgust", 0)),
-                        trust=float(emotions.get("trust", 0)),
-                        anticipation=float(emotions.get("anticipation", 0)),
-                        primary_emotion=data.get("primary_emotion", "neutral"),
-                        secondary_emotion=data.get("secondary_emotion", "neutral"),
-                        formality=data.get("formality", "casual"),
-                        energy_level=data.get("energy_level", "moderate"),
-                        humor_level=float(data.get("humor_level", 0)),
-                        sarcasm_detected=data.get("sarcasm_detected", False),
-                        rhetorical_mode=data.get("rhetorical_mode", "informative"),
-                        persuasion_techniques=data.get("persuasion_techniques", []),
-                        call_to_action_strength=data.get("call_to_action_strength", "none"),
-                        authenticity_score=float(data.get("authenticity_score", 0.5)),
-                        personal_disclosure_level=data.get("personal_disclosure_level", "low"),
-                        vulnerable_moments=data.get("vulnerable_moments", False),
-                        scripted_vs_spontaneous=data.get("scripted_vs_spontaneous", "semi_scripted"),
-                        controversy_potential=float(data.get("controversy_potential", 0)),
-                        shareability_score=float(data.get("shareability_score", 0.5)),
-                        comment_bait_score=float(data.get("comment_bait_score", 0)),
-                        confidence=float(data.get("confidence", 0.5)),
-                        timestamp=datetime.now().isoformat()
-                    )
-                    results.append(sentiment)
+                    results.append(self._parse_sentiment_response(video_id, content, response_text))
+                    self._cache_response(SENTIMENT_PROMPT_VERSION, self._build_sentiment_prompt, content, response_text)
 
-                except json.JSONDecodeError:
+                except (ValueError, TypeError):
                     error_count += 1
                     results.append(self._create_error_sentiment_result(video_id, content, "JSON parse error"))
 
@@ -597,13 +721,102 @@ class ClaudeBatchAnalyzer:
                 error_count += 1
                 results.append(self._create_error_sentiment_result(video_id, content, result.result.type))
 
-        print(f"Retrieved {len(results)} sentiment results ({error_count} errors)")
+        for video_id, response_text in cached.items():
+            content = content_lookup[video_id]
+            try:
+                results.append(self._parse_sentiment_response(video_id, content, response_text))
+            except (ValueError, TypeError):
+                error_count += 1
+                results.append(self._create_error_sentiment_result(video_id, content, "JSON parse error"))
+
+        print(f"Retrieved {len(results)} sentiment results ({error_count} errors, {len(cached)} from cache)")
 
         # Export results
         self._export_sentiment_results(results, output_path)
 
         return results
 
+    def retrieve_combined_results(
+        self,
+        batch_id: str,
+        content_list: List[Dict[str, Any]],
+        output_dir: str
+    ) -> Tuple[List[ContentAnalysis], List[SentimentResult]]:
+        """
+        Retrieve a combined batch and split each answer into its semantic and
+        sentiment results, exported to output_dir/semantic and
+        output_dir/sentiment as separate batches would be.
+        """
+        output_path = Path(output_dir)
+
+        # Build lookup for content metadata
+        content_lookup = {c["video_id"]: c for c in content_list}
+        cached = self._cached_responses(content_list, COMBINED_PROMPT_VERSION, build_combined_prompt)
+
+        semantic_results = []
+        sentiment_results = []
+        error_count = 0
+
+        def add_error(video_id, content, error):
+            semantic_results.append(self._create_error_semantic_result(video_id, content, error))
+            sentiment_results.append(self._create_error_sentiment_result(video_id, content, error))
+
+        print(f"Retrieving combined results for batch {batch_id}...")
+
+        for result in self._batch_results(batch_id):
+            video_id = result.custom_id
+            content = content_lookup.get(video_id, {})
+            cached.pop(video_id, None)
+
+            if result.result.type == "succeeded":
+                response_text = result.result.message.content[0].text.strip()
+
+                try:
+                    analysis, sentiment = parse_combined_response(
+                        video_id, content.get("influencer", ""), content.get("platform", ""), response_text
+                    )
+                    semantic_results.append(analysis)
+                    sentiment_results.append(sentiment)
+                    self._cache_response(COMBINED_PROMPT_VERSION, build_combined_prompt, content, response_text)
+
+                except (ValueError, TypeError):
+                    error_count += 1
+                    add_error(video_id, content, "JSON parse error")
+
+            elif result.result.type == "errored":
+                error_count += 1
+                error_msg = str(result.result.error) if hasattr(result.result, 'error') else "Unknown error"
+                add_error(video_id, content, error_msg)
+
+            else:
+                error_count += 1
+                add_error(video_id, content, result.result.type)
+
+        for video_id, response_text in cached.items():
+            content = content_lookup[video_id]
+            try:
+                analysis, sentiment = parse_combined_response(
+                    video_id, content.get("influencer", ""), content.get("platform", ""), response_text
+                )
+            except (ValueError, TypeError):
+                error_count += 1
+                add_error(video_id, content, "JSON parse error")
+                continue
+            semantic_results.append(analysis)
+            sentiment_results.append(sentiment)
+
+        print(f"Retrieved {len(semantic_results)} combined results ({error_count} errors, {len(cached)} from cache)")
+
+        # Export results
+        semantic_dir = output_path / "semantic"
+        sentiment_dir = output_path / "sentiment"
+        semantic_dir.mkdir(parents=True, exist_ok=True)
+        sentiment_dir.mkdir(parents=True, exist_ok=True)
+        self._export_semantic_results(semantic_results, semantic_dir)
+        self._export_sentiment_results(sentiment_results, sentiment_dir)
+
+        return semantic_results, sentiment_results
+
     def _create_error_semantic_result(
         self,
         video_id: str,
@@ -777,7 +990,8 @@ class ClaudeBatchAnalyzer:
         self,
         content_list: List[Dict[str, Any]],
         output_dir: str,
-        poll_interval: int = 60
+        poll_interval: int = 60,
+        combined: bool = False
     ) -> Dict[str, Any]:
         """
         Run complete batch analysis (semantic + sentiment).
@@ -789,10 +1003,15 @@ class ClaudeBatchAnalyzer:
             content_list: List of content dicts to analyze
             output_dir: Output directory for results
             poll_interval: Seconds between status polls
+            combined: Submit one batch asking for both analyses per item
+                      (half the requests) instead of one batch per analysis
 
         Returns:
             Dict with semantic_results and sentiment_results
         """
+        if combined:
+            return self._run_combined_batch_analysis(content_list, output_dir, poll_interval)
+
         output_path = Path(output_dir)
         semantic_dir = output_path / "semantic"
         sentiment_dir = output_path / "sentiment"
@@ -857,6 +1076,8 @@ class ClaudeBatchAnalyzer:
         print("BATCH ANALYSIS COMPLETE")
         print(f"Semantic: {len(semantic_results)} results")
         print(f"Sentiment: {len(sentiment_results)} results")
+        if self.cache:
+            print(self.cache.summary())
         print(f"Results saved to: {output_dir}")
         print("=" * 60)
 
@@ -867,6 +1088,48 @@ class ClaudeBatchAnalyzer:
             "sentiment_status": asdict(sentiment_status)
         }
 
+    def _run_combined_batch_analysis(
+        self,
+        content_list: List[Dict[str, Any]],
+        output_dir: str,
+        poll_interval: int
+    ) -> Dict[str, Any]:
+        """run_full_batch_analysis with a single combined batch."""
+        print("=" * 60)
+        print("CLAUDE BATCH ANALYSIS (combined semantic + sentiment)")
+        print(f"Processing {len(content_list)} posts")
+        print(f"Cost savings: 50% vs real-time API")
+        print("=" * 60)
+
+        print("\n[1/3] Submitting combined analysis batch...")
+        status = self.create_combined_batch(content_list, output_dir)
+
+        print("\n[2/3] Polling for batch completion...")
+        while status.status != "ended":
+            status = self.poll_batch(status.batch_id, poll_interval=poll_interval)
+
+        print("\n[3/3] Retrieving results...")
+        semantic_results, sentiment_results = self.retrieve_combined_results(
+            status.batch_id,
+            content_list,
+            output_dir
+        )
+
+        print("\n" + "=" * 60)
+        print("BATCH ANALYSIS COMPLETE")
+        print(f"Semantic: {len(semantic_results)} results")
+        print(f"Sentiment: {len(sentiment_results)} results")
+        if self.cache:
+            print(self.cache.summary())
+        print(f"Results saved to: {output_dir}")
+        print("=" * 60)
+
+        return {
+            "semantic_results": semantic_results,
+            "sentiment_results": sentiment_results,
+            "combined_status": asdict(status)
+        }
+
 
 def retry_failed_requests(
     batch_id: str,
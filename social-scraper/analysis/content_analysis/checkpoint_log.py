@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Log
+
+Append-only JSONL checkpoint for AI analysis runs:
+- One line per finished result, so a save costs the same at item 10 and item 3,000
+- Every line is flushed as it is written; fsync every `fsync_every` lines
+- Resume replays the log; a torn last line from a crash is dropped
+- Compaction writes the final *_analysis_full.json and rewrites the log
+  with one line per item
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+class CheckpointLog:
+    """Append-only log of result dicts, keyed by `key` (the last line for a key wins)."""
+
+    def __init__(self, path: str, key: str = "video_id", fsync_every: int = 10):
+        self.path = Path(path)
+        self.key = key
+        self.fsync_every = fsync_every  # 1 = every line, 0 = leave it to the OS
+        self._file = None
+        self._unsynced = 0
+
+    def __len__(self) -> int:
+        return len(self.replay())
+
+    def replay(self) -> List[Dict[str, Any]]:
+        """Every logged result, one per key, in the order first logged. Read-only."""
+        records = {}
+        if not self.path.exists():
+            return []
+
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write from a crash
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records[record.get(self.key)] = record
+
+        return list(records.values())
+
+    def append(self, record: Dict[str, Any]):
+        """Log one finished result."""
+        if self._file is None:
+            self._open()
+
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def close(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def compact(self, json_path: str, records: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Write records (default: the replayed log) as the JSON array at json_path,
+        then rewrite the log to hold exactly those records. Both files are
+        replaced atomically.
+        """
+        self.close()
+        if records is None:
+            records = self.replay()
+
+        _write_atomic(Path(json_path), json.dumps(records, indent=2))
+        _write_atomic(self.path, "".join(json.dumps(r) + "\n" for r in records))
+        return records
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._drop_torn_line()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _drop_torn_line(self):
+        """Truncate a partial last line so the next record starts on its own line."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _write_atomic(path: Path, text: str):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def open_checkpoint(output_dir: str, name: str, fsync_every: int = 10) -> CheckpointLog:
+    """
+    The checkpoint log <name>.jsonl in output_dir.
+
+    A run checkpointed by an older version left <name>.json (completed ids
+    plus every result, rewritten on each save); its results seed the log
+    once, so the run resumes where it stopped.
+    """
+    output_path = Path(output_dir)
+    log = CheckpointLog(output_path / f"{name}.jsonl", fsync_every=fsync_every)
+
+    legacy_file = output_path / f"{name}.json"
+    if not log.path.exists() and legacy_file.exists():
+        with open(legacy_file) as f:
+            legacy = json.load(f)
+        for record in legacy.get("results", []):
+            log.append(record)
+        log.close()
+        print(f"Moved {len(legacy.get('results', []))} results from {legacy_file.name} to {log.path.name}")
+
+    return log
+
+
+def count_completed(output_dir: str, name: str) -> int:
+    """Number of items checkpointed in output_dir (for progress reports)."""
+    output_path = Path(output_dir)
+    log_file = output_path / f"{name}.jsonl"
+    if log_file.exists():
+        return len(CheckpointLog(log_file))
+
+    legacy_file = output_path / f"{name}.json"
+    try:
+        with open(legacy_file) as f:
+            return len(json.load(f).get("completed_ids", []))
+    except (OSError, ValueError):
+        return 0
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Combined Semantic + Sentiment Analyzer
+
+Sends each post's title, description, transcript and OCR text once, with one
+prompt asking for both the semantic analysis (ANALYSIS_SCHEMA) and the
+sentiment analysis (SENTIMENT_SCHEMA), instead of one request per analysis:
+- Half the requests, and the post text is sent once instead of twice
+- The answer fills a ContentAnalysis and a SentimentResult, written to the
+  same semantic/ and sentiment/ checkpoints and exports as separate runs
+
+With pack_tokens set, short posts (captions with no transcript) are packed
+several to a request (PACKED_PROMPT), so the instructions are sent once per
+pack rather than once per post. Posts missing from a packed answer, or whose
+answer doesn't parse, are sent again on their own.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import asdict
+
+from semantic_analyzer import (
+    SemanticAnalyzer, ContentAnalysis, ANALYSIS_SCHEMA, ANALYSIS_FOCUS,
+    content_analysis_from_data, parse_error_analysis
+)
+from sentiment_analyzer import (
+    SentimentResult, SENTIMENT_SCHEMA, SENTIMENT_CONSIDER,
+    sentiment_result_from_data, error_sentiment_result, export_sentiment_results
+)
+from request_engine import DEFAULT_CONCURRENCY, estimate_tokens
+from checkpoint_log import open_checkpoint
+from response_cache import ResponseCache
+
+
+CONTENT_FIELDS = """Platform: {platform}
+Influencer: {influencer}
+Title/Caption: {title}
+Description: {description}
+Duration: {duration} seconds
+Transcript: {transcript}
+OCR Text (from video frames): {ocr_text}"""
+
+GUIDANCE = """For the semantic analysis, """ + ANALYSIS_FOCUS[0].lower() + ANALYSIS_FOCUS[1:] + """
+
+For the sentiment analysis, """ + SENTIMENT_CONSIDER[0].lower() + SENTIMENT_CONSIDER[1:]
+
+COMBINED_PROMPT = """You are an expert media analyst and media psychologist specializing in social media content and local journalism.
+Analyze this content from a New Jersey influencer: its substance and narrative, and its emotional tone and rhetorical style.
+
+CONTENT TO ANALYZE:
+""" + CONTENT_FIELDS + """
+
+Respond ONLY with valid JSON: one object with a "semantic" and a "sentiment" analysis, in this format:
+
+{{
+"semantic": """ + ANALYSIS_SCHEMA + """,
+"sentiment": """ + SENTIMENT_SCHEMA + """
+}}
+
+""" + GUIDANCE
+
+# Part of the response cache key; bump it when COMBINED_PROMPT or the parsing of its answer changes
+COMBINED_PROMPT_VERSION = "combined:1"
+
+# The answer carries both analyses, so it gets both analyses' output budget
+COMBINED_MAX_TOKENS = 4096
+
+PACKED_PROMPT = """You are an expert media analyst and media psychologist specializing in social media content and local journalism.
+Analyze each of these posts from New Jersey influencers: its substance and narrative, and its emotional tone and rhetorical style.
+Analyze every post on its own; don't let one post color the analysis of another.
+
+POSTS TO ANALYZE:
+
+{posts}
+
+Respond ONLY with valid JSON: an array with one object per post, in the order given, each in this format:
+
+{{
+"video_id": "the post's video_id, exactly as given",
+"semantic": """ + ANALYSIS_SCHEMA + """,
+"sentiment": """ + SENTIMENT_SCHEMA + """
+}}
+
+""" + GUIDANCE
+
+PACKED_POST = """--- POST video_id: {video_id} ---
+""" + CONTENT_FIELDS
+
+# Part of the response cache key; bump it when PACKED_PROMPT or the parsing of its answer changes
+PACKED_PROMPT_VERSION = "packed:1"
+
+# Packing limits: posts whose PACKED_POST block is over PACK_POST_TOKENS are
+# sent on their own, and a pack holds at most PACK_MAX_POSTS posts. Each post
+# gets COMBINED_MAX_TOKENS / 2 of output, which keeps a full pack (16,384)
+# under the output a non-streaming request may ask for.
+PACK_TOKENS = 3000
+PACK_POST_TOKENS = 300
+PACK_MAX_POSTS = 8
+PACKED_MAX_TOKENS_PER_POST = COMBINED_MAX_TOKENS // 2
+
+
+def _content_fields(content: Dict[str, Any]) -> Dict[str, Any]:
+    """CONTENT_FIELDS values for one content dict (the keys batch_analyze takes)."""
+    # Truncated as for the semantic prompt, the longer of the two
+    transcript = (content.get("transcript") or "")[:8000]
+    ocr_text = (content.get("ocr_text") or "")[:2000]
+    description = (content.get("description") or "")[:2000]
+
+    return dict(
+        platform=content.get("platform", "unknown"),
+        influencer=content.get("influencer", "unknown"),
+        title=content.get("title") or "(no title)",
+        description=description or "(no description)",
+        duration=content.get("duration", 0),
+        transcript=transcript or "(no transcript available)",
+        ocr_text=ocr_text or "(no OCR text)"
+    )
+
+
+def build_combined_prompt(content: Dict[str, Any]) -> str:
+    """Render COMBINED_PROMPT for one content dict."""
+    return COMBINED_PROMPT.format(**_content_fields(content))
+
+
+def _packed_post(content: Dict[str, Any]) -> str:
+    return PACKED_POST.format(video_id=content["video_id"], **_content_fields(content))
+
+
+def build_packed_prompt(pack: List[Dict[str, Any]]) -> str:
+    """Render PACKED_PROMPT for a pack of content dicts."""
+    return PACKED_PROMPT.format(posts="\n\n".join(_packed_post(c) for c in pack))
+
+
+def pack_content(
+    content_list: List[Dict[str, Any]],
+    pack_tokens: int = PACK_TOKENS,
+    max_posts: int = PACK_MAX_POSTS,
+    post_tokens: int = PACK_POST_TOKENS
+) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Split content into packs of short posts, in order, each of whose
+    PACKED_PROMPT estimates at most pack_tokens input tokens, and the posts
+    to send on their own (long ones, and any left alone in a pack).
+    """
+    overhead = estimate_tokens(PACKED_PROMPT.format(posts=""))
+    packs = []
+    singles = []
+    pack = []
+    pack_size = overhead
+
+    for content in content_list:
+        size = estimate_tokens(_packed_post(content))
+        if size > post_tokens or overhead + size > pack_tokens:
+            singles.append(content)
+            continue
+        if pack and (len(pack) >= max_posts or pack_size + size > pack_tokens):
+            packs.append(pack)
+            pack = []
+            pack_size = overhead
+        pack.append(content)
+        pack_size += size
+
+    if pack:
+        packs.append(pack)
+
+    singles += [p[0] for p in packs if len(p) == 1]
+    return [p for p in packs if len(p) > 1], singles
+
+
+def parse_combined_response(
+    video_id: str,
+    influencer: str,
+    platform: str,
+    response_text: str
+) -> Tuple[ContentAnalysis, SentimentResult]:
+    """
+    Split a combined answer into its ContentAnalysis and SentimentResult.
+
+    Raises ValueError (JSONDecodeError included) if the answer isn't JSON or
+    lacks either half, and ValueError or TypeError if a score isn't a number.
+    The ContentAnalysis keeps the whole answer as its raw_response.
+    """
+    # Drop code fences or commentary around the JSON object
+    start = response_text.find("{")
+    end = response_text.rfind("}")
+    data = json.loads(response_text[start:end + 1] if start != -1 else response_text)
+
+    semantic = data.get("semantic") if isinstance(data, dict) else None
+    sentiment = data.get("sentiment") if isinstance(data, dict) else None
+    if not isinstance(semantic, dict) or not isinstance(sentiment, dict):
+        raise ValueError("answer lacks a semantic or sentiment object")
+
+    return (
+        content_analysis_from_data(video_id, influencer, platform, semantic, response_text),
+        sentiment_result_from_data(video_id, influencer, platform, sentiment)
+    )
+
+
+def parse_packed_response(
+    pack: List[Dict[str, Any]],
+    response_text: str
+) -> Dict[str, Tuple[ContentAnalysis, SentimentResult]]:
+    """
+    The (ContentAnalysis, SentimentResult) of each post of the pack that the
+    answer covers, by video_id. Entries for unknown or repeated video_ids,
+    or without a usable semantic and sentiment object, are left out. Each
+    ContentAnalysis keeps the whole packed answer as its raw_response.
+
+    Raises ValueError (JSONDecodeError included) if the answer isn't a JSON array.
+    """
+    # Drop code fences or commentary around the JSON array
+    start = response_text.find("[")
+    end = response_text.rfind("]")
+    data = json.loads(response_text[start:end + 1] if start != -1 else response_text)
+    if not isinstance(data, list):
+        raise ValueError("answer is not a JSON array")
+
+    content_lookup = {str(c["video_id"]): c for c in pack}
+    results = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        content = content_lookup.get(str(entry.get("video_id")))
+        semantic = entry.get("semantic")
+        sentiment = entry.get("sentiment")
+        if content is None or content["video_id"] in results or \
+                not isinstance(semantic, dict) or not isinstance(sentiment, dict):
+            continue
+
+        video_id = content["video_id"]
+        influencer = content.get("influencer", "")
+        platform = content.get("platform", "")
+        try:
+            results[video_id] = (
+                content_analysis_from_data(video_id, influencer, platform, semantic, response_text),
+                sentiment_result_from_data(video_id, influencer, platform, sentiment)
+            )
+        except (ValueError, TypeError):
+            continue  # e.g. a score that isn't a number
+
+    return results
+
+
+class CombinedAnalyzer(SemanticAnalyzer):
+    """Semantic and sentiment analysis of each post in a single request."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        provider: str = "claude",
+        model: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        pack_tokens: int = 0
+    ):
+        """pack_tokens: input token budget of a packed request; 0 sends every post on its own."""
+        super().__init__(api_key, provider, model, concurrency, rpm, tpm, cache)
+        self.pack_tokens = pack_tokens
+
+    def analyze(
+        self,
+        video_id: str,
+        influencer: str,
+        platform: str,
+        **content
+    ) -> Tuple[ContentAnalysis, SentimentResult]:
+        """Semantic and sentiment analysis of one piece of content."""
+        prompt = build_combined_prompt(dict(content, influencer=influencer, platform=platform))
+        cached = self.cache.get(self.provider, self.model_id, COMBINED_PROMPT_VERSION, prompt) if self.cache else None
+
+        try:
+            response_text = cached if cached is not None else self._call_api(prompt, COMBINED_MAX_TOKENS)
+            analysis, sentiment = parse_combined_response(video_id, influencer, platform, response_text)
+        except (ValueError, TypeError) as e:
+            return (
+                parse_error_analysis(video_id, influencer, platform, str(e)),
+                error_sentiment_result(video_id, influencer, platform)
+            )
+
+        if cached is None and self.cache:
+            self.cache.put(self.provider, self.model_id, COMBINED_PROMPT_VERSION, prompt, response_text)
+        return analysis, sentiment
+
+    def analyze_pack(self, pack: List[Dict[str, Any]]) -> Dict[str, Tuple[ContentAnalysis, SentimentResult]]:
+        """
+        Semantic and sentiment analysis of a pack of posts in one request, by
+        video_id; posts the answer doesn't cover are missing from the result.
+        """
+        prompt = build_packed_prompt(pack)
+        cached = self.cache.get(self.provider, self.model_id, PACKED_PROMPT_VERSION, prompt) if self.cache else None
+
+        try:
+            response_text = cached if cached is not None else self._call_api(
+                prompt, PACKED_MAX_TOKENS_PER_POST * len(pack)
+            )
+            results = parse_packed_response(pack, response_text)
+        except ValueError:
+            return {}
+
+        if cached is None and self.cache and results:
+            self.cache.put(self.provider, self.model_id, PACKED_PROMPT_VERSION, prompt, response_text)
+        return results
+
+    def cached_result(self, content: Dict[str, Any]) -> Optional[Tuple[ContentAnalysis, SentimentResult]]:
+        """analyze(**content) when the response cache has the answer, else None (no miss counted)."""
+        prompt = build_combined_prompt(content)
+        if not self.cache or self.cache.get(
+            self.provider, self.model_id, COMBINED_PROMPT_VERSION, prompt, count=False
+        ) is None:
+            return None
+        return self.analyze(**content)
+
+    def cached_pack(self, pack: List[Dict[str, Any]]) -> Optional[Dict[str, Tuple[ContentAnalysis, SentimentResult]]]:
+        """analyze_pack(pack) when the response cache has the answer, else None (no miss counted)."""
+        prompt = build_packed_prompt(pack)
+        if not self.cache or self.cache.get(
+            self.provider, self.model_id, PACKED_PROMPT_VERSION, prompt, count=False
+        ) is None:
+            return None
+        return self.analyze_pack(pack)
+
+    def cached_analysis(self, content: Dict[str, Any]) -> Optional[ContentAnalysis]:
+        """The semantic half of cached_result()."""
+        result = self.cached_result(content)
+        return result[0] if result else None
+
+    def analyze_content(
+        self,
+        video_id: str,
+        influencer: str,
+        platform: str,
+        title: str = "",
+        description: str = "",
+        duration: int = 0,
+        transcript: str = "",
+        ocr_text: str = ""
+    ) -> ContentAnalysis:
+        """The semantic half of analyze()."""
+        return self.analyze(
+            video_id, influencer, platform, title=title, description=description,
+            duration=duration, transcript=transcript, ocr_text=ocr_text
+        )[0]
+
+    def batch_analyze(
+        self,
+        content_list: List[Dict[str, Any]],
+        output_dir: str,
+        checkpoint_every: int = 10
+    ) -> Tuple[List[ContentAnalysis], List[SentimentResult]]:
+        """
+        Analyze content with one request per item, concurrently through self.engine.
+
+        Results go to output_dir/semantic and output_dir/sentiment, with the
+        same checkpoint logs and exports as SemanticAnalyzer and
+        SentimentAnalyzer, so either mode can resume the other's run. An item
+        is skipped only when both halves are already checkpointed. Cached
+        answers skip the rate limits.
+
+        With self.pack_tokens set, short posts go out in packs first
+        (pack_content), and the posts a packed answer missed go out on their own.
+        """
+        semantic_path = Path(output_dir) / "semantic"
+        sentiment_path = Path(output_dir) / "sentiment"
+        semantic_path.mkdir(parents=True, exist_ok=True)
+        sentiment_path.mkdir(parents=True, exist_ok=True)
+
+        semantic_log = open_checkpoint(semantic_path, "analysis_checkpoint", fsync_every=checkpoint_every)
+        sentiment_log = open_checkpoint(sentiment_path, "sentiment_checkpoint", fsync_every=checkpoint_every)
+        analyses = {r["video_id"]: ContentAnalysis(**r) for r in semantic_log.replay()}
+        sentiments = {r["video_id"]: SentimentResult(**r) for r in sentiment_log.replay()}
+
+        completed_ids = analyses.keys() & sentiments.keys()
+        if completed_ids:
+            print(f"Resuming from checkpoint: {len(completed_ids)} already analyzed")
+
+        to_process = [c for c in content_list if c["video_id"] not in completed_ids]
+        print(f"Processing {len(to_process)} of {len(content_list)} items (combined semantic + sentiment)")
+
+        def on_result(i, result):
+            semantic_log.append(asdict(result[0]))
+            sentiment_log.append(asdict(result[1]))
+
+        def on_pack_result(i, results):
+            for result in results.values():
+                on_result(i, result)
+
+        packs = []
+        singles = to_process
+        if self.pack_tokens:
+            packs, singles = pack_content(to_process, self.pack_tokens)
+            print(f"Packed {sum(len(p) for p in packs)} short posts into {len(packs)} requests, "
+                  f"{len(singles)} sent on their own")
+
+        try:
+            new_results = []
+            for results in self.engine.map(
+                self.analyze_pack,
+                packs,
+                tokens=lambda pack: estimate_tokens(build_packed_prompt(pack)),
+                on_result=on_pack_result,
+                desc="Packed Analysis",
+                cached=self.cached_pack
+            ):
+                new_results.extend(results.values())
+
+            # Posts a packed answer missed are asked again on their own
+            answered = {analysis.video_id for analysis, _ in new_results}
+            missed = [c for pack in packs for c in pack if c["video_id"] not in answered]
+            if missed:
+                print(f"{len(missed)} packed posts had no usable answer; sending them on their own")
+
+            new_results += self.engine.map(
+                lambda content: self.analyze(**content),
+                singles + missed,
+                tokens=lambda content: estimate_tokens(build_combined_prompt(content)),
+                on_result=on_result,
+                desc="Combined Analysis",
+                cached=self.cached_result
+            )
+        finally:
+            semantic_log.close()
+            sentiment_log.close()
+
+        for analysis, sentiment in new_results:
+            analyses[analysis.video_id] = analysis
+            sentiments[sentiment.video_id] = sentiment
+        analysis_results = list(analyses.values())
+        sentiment_results = list(sentiments.values())
+
+        semantic_log.compact(semantic_path / "semantic_analysis_full.json", [asdict(r) for r in analysis_results])
+        sentiment_log.compact(sentiment_path / "sentiment_analysis_full.json", [asdict(r) for r in sentiment_results])
+
+        self._export_results(analysis_results, semantic_path)
+        # Every request served both halves
+        export_sentiment_results(sentiment_results, sentiment_path, self.total_api_calls, self.cache)
+
+        return analysis_results, sentiment_results
@@ -10,6 +10,7 @@ Analyzes how influencers adapt content across platforms:
 """
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
@@ -18,6 +19,10 @@ from collections import defaultdict
 import statistics
 import pandas as pd
 
+# corpus.py (the shared post loader) lives in analysis/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from corpus import load_posts
+
 
 @dataclass
 class CrossPlatformProfile:
@@ -65,6 +70,11 @@ class PlatformComparison:
     multi_platform_creators: List[str]
 
 
+# Corpus columns the analyzer reads
+COLUMNS = ['influencer_name', 'platform', 'title', 'description', 'view_count', 'like_count',
+           'comment_count', 'duration_seconds']
+
+
 class CrossPlatformAnalyzer:
     """Analyze cross-platform content strategies."""
 
@@ -74,13 +84,7 @@ class CrossPlatformAnalyzer:
 
     def load_data(self, data_dir: str) -> pd.DataFrame:
         """Load consolidated post data."""
-        data_path = Path(data_dir)
-
-        for path in [data_path / "all_posts.csv", data_path / "data" / "all_posts.csv"]:
-            if path.exists():
-                return pd.read_csv(path)
-
-        raise FileNotFoundError(f"Could not find all_posts.csv")
+        return load_posts(data_dir, columns=COLUMNS)
 
     def analyze_influencer_cross_platform(
         self,
@@ -11,6 +11,7 @@ Analyzes what drives engagement across the corpus:
 """
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
@@ -20,6 +21,10 @@ import statistics
 import pandas as pd
 import numpy as np
 
+# corpus.py (the shared post loader) lives in analysis/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from corpus import load_posts
+
 
 @dataclass
 class EngagementProfile:
@@ -72,6 +77,11 @@ class InfluencerEngagementSummary:
     content_length_sweet_spot: Tuple[int, int]
 
 
+# Corpus columns the analyzer reads
+COLUMNS = ['post_id', 'influencer_name', 'platform', 'view_count', 'like_count', 'comment_count',
+           'repost_count', 'duration_seconds', 'upload_date']
+
+
 class EngagementAnalyzer:
     """Analyze engagement patterns across content."""
 
@@ -81,21 +91,7 @@ class EngagementAnalyzer:
 
     def load_data(self, data_dir: str) -> pd.DataFrame:
         """Load consolidated post data."""
-        data_path = Path(data_dir)
-
-        # Try different possible locations
-        csv_paths = [
-            data_path / "all_posts.csv",
-            data_path / "data" / "all_posts.csv",
-        ]
-
-        for path in csv_paths:
-            if path.exists():
-                df = pd.read_csv(path)
-                print(f"Loaded {len(df)} posts from {path}")
-                return df
-
-        raise FileNotFoundError(f"Could not find all_posts.csv in {data_dir}")
+        return load_posts(data_dir, columns=COLUMNS)
 
     def calculate_engagement_profiles(
         self,
@@ -167,18 +163,16 @@ class EngagementAnalyzer:
             # Viral score (simplified)
             viral_score = min(1.0, z_score / 3) if z_score > 0 else 0
 
-            # Parse date
-            upload_date = str(row.get('upload_date', ''))
+            # upload_date is already a datetime (NaT when unknown)
+            dt = row.get('upload_date')
+            upload_date = ''
             day_of_week = "unknown"
             hour = None
 
-            if upload_date and upload_date != 'nan':
-                try:
-                    dt = pd.to_datetime(upload_date)
-                    day_of_week = dt.day_name()
-                    hour = dt.hour if hasattr(dt, 'hour') else None
-                except Exception:
-                    pass
+            if pd.notna(dt):
+                upload_date = dt.strftime('%Y-%m-%d')
+                day_of_week = dt.day_name()
+                hour = dt.hour
 
             profiles.append(EngagementProfile(
                 video_id=str(row.get('post_id', '')),
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Request Engine
+
+Runs LLM requests on a bounded thread pool, under per-provider
+requests-per-minute and tokens-per-minute limits:
+- Up to `concurrency` requests in flight at once
+- Results come back in input order
+- A callback sees each result as soon as it finishes (for checkpointing)
+- Items answered from the response cache skip the limits
+
+The provider SDKs are synchronous, so threads rather than asyncio; the
+clients are safe to share between threads.
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional, Sequence
+
+from tqdm import tqdm
+
+# Default (requests per minute, input tokens per minute) per provider, at the
+# lowest paid tier; raise them with --rpm/--tpm on a higher tier
+PROVIDER_LIMITS = {
+    "claude": (50, 30000),
+    "gemini": (1000, 1000000),
+    "openai": (500, 30000),
+}
+
+DEFAULT_CONCURRENCY = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """Sliding-window limit on requests and tokens per minute, shared by threads."""
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, period: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.period = period
+        self._sent = deque()  # (time, tokens) of requests in the current window
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0):
+        """Block until a request of `tokens` fits in the window, then count it."""
+        if self.tpm:
+            # A request bigger than the whole budget goes out alone
+            tokens = min(tokens, self.tpm)
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0][0] >= self.period:
+                    self._tokens -= self._sent.popleft()[1]
+
+                full = (self.rpm and len(self._sent) >= self.rpm) or \
+                       (self.tpm and self._tokens + tokens > self.tpm)
+                if not full:
+                    self._sent.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                wait = self._sent[0][0] + self.period - now
+
+            time.sleep(max(wait, 0.01))
+
+
+class RequestEngine:
+    """Bounded-concurrency runner for per-item LLM requests."""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None
+    ):
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rpm, tpm)
+
+    @classmethod
+    def for_provider(
+        cls,
+        provider: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None
+    ) -> "RequestEngine":
+        """Engine with the provider's default limits, unless rpm/tpm are given."""
+        default_rpm, default_tpm = PROVIDER_LIMITS.get(provider, (None, None))
+        return cls(concurrency, rpm or default_rpm, tpm or default_tpm)
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Sequence[Any],
+        tokens: Optional[Callable[[Any], int]] = None,
+        on_result: Optional[Callable[[int, Any], None]] = None,
+        desc: Optional[str] = None,
+        cached: Optional[Callable[[Any], Any]] = None
+    ) -> List[Any]:
+        """
+        Call fn on every item and return the results in item order.
+
+        tokens(item) estimates the request's input tokens for the TPM limit.
+        cached(item) returns the item's result when it needs no request (a
+        response cache hit), or None; only the other items wait on the
+        limiter and go through fn.
+        on_result(index, result) is called from this thread as each request
+        finishes. If a request raises, requests not yet started are cancelled,
+        the ones in flight finish, and the exception is re-raised.
+        """
+        results = [None] * len(items)
+        if not items:
+            return results
+
+        def call(item):
+            if cached:
+                result = cached(item)
+                if result is not None:
+                    return result
+            self.limiter.acquire(tokens(item) if tokens else 0)
+            return fn(item)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(call, item): i for i, item in enumerate(items)}
+            try:
+                for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                    i = futures[future]
+                    results[i] = future.result()
+                    if on_result:
+                        on_result(i, results[i])
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return results
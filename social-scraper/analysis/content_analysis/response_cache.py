@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+
+Persistent, content-addressed cache of LLM responses shared by every
+analyzer, provider and run:
+- Keyed by (provider, model, prompt template version, SHA-256 of the rendered prompt)
+- Stored in one SQLite file (analysis/.llm_cache/responses.db by default)
+- Least recently used responses are evicted past a size limit
+- Hit and miss counts per prompt template for the run summary
+
+Only responses that parsed are stored, so a malformed answer is asked again
+on the next run.
+"""
+
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Optional
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".llm_cache" / "responses.db"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def cache_key(provider: str, model: str, template: str, prompt: str) -> str:
+    """Cache key of one request; template is the prompt's name and version, e.g. "semantic:1"."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{provider}\0{model}\0{template}\0{prompt_hash}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache, safe to share between threads and processes."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self._lock = threading.Lock()
+
+        # WAL lets parallel runs (run_parallel_analysis.py) read while one writes
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                template TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used_at ON responses (used_at)")
+        self._size = self._total_size()
+
+    def get(self, provider: str, model: str, template: str, prompt: str, count: bool = True) -> Optional[str]:
+        """The cached response for this request, or None; counted as a hit or miss unless count=False."""
+        key = cache_key(provider, model, template, prompt)
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if not count:
+                return row[0] if row else None
+            if row is None:
+                self.misses[template] += 1
+                return None
+            self.hits[template] += 1
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, provider: str, model: str, template: str, prompt: str, response: str):
+        """Store a response that parsed, evicting old entries past max_bytes."""
+        key = cache_key(provider, model, template, prompt)
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, template, response, size, now, now)
+            )
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used responses until the cache is under 90% of max_bytes."""
+        self._size = self._total_size()
+        target = self.max_bytes * 0.9
+        if self._size <= target:
+            return
+
+        freed = 0
+        cutoff = None
+        for used_at, size in self._conn.execute("SELECT used_at, size FROM responses ORDER BY used_at"):
+            freed += size
+            cutoff = used_at
+            if self._size - freed <= target:
+                break
+        self._conn.execute("DELETE FROM responses WHERE used_at <= ?", (cutoff,))
+        self._size = self._total_size()
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hits and misses this run, per prompt template."""
+        templates = sorted(set(self.hits) | set(self.misses))
+        return {t: {"hits": self.hits[t], "misses": self.misses[t]} for t in templates}
+
+    def summary(self) -> str:
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        lines = [f"Response cache: {hits} hits, {misses} misses ({self.path})"]
+        for template, counts in self.stats().items():
+            lines.append(f"  {template}: {counts['hits']} hits, {counts['misses']} misses")
+        return "\n".join(lines)
+
+    def close(self):
+        self._conn.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ResponseCache:
+    """The process-wide cache at DEFAULT_PATH, shared so its counts cover the whole run."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -24,7 +24,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-import pandas as pd
+# corpus.py (the shared post loader) lives in analysis/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 
 def check_dependencies():
@@ -205,10 +206,11 @@ def run_topic_modeling(
         print("Warning: OPENAI_API_KEY not set. Skipping topic modeling.")
         return {"skipped": True, "reason": "No API key"}
 
-    from topic_modeler import TopicModeler
+    from topic_modeler import TopicModeler, COLUMNS
+    from corpus import load_posts
 
     # Load content
-    df = pd.read_csv(Path(data_dir) / "all_posts.csv")
+    df = load_posts(data_dir, columns=COLUMNS)
 
     content_list = []
     for _, row in df.iterrows():
@@ -346,7 +348,7 @@ Examples:
 
     parser.add_argument(
         "data_dir",
-        help="Directory with consolidated content data (all_posts.csv)"
+        help="Directory with consolidated content data (corpus/ or all_posts.csv)"
     )
     parser.add_argument(
         "--output",
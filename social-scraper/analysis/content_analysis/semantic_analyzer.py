@@ -12,11 +12,15 @@ Deep analysis of content using LLMs to understand:
 
 import os
 import json
+import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from tqdm import tqdm
+
+from request_engine import RequestEngine, DEFAULT_CONCURRENCY, estimate_tokens
+from checkpoint_log import open_checkpoint
+from response_cache import ResponseCache, default_cache
 
 # Lazy imports for API clients
 genai = None
@@ -69,21 +73,8 @@ class ContentAnalysis:
     timestamp: str
 
 
-ANALYSIS_PROMPT = """You are an expert media analyst specializing in social media content and local journalism.
-Analyze this content from a New Jersey influencer and provide a detailed assessment.
-
-CONTENT TO ANALYZE:
-Platform: {platform}
-Influencer: {influencer}
-Title/Caption: {title}
-Description: {description}
-Duration: {duration} seconds
-Transcript: {transcript}
-OCR Text (from video frames): {ocr_text}
-
-Provide your analysis in the following JSON format (respond ONLY with valid JSON):
-
-{{
+# The JSON answer format, shared with the combined prompt (combined_analyzer.py)
+ANALYSIS_SCHEMA = """{{
     "main_topic": "Primary subject matter in 3-5 words",
     "subtopics": ["subtopic1", "subtopic2", "subtopic3"],
     "content_type": "educational|entertainment|news|opinion|promotion|lifestyle|reaction|other",
@@ -112,14 +103,107 @@ Provide your analysis in the following JSON format (respond ONLY with valid JSON
     "originality_score": 0.0 to 1.0,
 
     "analysis_confidence": 0.0 to 1.0
-}}
+}}"""
 
-Focus especially on:
+ANALYSIS_FOCUS = """Focus especially on:
 1. How this content relates to New Jersey specifically
 2. What narrative techniques the creator uses
 3. Who the content is designed to reach
 4. What the creator wants the audience to do/think/feel"""
 
+ANALYSIS_PROMPT = """You are an expert media analyst specializing in social media content and local journalism.
+Analyze this content from a New Jersey influencer and provide a detailed assessment.
+
+CONTENT TO ANALYZE:
+Platform: {platform}
+Influencer: {influencer}
+Title/Caption: {title}
+Description: {description}
+Duration: {duration} seconds
+Transcript: {transcript}
+OCR Text (from video frames): {ocr_text}
+
+Provide your analysis in the following JSON format (respond ONLY with valid JSON):
+
+""" + ANALYSIS_SCHEMA + """
+
+""" + ANALYSIS_FOCUS
+
+# Part of the response cache key; bump it when ANALYSIS_PROMPT or the parsing of its answer changes
+ANALYSIS_PROMPT_VERSION = "semantic:1"
+
+
+def content_analysis_from_data(
+    video_id: str,
+    influencer: str,
+    platform: str,
+    data: Dict[str, Any],
+    raw_response: str
+) -> ContentAnalysis:
+    """Build a ContentAnalysis from the parsed JSON answer to ANALYSIS_SCHEMA."""
+    return ContentAnalysis(
+        video_id=video_id,
+        influencer=influencer,
+        platform=platform,
+        main_topic=data.get("main_topic", "Unknown"),
+        subtopics=data.get("subtopics", []),
+        content_type=data.get("content_type", "other"),
+        content_format=data.get("content_format", "other"),
+        nj_relevance_score=float(data.get("nj_relevance_score", 0)),
+        nj_locations_mentioned=data.get("nj_locations_mentioned", []),
+        nj_issues_mentioned=data.get("nj_issues_mentioned", []),
+        local_vs_universal=data.get("local_vs_universal", "universal"),
+        key_messages=data.get("key_messages", []),
+        call_to_action=data.get("call_to_action"),
+        narrative_frame=data.get("narrative_frame", "Unknown"),
+        tone=data.get("tone", "Unknown"),
+        target_audience=data.get("target_audience", "General"),
+        assumed_knowledge=data.get("assumed_knowledge", "low"),
+        engagement_hooks=data.get("engagement_hooks", []),
+        people_mentioned=data.get("people_mentioned", []),
+        organizations_mentioned=data.get("organizations_mentioned", []),
+        brands_mentioned=data.get("brands_mentioned", []),
+        other_creators_mentioned=data.get("other_creators_mentioned", []),
+        production_quality=data.get("production_quality", "medium"),
+        originality_score=float(data.get("originality_score", 0.5)),
+        analysis_confidence=float(data.get("analysis_confidence", 0.5)),
+        raw_response=raw_response,
+        timestamp=datetime.now().isoformat()
+    )
+
+
+def parse_error_analysis(video_id: str, influencer: str, platform: str, error: str) -> ContentAnalysis:
+    """Placeholder ContentAnalysis for an answer that wasn't valid JSON."""
+    return ContentAnalysis(
+        video_id=video_id,
+        influencer=influencer,
+        platform=platform,
+        main_topic="Parse Error",
+        subtopics=[],
+        content_type="other",
+        content_format="other",
+        nj_relevance_score=0,
+        nj_locations_mentioned=[],
+        nj_issues_mentioned=[],
+        local_vs_universal="unknown",
+        key_messages=[],
+        call_to_action=None,
+        narrative_frame="Unknown",
+        tone="Unknown",
+        target_audience="Unknown",
+        assumed_knowledge="unknown",
+        engagement_hooks=[],
+        people_mentioned=[],
+        organizations_mentioned=[],
+        brands_mentioned=[],
+        other_creators_mentioned=[],
+        production_quality="unknown",
+        originality_score=0,
+        analysis_confidence=0,
+        raw_response=error,
+        timestamp=datetime.now().isoformat()
+    )
+
 
 class SemanticAnalyzer:
     """Deep semantic analysis of video content using Claude or Gemini."""
@@ -128,10 +212,18 @@ class SemanticAnalyzer:
         self,
         api_key: Optional[str] = None,
         provider: str = "claude",  # "claude" or "gemini"
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        cache: Optional[ResponseCache] = None  # None: the shared default cache, False: no caching
     ):
         self.provider = provider.lower()
         self.total_api_calls = 0
+        self.cache = default_cache() if cache is None else (cache or None)
+        self._calls_lock = threading.Lock()
+        # Requests per minute and input tokens per minute default to the provider's limits
+        self.engine = RequestEngine.for_provider(self.provider, concurrency, rpm, tpm)
 
         if self.provider == "claude":
             global anthropic
@@ -175,26 +267,26 @@ class SemanticAnalyzer:
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
-    def analyze_content(
+        self.model_id = self.gemini_model if self.provider == "gemini" else self.model_name
+
+    def build_prompt(
         self,
-        video_id: str,
         influencer: str,
         platform: str,
         title: str = "",
         description: str = "",
         duration: int = 0,
         transcript: str = "",
-        ocr_text: str = ""
-    ) -> ContentAnalysis:
-        """
-        Perform deep semantic analysis on a single piece of content.
-        """
+        ocr_text: str = "",
+        **kwargs
+    ) -> str:
+        """Render ANALYSIS_PROMPT for one piece of content."""
         # Truncate long texts to stay within token limits
         transcript = transcript[:8000] if transcript else ""
         ocr_text = ocr_text[:2000] if ocr_text else ""
         description = description[:2000] if description else ""
 
-        prompt = ANALYSIS_PROMPT.format(
+        return ANALYSIS_PROMPT.format(
             platform=platform,
             influencer=influencer,
             title=title or "(no title)",
@@ -204,100 +296,80 @@ class SemanticAnalyzer:
             ocr_text=ocr_text or "(no OCR text)"
         )
 
-        try:
-            # Call appropriate API
-            if self.provider == "claude":
-                message = self.client.messages.create(
-                    model=self.model_name,
-                    max_tokens=2048,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = message.content[0].text.strip()
-            elif self.provider == "gemini":
-                response = self.gemini_client.models.generate_content(
-                    model=self.gemini_model,
-                    contents=prompt,
-                    config=self.gemini_config
-                )
-                response_text = response.text.strip()
-            elif self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    max_completion_tokens=2048,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                response_text = response.choices[0].message.content.strip()
+    def _call_api(self, prompt: str, max_tokens: int = 2048) -> str:
+        """Send one prompt to the configured provider and return the response text."""
+        if self.provider == "claude":
+            message = self.client.messages.create(
+                model=self.model_name,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            response_text = message.content[0].text.strip()
+        elif self.provider == "gemini":
+            response = self.gemini_client.models.generate_content(
+                model=self.gemini_model,
+                contents=prompt,
+                config=self.gemini_config
+            )
+            response_text = response.text.strip()
+        elif self.provider == "openai":
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                max_completion_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            response_text = response.choices[0].message.content.strip()
 
+        with self._calls_lock:
             self.total_api_calls += 1
 
+        return response_text
+
+    def analyze_content(
+        self,
+        video_id: str,
+        influencer: str,
+        platform: str,
+        title: str = "",
+        description: str = "",
+        duration: int = 0,
+        transcript: str = "",
+        ocr_text: str = ""
+    ) -> ContentAnalysis:
+        """
+        Perform deep semantic analysis on a single piece of content.
+        """
+        prompt = self.build_prompt(
+            influencer, platform, title, description, duration, transcript, ocr_text
+        )
+        cached = self.cache.get(self.provider, self.model_id, ANALYSIS_PROMPT_VERSION, prompt) if self.cache else None
+
+        try:
+            response_text = cached if cached is not None else self._call_api(prompt)
+
             # Handle markdown code blocks
             if response_text.startswith("```"):
                 lines = response_text.split("\n")
                 response_text = "\n".join(lines[1:-1])
 
             data = json.loads(response_text)
+            if cached is None and self.cache:
+                self.cache.put(self.provider, self.model_id, ANALYSIS_PROMPT_VERSION, prompt, response_text)
 
-            return ContentAnalysis(
-                video_id=video_id,
-                influencer=influencer,
-                platform=platform,
-                main_topic=data.get("main_topic", "Unknown"),
-                subtopics=data.get("subtopics", []),
-                content_type=data.get("content_type", "other"),
-                content_format=data.get("content_format", "other"),
-                nj_relevance_score=float(data.get("nj_relevance_score", 0)),
-                nj_locations_mentioned=data.get("nj_locations_mentioned", []),
-                nj_issues_mentioned=data.get("nj_issues_mentioned", []),
-                local_vs_universal=data.get("local_vs_universal", "universal"),
-                key_messages=data.get("key_messages", []),
-                call_to_action=data.get("call_to_action"),
-                narrative_frame=data.get("narrative_frame", "Unknown"),
-                tone=data.get("tone", "Unknown"),
-                target_audience=data.get("target_audience", "General"),
-                assumed_knowledge=data.get("assumed_knowledge", "low"),
-                engagement_hooks=data.get("engagement_hooks", []),
-                people_mentioned=data.get("people_mentioned", []),
-                organizations_mentioned=data.get("organizations_mentioned", []),
-                brands_mentioned=data.get("brands_mentioned", []),
-                other_creators_mentioned=data.get("other_creators_mentioned", []),
-                production_quality=data.get("production_quality", "medium"),
-                originality_score=float(data.get("originality_score", 0.5)),
-                analysis_confidence=float(data.get("analysis_confidence", 0.5)),
-                raw_response=response_text,
-                timestamp=datetime.now().isoformat()
-            )
+            return content_analysis_from_data(video_id, influencer, platform, data, response_text)
 
         except json.JSONDecodeError as e:
             # Return partial analysis on JSON parse error
-            return ContentAnalysis(
-                video_id=video_id,
-                influencer=influencer,
-                platform=platform,
-                main_topic="Parse Error",
-                subtopics=[],
-                content_type="other",
-                content_format="other",
-                nj_relevance_score=0,
-                nj_locations_mentioned=[],
-                nj_issues_mentioned=[],
-                local_vs_universal="unknown",
-                key_messages=[],
-                call_to_action=None,
-                narrative_frame="Unknown",
-                tone="Unknown",
-                target_audience="Unknown",
-                assumed_knowledge="unknown",
-                engagement_hooks=[],
-                people_mentioned=[],
-                organizations_mentioned=[],
-                brands_mentioned=[],
-                other_creators_mentioned=[],
-                production_quality="unknown",
-                originality_score=0,
-                analysis_confidence=0,
-                raw_response=str(e),
-                timestamp=datetime.now().isoformat()
-            )
+            return parse_error_analysis(video_id, influencer, platform, str(e))
+
+    def cached_analysis(self, content: Dict[str, Any]) -> Optional[ContentAnalysis]:
+        """analyze_content(**content) when the response cache has the answer, else None (no miss counted)."""
+        prompt = self.build_prompt(**content)
+        if not self.cache or self.cache.get(
+            self.provider, self.model_id, ANALYSIS_PROMPT_VERSION, prompt, count=False
+        ) is None:
+            return None
+        return self.analyze_content(**content)
 
     def batch_analyze(
         self,
@@ -308,6 +380,11 @@ class SemanticAnalyzer:
         """
         Analyze multiple pieces of content with checkpointing.
 
+        Requests run concurrently through self.engine; results keep the order
+        of content_list, and cached answers skip the rate limits. Each result is appended to analysis_checkpoint.jsonl
+        as it finishes (fsynced every checkpoint_every results), and a rerun
+        resumes from that log.
+
         content_list: List of dicts with keys:
             - video_id, influencer, platform, title, description,
             - duration, transcript, ocr_text
@@ -315,59 +392,39 @@ class SemanticAnalyzer:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Load existing checkpoint
-        checkpoint_file = output_path / "analysis_checkpoint.json"
-        completed_ids = set()
-        results = []
-
-        if checkpoint_file.exists():
-            with open(checkpoint_file, "r") as f:
-                checkpoint = json.load(f)
-                completed_ids = set(checkpoint.get("completed_ids", []))
-                results = [ContentAnalysis(**r) for r in checkpoint.get("results", [])]
-                print(f"Resuming from checkpoint: {len(completed_ids)} already analyzed")
+        # Replay existing checkpoint
+        checkpoint = open_checkpoint(output_path, "analysis_checkpoint", fsync_every=checkpoint_every)
+        results = [ContentAnalysis(**r) for r in checkpoint.replay()]
+        completed_ids = {r.video_id for r in results}
+        if results:
+            print(f"Resuming from checkpoint: {len(completed_ids)} already analyzed")
 
         # Filter to unprocessed content
         to_process = [c for c in content_list if c["video_id"] not in completed_ids]
         print(f"Processing {len(to_process)} of {len(content_list)} items")
 
-        for i, content in enumerate(tqdm(to_process, desc="Semantic Analysis")):
-            analysis = self.analyze_content(**content)
-            results.append(analysis)
-            completed_ids.add(content["video_id"])
-
-            # Checkpoint
-            if (i + 1) % checkpoint_every == 0:
-                self._save_checkpoint(checkpoint_file, completed_ids, results)
-
-        # Final save
-        self._save_checkpoint(checkpoint_file, completed_ids, results)
+        try:
+            results += self.engine.map(
+                lambda content: self.analyze_content(**content),
+                to_process,
+                tokens=lambda content: estimate_tokens(self.build_prompt(**content)),
+                on_result=lambda i, analysis: checkpoint.append(asdict(analysis)),
+                desc="Semantic Analysis",
+                cached=self.cached_analysis
+            )
+        finally:
+            checkpoint.close()
 
-        # Export full results
+        # Compact the log into the full JSON export
+        json_file = output_path / "semantic_analysis_full.json"
+        checkpoint.compact(json_file, [asdict(r) for r in results])
         self._export_results(results, output_path)
 
         return results
 
-    def _save_checkpoint(
-        self,
-        checkpoint_file: Path,
-        completed_ids: set,
-        results: List[ContentAnalysis]
-    ):
-        """Save checkpoint for resumable processing."""
-        with open(checkpoint_file, "w") as f:
-            json.dump({
-                "completed_ids": list(completed_ids),
-                "results": [asdict(r) for r in results],
-                "timestamp": datetime.now().isoformat()
-            }, f, indent=2)
-
     def _export_results(self, results: List[ContentAnalysis], output_path: Path):
-        """Export results to JSON and CSV."""
-        # Full JSON export
+        """Export the summary CSV (the full JSON is written by the checkpoint compaction)."""
         json_file = output_path / "semantic_analysis_full.json"
-        with open(json_file, "w") as f:
-            json.dump([asdict(r) for r in results], f, indent=2)
 
         # Summary CSV for analysis
         import csv
@@ -404,6 +461,8 @@ class SemanticAnalyzer:
         print(f"  JSON: {json_file}")
         print(f"  CSV: {csv_file}")
         print(f"  Total API calls: {self.total_api_calls}")
+        if self.cache:
+            print(self.cache.summary())
 
 
 def load_processed_content(results_dir: str) -> List[Dict[str, Any]]:
@@ -12,12 +12,16 @@ Analyzes emotional tone, sentiment, and rhetorical style of content:
 
 import os
 import json
+import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from collections import defaultdict
-from tqdm import tqdm
+
+from request_engine import RequestEngine, DEFAULT_CONCURRENCY, estimate_tokens
+from checkpoint_log import open_checkpoint
+from response_cache import ResponseCache, default_cache
 
 # Lazy imports
 genai = None
@@ -76,19 +80,8 @@ class SentimentResult:
     timestamp: str
 
 
-SENTIMENT_PROMPT = """You are an expert media psychologist analyzing social media content.
-Perform a deep sentiment and tone analysis of this content.
-
-CONTENT:
-Platform: {platform}
-Influencer: {influencer}
-Title: {title}
-Transcript: {transcript}
-OCR Text: {ocr_text}
-
-Analyze the emotional and rhetorical qualities. Respond with JSON only:
-
-{{
+# The JSON answer format, shared with the combined prompt (combined_analyzer.py)
+SENTIMENT_SCHEMA = """{{
     "sentiment_score": -1.0 to 1.0 (-1=very negative, 0=neutral, 1=very positive),
     "sentiment_label": "very_negative|negative|neutral|positive|very_positive",
 
@@ -124,15 +117,109 @@ Analyze the emotional and rhetorical qualities. Respond with JSON only:
     "comment_bait_score": 0.0 to 1.0,
 
     "confidence": 0.0 to 1.0
-}}
+}}"""
 
-Consider:
+SENTIMENT_CONSIDER = """Consider:
 - Word choice, phrasing, and emphasis
 - Speaking patterns and cadence (if transcript shows this)
 - Use of emotional appeals vs logical arguments
 - Authenticity vs performative elements
 - What reactions this content is designed to provoke"""
 
+SENTIMENT_PROMPT = """You are an expert media psychologist analyzing social media content.
+Perform a deep sentiment and tone analysis of this content.
+
+CONTENT:
+Platform: {platform}
+Influencer: {influencer}
+Title: {title}
+Transcript: {transcript}
+OCR Text: {ocr_text}
+
+Analyze the emotional and rhetorical qualities. Respond with JSON only:
+
+""" + SENTIMENT_SCHEMA + """
+
+""" + SENTIMENT_CONSIDER
+
+# Part of the response cache key; bump it when SENTIMENT_PROMPT or the parsing of its answer changes
+SENTIMENT_PROMPT_VERSION = "sentiment:1"
+
+
+def sentiment_result_from_data(
+    video_id: str,
+    influencer: str,
+    platform: str,
+    data: Dict[str, Any]
+) -> SentimentResult:
+    """Build a SentimentResult from the parsed JSON answer to SENTIMENT_SCHEMA."""
+    emotions = data.get("emotions", {})
+
+    return SentimentResult(
+        video_id=video_id,
+        influencer=influencer,
+        platform=platform,
+        sentiment_score=float(data.get("sentiment_score", 0)),
+        sentiment_label=data.get("sentiment_label", "neutral"),
+        joy=float(emotions.get("joy", 0)),
+        anger=float(emotions.get("anger", 0)),
+        fear=float(emotions.get("fear", 0)),
+        sadness=float(emotions.get("sadness", 0)),
+        surprise=float(emotions.get("surprise", 0)),
+        disgust=float(emotions.get("disgust", 0)),
+        trust=float(emotions.get("trust", 0)),
+        anticipation=float(emotions.get("anticipation", 0)),
+        primary_emotion=data.get("primary_emotion", "neutral"),
+        secondary_emotion=data.get("secondary_emotion", "neutral"),
+        formality=data.get("formality", "casual"),
+        energy_level=data.get("energy_level", "moderate"),
+        humor_level=float(data.get("humor_level", 0)),
+        sarcasm_detected=data.get("sarcasm_detected", False),
+        rhetorical_mode=data.get("rhetorical_mode", "informative"),
+        persuasion_techniques=data.get("persuasion_techniques", []),
+        call_to_action_strength=data.get("call_to_action_strength", "none"),
+        authenticity_score=float(data.get("authenticity_score", 0.5)),
+        personal_disclosure_level=data.get("personal_disclosure_level", "low"),
+        vulnerable_moments=data.get("vulnerable_moments", False),
+        scripted_vs_spontaneous=data.get("scripted_vs_spontaneous", "semi_scripted"),
+        controversy_potential=float(data.get("controversy_potential", 0)),
+        shareability_score=float(data.get("shareability_score", 0.5)),
+        comment_bait_score=float(data.get("comment_bait_score", 0)),
+        confidence=float(data.get("confidence", 0.5)),
+        timestamp=datetime.now().isoformat()
+    )
+
+
+def error_sentiment_result(video_id: str, influencer: str, platform: str) -> SentimentResult:
+    """Placeholder SentimentResult for a request or answer that failed."""
+    return SentimentResult(
+        video_id=video_id,
+        influencer=influencer,
+        platform=platform,
+        sentiment_score=0,
+        sentiment_label="error",
+        joy=0, anger=0, fear=0, sadness=0,
+        surprise=0, disgust=0, trust=0, anticipation=0,
+        primary_emotion="error",
+        secondary_emotion="error",
+        formality="unknown",
+        energy_level="unknown",
+        humor_level=0,
+        sarcasm_detected=False,
+        rhetorical_mode="unknown",
+        persuasion_techniques=[],
+        call_to_action_strength="unknown",
+        authenticity_score=0,
+        personal_disclosure_level="unknown",
+        vulnerable_moments=False,
+        scripted_vs_spontaneous="unknown",
+        controversy_potential=0,
+        shareability_score=0,
+        comment_bait_score=0,
+        confidence=0,
+        timestamp=datetime.now().isoformat()
+    )
+
 
 class SentimentAnalyzer:
     """Deep sentiment and tone analysis using Claude or Gemini."""
@@ -141,10 +228,18 @@ class SentimentAnalyzer:
         self,
         api_key: Optional[str] = None,
         provider: str = "claude",
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        cache: Optional[ResponseCache] = None  # None: the shared default cache, False: no caching
     ):
         self.provider = provider.lower()
         self.api_calls = 0
+        self.cache = default_cache() if cache is None else (cache or None)
+        self._calls_lock = threading.Lock()
+        # Requests per minute and input tokens per minute default to the provider's limits
+        self.engine = RequestEngine.for_provider(self.provider, concurrency, rpm, tpm)
 
         if self.provider == "claude":
             global anthropic
@@ -192,19 +287,19 @@ class SentimentAnalyzer:
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
-    def analyze(
+        self.model_id = self.gemini_model if self.provider == "gemini" else self.model_name
+
+    def build_prompt(
         self,
-        video_id: str,
         influencer: str,
         platform: str,
         title: str = "",
         transcript: str = "",
         ocr_text: str = "",
         description: str = "",
-        duration: int = 0,
-        **kwargs  # Accept any extra parameters
-    ) -> SentimentResult:
-        """Analyze sentiment and tone of content."""
+        **kwargs
+    ) -> str:
+        """Render SENTIMENT_PROMPT for one piece of content."""
         # Truncate for token limits
         transcript = transcript[:6000] if transcript else ""
         ocr_text = ocr_text[:1500] if ocr_text else ""
@@ -212,7 +307,7 @@ class SentimentAnalyzer:
         if not transcript and description:
             transcript = description[:4000]
 
-        prompt = SENTIMENT_PROMPT.format(
+        return SENTIMENT_PROMPT.format(
             platform=platform,
             influencer=influencer,
             title=title or "(no title)",
@@ -220,101 +315,75 @@ class SentimentAnalyzer:
             ocr_text=ocr_text or "(no OCR text)"
         )
 
-        try:
-            # Call appropriate API
-            if self.provider == "claude":
-                message = self.client.messages.create(
-                    model=self.model_name,
-                    max_tokens=2048,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                text = message.content[0].text.strip()
-            elif self.provider == "gemini":
-                response = self.gemini_client.models.generate_content(
-                    model=self.gemini_model,
-                    contents=prompt,
-                    config=self.gemini_config
-                )
-                text = response.text.strip()
-            elif self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    max_completion_tokens=2048,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                text = response.choices[0].message.content.strip()
+    def _call_api(self, prompt: str, max_tokens: int = 2048) -> str:
+        """Send one prompt to the configured provider and return the response text."""
+        if self.provider == "claude":
+            message = self.client.messages.create(
+                model=self.model_name,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            text = message.content[0].text.strip()
+        elif self.provider == "gemini":
+            response = self.gemini_client.models.generate_content(
+                model=self.gemini_model,
+                contents=prompt,
+                config=self.gemini_config
+            )
+            text = response.text.strip()
+        elif self.provider == "openai":
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                max_completion_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            text = response.choices[0].message.content.strip()
 
+        with self._calls_lock:
             self.api_calls += 1
 
+        return text
+
+    def analyze(
+        self,
+        video_id: str,
+        influencer: str,
+        platform: str,
+        title: str = "",
+        transcript: str = "",
+        ocr_text: str = "",
+        description: str = "",
+        duration: int = 0,
+        **kwargs  # Accept any extra parameters
+    ) -> SentimentResult:
+        """Analyze sentiment and tone of content."""
+        prompt = self.build_prompt(influencer, platform, title, transcript, ocr_text, description)
+        cached = self.cache.get(self.provider, self.model_id, SENTIMENT_PROMPT_VERSION, prompt) if self.cache else None
+
+        try:
+            text = cached if cached is not None else self._call_api(prompt)
+
             if text.startswith("```"):
                 lines = text.split("\n")
                 text = "\n".join(lines[1:-1])
 
             data = json.loads(text)
-            emotions = data.get("emotions", {})
-
-            return SentimentResult(
-                video_id=video_id,
-                influencer=influencer,
-                platform=platform,
-                sentiment_score=float(data.get("sentiment_score", 0)),
-                sentiment_label=data.get("sentiment_label", "neutral"),
-                joy=float(emotions.get("joy", 0)),
-                anger=float(emotions.get("anger", 0)),
-                fear=float(emotions.get("fear", 0)),
-                sadness=float(emotions.get("sadness", 0)),
-                surprise=float(emotions.get("surprise", 0)),
-                disgust=float(emotions.get("disgust", 0)),
-                trust=float(emotions.get("trust", 0)),
-                anticipation=float(emotions.get("anticipation", 0)),
-                primary_emotion=data.get("primary_emotion", "neutral"),
-                secondary_emotion=data.get("secondary_emotion", "neutral"),
-                formality=data.get("formality", "casual"),
-                energy_level=data.get("energy_level", "moderate"),
-                humor_level=float(data.get("humor_level", 0)),
-                sarcasm_detected=data.get("sarcasm_detected", False),
-                rhetorical_mode=data.get("rhetorical_mode", "informative"),
-                persuasion_techniques=data.get("persuasion_techniques", []),
-                call_to_action_strength=data.get("call_to_action_strength", "none"),
-                authenticity_score=float(data.get("authenticity_score", 0.5)),
-                personal_disclosure_level=data.get("personal_disclosure_level", "low"),
-                vulnerable_moments=data.get("vulnerable_moments", False),
-                scripted_vs_spontaneous=data.get("scripted_vs_spontaneous", "semi_scripted"),
-                controversy_potential=float(data.get("controversy_potential", 0)),
-                shareability_score=float(data.get("shareability_score", 0.5)),
-                comment_bait_score=float(data.get("comment_bait_score", 0)),
-                confidence=float(data.get("confidence", 0.5)),
-                timestamp=datetime.now().isoformat()
-            )
+            if cached is None and self.cache:
+                self.cache.put(self.provider, self.model_id, SENTIMENT_PROMPT_VERSION, prompt, text)
+
+            return sentiment_result_from_data(video_id, influencer, platform, data)
 
         except Exception as e:
-            return SentimentResult(
-                video_id=video_id,
-                influencer=influencer,
-                platform=platform,
-                sentiment_score=0,
-                sentiment_label="error",
-                joy=0, anger=0, fear=0, sadness=0,
-                surprise=0, disgust=0, trust=0, anticipation=0,
-                primary_emotion="error",
-                secondary_emotion="error",
-                formality="unknown",
-                energy_level="unknown",
-                humor_level=0,
-                sarcasm_detected=False,
-                rhetorical_mode="unknown",
-                persuasion_techniques=[],
-                call_to_action_strength="unknown",
-                authenticity_score=0,
-                personal_disclosure_level="unknown",
-                vulnerable_moments=False,
-                scripted_vs_spontaneous="unknown",
-                controversy_potential=0,
-                shareability_score=0,
-                comment_bait_score=0,
-                confidence=0,
-                timestamp=datetime.now().isoformat()
-            )
+            return error_sentiment_result(video_id, influencer, platform)
+
+    def cached_analysis(self, content: Dict[str, Any]) -> Optional[SentimentResult]:
+        """analyze(**content) when the response cache has the answer, else None (no miss counted)."""
+        prompt = self.build_prompt(**content)
+        if not self.cache or self.cache.get(
+            self.provider, self.model_id, SENTIMENT_PROMPT_VERSION, prompt, count=False
+        ) is None:
+            return None
+        return self.analyze(**content)
 
     def batch_analyze(
         self,
@@ -322,144 +391,154 @@ class SentimentAnalyzer:
         output_dir: str,
         checkpoint_every: int = 10
     ) -> List[SentimentResult]:
-        """Batch analyze with checkpointing."""
+        """
+        Batch analyze concurrently through self.engine (cached answers skip
+        the rate limits). Each result is appended
+        to sentiment_checkpoint.jsonl as it finishes (fsynced every
+        checkpoint_every results), and a rerun resumes from that log.
+        """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        checkpoint_file = output_path / "sentiment_checkpoint.json"
-        completed_ids = set()
-        results = []
-
-        if checkpoint_file.exists():
-            with open(checkpoint_file) as f:
-                checkpoint = json.load(f)
-                completed_ids = set(checkpoint.get("completed_ids", []))
-                results = [SentimentResult(**r) for r in checkpoint.get("results", [])]
-                print(f"Resuming: {len(completed_ids)} already analyzed")
+        checkpoint = open_checkpoint(output_path, "sentiment_checkpoint", fsync_every=checkpoint_every)
+        results = [SentimentResult(**r) for r in checkpoint.replay()]
+        completed_ids = {r.video_id for r in results}
+        if results:
+            print(f"Resuming: {len(completed_ids)} already analyzed")
 
         to_process = [c for c in content_list if c["video_id"] not in completed_ids]
         print(f"Processing {len(to_process)} of {len(content_list)} items")
 
-        for i, content in enumerate(tqdm(to_process, desc="Sentiment Analysis")):
-            result = self.analyze(**content)
-            results.append(result)
-            completed_ids.add(content["video_id"])
-
-            if (i + 1) % checkpoint_every == 0:
-                self._save_checkpoint(checkpoint_file, completed_ids, results)
+        try:
+            results += self.engine.map(
+                lambda content: self.analyze(**content),
+                to_process,
+                tokens=lambda content: estimate_tokens(self.build_prompt(**content)),
+                on_result=lambda i, result: checkpoint.append(asdict(result)),
+                desc="Sentiment Analysis",
+                cached=self.cached_analysis
+            )
+        finally:
+            checkpoint.close()
 
-        self._save_checkpoint(checkpoint_file, completed_ids, results)
+        checkpoint.compact(output_path / "sentiment_analysis_full.json", [asdict(r) for r in results])
         self._export_results(results, output_path)
 
         return results
 
-    def _save_checkpoint(self, path: Path, completed: set, results: List[SentimentResult]):
-        with open(path, "w") as f:
-            json.dump({
-                "completed_ids": list(completed),
-                "results": [asdict(r) for r in results],
-                "timestamp": datetime.now().isoformat()
-            }, f, indent=2)
-
     def _export_results(self, results: List[SentimentResult], output_path: Path):
-        """Export results to JSON and CSV."""
-        # Full JSON
-        with open(output_path / "sentiment_analysis_full.json", "w") as f:
-            json.dump([asdict(r) for r in results], f, indent=2)
-
-        # CSV summary
-        import csv
-        with open(output_path / "sentiment_summary.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "video_id", "influencer", "platform",
-                "sentiment_score", "sentiment_label",
-                "primary_emotion", "secondary_emotion",
-                "formality", "energy_level", "humor_level",
-                "rhetorical_mode", "authenticity_score",
-                "controversy_potential", "shareability_score",
-                "confidence"
-            ])
-            writer.writeheader()
-            for r in results:
-                writer.writerow({
-                    "video_id": r.video_id,
-                    "influencer": r.influencer,
-                    "platform": r.platform,
-                    "sentiment_score": r.sentiment_score,
-                    "sentiment_label": r.sentiment_label,
-                    "primary_emotion": r.primary_emotion,
-                    "secondary_emotion": r.secondary_emotion,
-                    "formality": r.formality,
-                    "energy_level": r.energy_level,
-                    "humor_level": r.humor_level,
-                    "rhetorical_mode": r.rhetorical_mode,
-                    "authenticity_score": r.authenticity_score,
-                    "controversy_potential": r.controversy_potential,
-                    "shareability_score": r.shareability_score,
-                    "confidence": r.confidence
-                })
-
-        # Aggregate stats
-        self._generate_aggregate_stats(results, output_path)
-
-        print(f"\nResults exported to {output_path}")
-        print(f"Total API calls: {self.api_calls}")
-
-    def _generate_aggregate_stats(self, results: List[SentimentResult], output_path: Path):
-        """Generate aggregate sentiment statistics."""
-        from collections import defaultdict
-        import statistics
-
-        # By platform
-        by_platform = defaultdict(list)
-        by_influencer = defaultdict(list)
-
+        """Export the summary CSV and aggregate stats (the full JSON is written by the checkpoint compaction)."""
+        export_sentiment_results(results, output_path, self.api_calls, self.cache)
+
+
+def export_sentiment_results(
+    results: List[SentimentResult],
+    output_path: Path,
+    api_calls: int,
+    cache: Optional[ResponseCache] = None
+):
+    """
+    Export the summary CSV and aggregate stats of a sentiment run (the full
+    JSON is written by the checkpoint compaction).
+    """
+    # CSV summary
+    import csv
+    with open(output_path / "sentiment_summary.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[
+            "video_id", "influencer", "platform",
+            "sentiment_score", "sentiment_label",
+            "primary_emotion", "secondary_emotion",
+            "formality", "energy_level", "humor_level",
+            "rhetorical_mode", "authenticity_score",
+            "controversy_potential", "shareability_score",
+            "confidence"
+        ])
+        writer.writeheader()
         for r in results:
-            by_platform[r.platform].append(r)
-            by_influencer[r.influencer].append(r)
-
-        stats = {
-            "overall": {
-                "count": len(results),
-                "avg_sentiment": statistics.mean([r.sentiment_score for r in results]) if results else 0,
-                "sentiment_distribution": self._count_labels(results),
-                "primary_emotions": self._count_field(results, "primary_emotion"),
-                "rhetorical_modes": self._count_field(results, "rhetorical_mode")
-            },
-            "by_platform": {},
-            "by_influencer": {}
+            writer.writerow({
+                "video_id": r.video_id,
+                "influencer": r.influencer,
+                "platform": r.platform,
+                "sentiment_score": r.sentiment_score,
+                "sentiment_label": r.sentiment_label,
+                "primary_emotion": r.primary_emotion,
+                "secondary_emotion": r.secondary_emotion,
+                "formality": r.formality,
+                "energy_level": r.energy_level,
+                "humor_level": r.humor_level,
+                "rhetorical_mode": r.rhetorical_mode,
+                "authenticity_score": r.authenticity_score,
+                "controversy_potential": r.controversy_potential,
+                "shareability_score": r.shareability_score,
+                "confidence": r.confidence
+            })
+
+    # Aggregate stats
+    _generate_aggregate_stats(results, output_path)
+
+    print(f"\nResults exported to {output_path}")
+    print(f"Total API calls: {api_calls}")
+    if cache:
+        print(cache.summary())
+
+
+def _generate_aggregate_stats(results: List[SentimentResult], output_path: Path):
+    """Generate aggregate sentiment statistics."""
+    from collections import defaultdict
+    import statistics
+
+    # By platform
+    by_platform = defaultdict(list)
+    by_influencer = defaultdict(list)
+
+    for r in results:
+        by_platform[r.platform].append(r)
+        by_influencer[r.influencer].append(r)
+
+    stats = {
+        "overall": {
+            "count": len(results),
+            "avg_sentiment": statistics.mean([r.sentiment_score for r in results]) if results else 0,
+            "sentiment_distribution": _count_labels(results),
+            "primary_emotions": _count_field(results, "primary_emotion"),
+            "rhetorical_modes": _count_field(results, "rhetorical_mode")
+        },
+        "by_platform": {},
+        "by_influencer": {}
+    }
+
+    for platform, items in by_platform.items():
+        stats["by_platform"][platform] = {
+            "count": len(items),
+            "avg_sentiment": statistics.mean([r.sentiment_score for r in items]),
+            "avg_authenticity": statistics.mean([r.authenticity_score for r in items]),
+            "avg_controversy": statistics.mean([r.controversy_potential for r in items])
         }
 
-        for platform, items in by_platform.items():
-            stats["by_platform"][platform] = {
-                "count": len(items),
-                "avg_sentiment": statistics.mean([r.sentiment_score for r in items]),
-                "avg_authenticity": statistics.mean([r.authenticity_score for r in items]),
-                "avg_controversy": statistics.mean([r.controversy_potential for r in items])
-            }
-
-        for influencer, items in by_influencer.items():
-            stats["by_influencer"][influencer] = {
-                "count": len(items),
-                "avg_sentiment": statistics.mean([r.sentiment_score for r in items]),
-                "avg_authenticity": statistics.mean([r.authenticity_score for r in items]),
-                "primary_emotions": self._count_field(items, "primary_emotion")
-            }
-
-        with open(output_path / "sentiment_aggregate_stats.json", "w") as f:
-            json.dump(stats, f, indent=2)
-
-    def _count_labels(self, results: List[SentimentResult]) -> Dict[str, int]:
-        counts = defaultdict(int)
-        for r in results:
-            counts[r.sentiment_label] += 1
-        return dict(counts)
+    for influencer, items in by_influencer.items():
+        stats["by_influencer"][influencer] = {
+            "count": len(items),
+            "avg_sentiment": statistics.mean([r.sentiment_score for r in items]),
+            "avg_authenticity": statistics.mean([r.authenticity_score for r in items]),
+            "primary_emotions": _count_field(items, "primary_emotion")
+        }
 
-    def _count_field(self, results: List[SentimentResult], field: str) -> Dict[str, int]:
-        counts = defaultdict(int)
-        for r in results:
-            counts[getattr(r, field, "unknown")] += 1
-        return dict(sorted(counts.items(), key=lambda x: -x[1])[:10])
+    with open(output_path / "sentiment_aggregate_stats.json", "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+def _count_labels(results: List[SentimentResult]) -> Dict[str, int]:
+    counts = defaultdict(int)
+    for r in results:
+        counts[r.sentiment_label] += 1
+    return dict(counts)
+
+
+def _count_field(results: List[SentimentResult], field: str) -> Dict[str, int]:
+    counts = defaultdict(int)
+    for r in results:
+        counts[getattr(r, field, "unknown")] += 1
+    return dict(sorted(counts.items(), key=lambda x: -x[1])[:10])
 
 
 if __name__ == "__main__":
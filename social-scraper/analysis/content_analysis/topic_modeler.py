@@ -19,6 +19,16 @@ from collections import defaultdict
 import numpy as np
 from tqdm import tqdm
 
+from response_cache import ResponseCache, default_cache
+
+# Part of the response cache key; bump it when the cluster label prompt or its parsing changes
+LABEL_PROMPT_VERSION = "topic_label:1"
+LABEL_MODEL = "gemini-1.5-flash"
+
+# Corpus columns the topic model reads
+COLUMNS = ['post_id', 'influencer_name', 'platform', 'title', 'caption', 'view_count',
+           'like_count', 'comment_count']
+
 
 @dataclass
 class TopicCluster:
@@ -54,11 +64,13 @@ class TopicModeler:
         self,
         embedding_model: str = "text-embedding-3-small",
         openai_api_key: Optional[str] = None,
-        gemini_api_key: Optional[str] = None
+        gemini_api_key: Optional[str] = None,
+        cache: Optional[ResponseCache] = None  # None: the shared default cache, False: no caching
     ):
         self.openai_key = openai_api_key or os.environ.get("OPENAI_API_KEY")
         self.gemini_key = gemini_api_key or os.environ.get("GEMINI_API_KEY")
         self.embedding_model = embedding_model
+        self.cache = default_cache() if cache is None else (cache or None)
 
         # Lazy load heavy dependencies
         self._openai_client = None
@@ -76,7 +88,7 @@ class TopicModeler:
         if self._gemini_model is None:
             import google.generativeai as genai
             genai.configure(api_key=self.gemini_key)
-            self._gemini_model = genai.GenerativeModel("gemini-1.5-flash")
+            self._gemini_model = genai.GenerativeModel(LABEL_MODEL)
         return self._gemini_model
 
     def get_embeddings(
@@ -191,8 +203,9 @@ class TopicModeler:
                 }
                 continue
 
-            # Sample up to 10 items from cluster
-            sample = items[:10] if len(items) <= 10 else np.random.choice(
+            # Sample up to 10 items from cluster, seeded by the cluster so a
+            # rerun renders the same prompt and hits the response cache
+            sample = items[:10] if len(items) <= 10 else np.random.default_rng(cluster_id).choice(
                 items, 10, replace=False
             ).tolist()
 
@@ -214,9 +227,14 @@ Respond with JSON only:
     "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"]
 }}"""
 
+            cached = self.cache.get("gemini", LABEL_MODEL, LABEL_PROMPT_VERSION, prompt) if self.cache else None
+
             try:
-                response = self.gemini_model.generate_content(prompt)
-                text = response.text.strip()
+                if cached is not None:
+                    text = cached
+                else:
+                    response = self.gemini_model.generate_content(prompt)
+                    text = response.text.strip()
 
                 # Handle code blocks
                 if text.startswith("```"):
@@ -225,6 +243,8 @@ Respond with JSON only:
 
                 data = json.loads(text)
                 labeled[cluster_id] = data
+                if cached is None and self.cache:
+                    self.cache.put("gemini", LABEL_MODEL, LABEL_PROMPT_VERSION, prompt, text)
 
             except Exception as e:
                 labeled[cluster_id] = {
@@ -366,6 +386,8 @@ Respond with JSON only:
                 f.write(f"- **Examples:** {cluster.representative_examples[:3]}\n\n")
 
         print(f"\nResults saved to {output_path}")
+        if self.cache:
+            print(self.cache.summary())
 
     def visualize_clusters(
         self,
@@ -429,10 +451,12 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    # Load content data
-    import pandas as pd
+    # Load content data; corpus.py (the shared post loader) lives in analysis/
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from corpus import load_posts
 
-    all_posts = pd.read_csv(Path(args.data_dir) / "all_posts.csv")
+    all_posts = load_posts(args.data_dir, columns=COLUMNS)
 
     content_list = []
     for _, row in all_posts.iterrows():
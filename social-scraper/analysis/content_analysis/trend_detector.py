@@ -11,6 +11,7 @@ Identifies trends, patterns, and temporal dynamics:
 """
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
@@ -20,6 +21,10 @@ import statistics
 import pandas as pd
 import numpy as np
 
+# corpus.py (the shared post loader) lives in analysis/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from corpus import load_posts
+
 
 @dataclass
 class TrendSignal:
@@ -65,6 +70,11 @@ class TemporalPattern:
     low_periods: List[str]
 
 
+# Corpus columns the detector reads
+COLUMNS = ['influencer_name', 'platform', 'title', 'description', 'upload_date', 'view_count',
+           'like_count', 'comment_count']
+
+
 class TrendDetector:
     """Detect trends and temporal patterns in content."""
 
@@ -73,17 +83,8 @@ class TrendDetector:
         self.temporal_patterns: Dict[str, TemporalPattern] = {}
 
     def load_data(self, data_dir: str) -> pd.DataFrame:
-        """Load post data with timestamps."""
-        data_path = Path(data_dir)
-
-        for path in [data_path / "all_posts.csv", data_path / "data" / "all_posts.csv"]:
-            if path.exists():
-                df = pd.read_csv(path)
-                # Parse dates
-                df['upload_date'] = pd.to_datetime(df['upload_date'], errors='coerce')
-                return df
-
-        raise FileNotFoundError(f"Could not find all_posts.csv")
+        """Load post data with timestamps (upload_date comes back as datetime64)."""
+        return load_posts(data_dir, columns=COLUMNS)
 
     def detect_temporal_patterns(
         self,
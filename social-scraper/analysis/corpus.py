@@ -0,0 +1,163 @@
+"""
+Post Corpus
+Typed, columnar table of every consolidated post, written as Parquet
+partitioned by platform, and the shared loader the analyzers read it with
+"""
+
+import shutil
+from pathlib import Path
+from typing import List, Iterable, Optional
+
+import pandas as pd
+
+from post import Post, post_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; without it analyzers read all_posts.csv
+    pa = None
+    pq = None
+
+CORPUS_DIR = 'corpus'
+CSV_NAME = 'all_posts.csv'
+
+# Text columns; missing values load as '' so `title or caption` style
+# fallbacks behave the same for every platform
+TEXT_COLUMNS = ('post_id', 'influencer_name', 'username', 'channel_id', 'shortcode', 'title',
+                'description', 'caption', 'media_type', 'url', 'thumbnail', 'file_path')
+
+# Numeric columns; missing values load as NaN, as they did from the CSV
+NUMBER_COLUMNS = ('timestamp', 'duration_seconds', 'view_count', 'like_count', 'comment_count',
+                  'repost_count', 'video_view_count')
+
+LIST_COLUMNS = ('categories', 'tags')
+
+# Every column of the table, in file order ('platform' is the partition key)
+COLUMNS = ('platform',) + TEXT_COLUMNS + NUMBER_COLUMNS + ('upload_date', 'is_video') + LIST_COLUMNS
+
+
+def corpus_available() -> bool:
+    """Whether pyarrow is installed, so the Parquet corpus can be written and read"""
+    return pq is not None
+
+
+def _schema():
+    """On-disk schema of a platform partition (platform itself is in the path)"""
+    fields = [pa.field(name, pa.string()) for name in TEXT_COLUMNS]
+    fields += [
+        pa.field(name, pa.float64() if name == 'duration_seconds' else pa.int64())
+        for name in NUMBER_COLUMNS
+    ]
+    fields += [
+        pa.field('upload_date', pa.date32()),
+        pa.field('is_video', pa.bool_()),
+    ]
+    fields += [pa.field(name, pa.list_(pa.string())) for name in LIST_COLUMNS]
+    return pa.schema(fields)
+
+
+def _normalize(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """Give every requested column its corpus dtype, adding absent ones as missing"""
+    for name in columns:
+        if name not in df.columns:
+            df[name] = None
+        if name in TEXT_COLUMNS or name == 'platform':
+            df[name] = df[name].astype(object).where(df[name].notna(), '').astype(str)
+        elif name in NUMBER_COLUMNS:
+            df[name] = pd.to_numeric(df[name], errors='coerce').astype('float64')
+        elif name == 'upload_date':
+            df[name] = pd.to_datetime(df[name], errors='coerce').astype('datetime64[ns]')
+        elif name == 'is_video':
+            df[name] = df[name].astype('boolean')
+    return df[list(columns)]
+
+
+def write_corpus(posts: List[Post], data_dir: str) -> Optional[Path]:
+    """
+    Write posts as data_dir/corpus/platform=<name>/posts.parquet.
+
+    The new corpus is built next to the old one and swapped in, so readers
+    never see a half-written table. Returns None (and leaves any old corpus
+    alone) when pyarrow is not installed.
+    """
+    if not corpus_available():
+        print("pyarrow not installed; skipping the Parquet corpus (analyzers will read the CSV)")
+        return None
+    if not posts:
+        print(f"No data to write to the corpus in {data_dir}")
+        return None
+
+    corpus_path = Path(data_dir) / CORPUS_DIR
+    tmp_path = corpus_path.with_name(CORPUS_DIR + '.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    schema = _schema()
+    df = _normalize(pd.DataFrame(post_columns(posts, COLUMNS)), COLUMNS)
+    # CSV and JSON sources can carry stray values; lists are the only shape written
+    for name in LIST_COLUMNS:
+        df[name] = df[name].map(lambda v: list(v) if isinstance(v, (list, tuple)) else None)
+
+    for platform, platform_df in df.groupby('platform', sort=False):
+        table = pa.Table.from_pandas(platform_df.drop(columns='platform'), schema=schema, preserve_index=False)
+        partition = tmp_path / f'platform={platform}'
+        partition.mkdir(parents=True)
+        pq.write_table(table, partition / 'posts.parquet')
+
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(corpus_path, ignore_errors=True)
+    tmp_path.rename(corpus_path)
+    print(f"Wrote {len(df)} posts to {corpus_path}")
+    return corpus_path
+
+
+def find_corpus(data_dir: str) -> Optional[Path]:
+    """Locate the corpus (or all_posts.csv without pyarrow) in data_dir or data_dir/data"""
+    data_path = Path(data_dir)
+    candidates = []
+    if corpus_available():
+        candidates += [data_path / CORPUS_DIR, data_path / 'data' / CORPUS_DIR]
+    candidates += [data_path / CSV_NAME, data_path / 'data' / CSV_NAME]
+
+    for path in candidates:
+        if path.exists():
+            return path
+    return None
+
+
+def load_posts(data_dir: str, columns: Iterable[str] = None,
+               platforms: Iterable[str] = None) -> pd.DataFrame:
+    """
+    Load consolidated posts with consistent dtypes.
+
+    Only `columns` (default: all) are read, and with the Parquet corpus only
+    the partitions of `platforms` (default: all). Parquet files are memory
+    mapped. Without pyarrow or a corpus, all_posts.csv is read instead and
+    given the same dtypes: text as str ('' when missing), counts as float64
+    (NaN when missing) and upload_date as datetime64. categories and tags
+    are lists from Parquet but their string form from the CSV.
+    """
+    path = find_corpus(data_dir)
+    if path is None:
+        raise FileNotFoundError(f"Could not find {CORPUS_DIR}/ or {CSV_NAME} in {data_dir}; run consolidate.py first")
+
+    columns = list(columns or COLUMNS)
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown corpus columns: {', '.join(unknown)}")
+
+    if path.is_dir():
+        filters = [('platform', 'in', list(platforms))] if platforms else None
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+        df = table.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        wanted = set(columns) | ({'platform'} if platforms else set())
+        df = pd.read_csv(path, usecols=[c for c in header if c in wanted],
+                         dtype={c: str for c in TEXT_COLUMNS if c in wanted})
+        if platforms:
+            df = df[df['platform'].isin(list(platforms))].reset_index(drop=True)
+
+    df = _normalize(df, columns)
+    print(f"Loaded {len(df)} posts from {path}")
+    return df
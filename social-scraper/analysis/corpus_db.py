@@ -0,0 +1,443 @@
+"""
+Corpus Database
+Loads posts, engagement snapshots, AI results, transcripts and OCR text into
+one indexed SQLite file, and queries it into DataFrames
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from corpus import COLUMNS as POST_COLUMNS, LIST_COLUMNS
+from metadata_store import load_json, loads_json
+from post import Post
+
+DB_NAME = 'corpus.db'
+ENGAGEMENT_FILE = 'engagement.jsonl'
+
+# Result kind -> the file each ai_results*/<kind>/ run writes
+AI_RESULT_FILES = {
+    'semantic': 'semantic_analysis_full.json',
+    'sentiment': 'sentiment_analysis_full.json',
+}
+VIDEO_RESULTS_GLOB = 'video_results*/batch_*_results.json'
+
+# AI result columns (from SentimentResult / ContentAnalysis); list values are stored as JSON text
+SENTIMENT_COLUMNS = (
+    'sentiment_score', 'sentiment_label', 'joy', 'anger', 'fear', 'sadness', 'surprise', 'disgust',
+    'trust', 'anticipation', 'primary_emotion', 'secondary_emotion', 'formality', 'energy_level',
+    'humor_level', 'sarcasm_detected', 'rhetorical_mode', 'persuasion_techniques',
+    'call_to_action_strength', 'authenticity_score', 'personal_disclosure_level', 'vulnerable_moments',
+    'scripted_vs_spontaneous', 'controversy_potential', 'shareability_score', 'comment_bait_score',
+    'confidence', 'timestamp',
+)
+SEMANTIC_COLUMNS = (
+    'main_topic', 'subtopics', 'content_type', 'content_format', 'nj_relevance_score',
+    'nj_locations_mentioned', 'nj_issues_mentioned', 'local_vs_universal', 'key_messages',
+    'call_to_action', 'narrative_frame', 'tone', 'target_audience', 'assumed_knowledge',
+    'engagement_hooks', 'people_mentioned', 'organizations_mentioned', 'brands_mentioned',
+    'other_creators_mentioned', 'production_quality', 'originality_score', 'analysis_confidence',
+    'timestamp',
+)
+SNAPSHOT_COLUMNS = ('captured_at', 'view_count', 'like_count', 'comment_count', 'repost_count')
+TRANSCRIPT_COLUMNS = ('video_path', 'language', 'word_count', 'duration_seconds', 'speaking_rate_wpm', 'text')
+OCR_COLUMNS = ('video_path', 'frame_count', 'text', 'entities')
+
+# Every table shares these key columns, so any of them joins to posts on (platform, post_id)
+KEY_COLUMNS = ('post_id', 'platform', 'influencer_name')
+
+# Table -> (value columns, date column to index, extra key making a row unique)
+TABLES = {
+    'posts': (tuple(c for c in POST_COLUMNS if c not in KEY_COLUMNS), 'upload_date', None),
+    'engagement_snapshots': (SNAPSHOT_COLUMNS, 'captured_at', None),
+    'semantic_results': (SEMANTIC_COLUMNS, None, 'source'),
+    'sentiment_results': (SENTIMENT_COLUMNS, None, 'source'),
+    'transcripts': (TRANSCRIPT_COLUMNS, None, None),
+    'ocr_text': (OCR_COLUMNS, None, None),
+}
+
+# Per-post result tables; the last row loaded for a post (and AI source) wins
+RESULT_TABLES = ('semantic_results', 'sentiment_results', 'transcripts', 'ocr_text')
+
+# Column types; anything not listed is TEXT
+INTEGER_COLUMNS = {
+    'timestamp', 'view_count', 'like_count', 'comment_count', 'repost_count', 'video_view_count',
+    'is_video', 'sarcasm_detected', 'vulnerable_moments', 'word_count', 'frame_count',
+}
+REAL_COLUMNS = {
+    'duration_seconds', 'sentiment_score', 'joy', 'anger', 'fear', 'sadness', 'surprise', 'disgust',
+    'trust', 'anticipation', 'humor_level', 'authenticity_score', 'controversy_potential',
+    'shareability_score', 'comment_bait_score', 'confidence', 'nj_relevance_score',
+    'originality_score', 'analysis_confidence', 'speaking_rate_wpm',
+}
+
+
+def _column_type(table: str, name: str) -> str:
+    # AI results keep the analysis time as an ISO string, posts a Unix time
+    if name == 'timestamp' and table != 'posts':
+        return 'TEXT'
+    if name in INTEGER_COLUMNS:
+        return 'INTEGER'
+    return 'REAL' if name in REAL_COLUMNS else 'TEXT'
+
+
+def _create_tables() -> str:
+    statements = []
+    for table, (columns, _, unique_key) in TABLES.items():
+        extra = (unique_key,) if unique_key else ()
+        defs = [f"{name} TEXT NOT NULL" for name in KEY_COLUMNS + extra]
+        defs += [f"{name} {_column_type(table, name)}" for name in columns]
+        if table in RESULT_TABLES:
+            defs.append(f"UNIQUE ({', '.join(('platform', 'post_id') + extra)})")
+        statements.append(f"CREATE TABLE {table} (" + ", ".join(defs) + ");")
+    return "\n".join(statements)
+
+
+def _create_indexes() -> str:
+    """Post id, influencer and date indexes (result tables get (platform, post_id) from UNIQUE)"""
+    statements = ["CREATE INDEX idx_posts_platform_post ON posts (platform, post_id);"]
+    for table, (_, date_column, _) in TABLES.items():
+        statements.append(f"CREATE INDEX idx_{table}_post ON {table} (post_id);")
+        statements.append(f"CREATE INDEX idx_{table}_influencer ON {table} (influencer_name, platform);")
+        if date_column:
+            statements.append(f"CREATE INDEX idx_{table}_date ON {table} (platform, {date_column});")
+    return "\n".join(statements)
+
+
+# Columns holding lists or dicts, stored as JSON text
+JSON_COLUMNS = set(LIST_COLUMNS) | {
+    'persuasion_techniques', 'subtopics', 'nj_locations_mentioned', 'nj_issues_mentioned',
+    'key_messages', 'engagement_hooks', 'people_mentioned', 'organizations_mentioned',
+    'brands_mentioned', 'other_creators_mentioned', 'entities',
+}
+
+
+def _rows(records: Iterable[Dict[str, Any]], keys: Tuple[str, ...],
+          columns: Tuple[str, ...]) -> Iterator[List[Any]]:
+    """Key columns as text ('' when unknown), then the values as stored"""
+    encoded = [i for i, name in enumerate(columns, len(keys)) if name in JSON_COLUMNS]
+    for record in records:
+        get = record.get
+        row = ['' if get(name) is None else str(get(name)) for name in keys] + [get(name) for name in columns]
+        for i in encoded:
+            if isinstance(row[i], (list, tuple, dict)):
+                row[i] = json.dumps(row[i], ensure_ascii=False)
+        yield row
+
+
+def _insert(conn: sqlite3.Connection, table: str, records: Iterable[Dict[str, Any]]) -> None:
+    """Insert records into a table, replacing earlier rows for the same post"""
+    columns, _, unique_key = TABLES[table]
+    keys = KEY_COLUMNS + ((unique_key,) if unique_key else ())
+    names = keys + columns
+    verb = 'INSERT OR REPLACE' if table in RESULT_TABLES else 'INSERT'
+    sql = f"{verb} INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+    conn.executemany(sql, _rows(records, keys, columns))
+
+
+def iter_snapshots(output_dir: str) -> Iterator[Dict[str, Any]]:
+    """Engagement snapshots from every output/<influencer>/<platform>/engagement.jsonl"""
+    for path in sorted(Path(output_dir).glob(f'*/*/{ENGAGEMENT_FILE}')):
+        platform = path.parent.name
+        influencer_name = path.parent.parent.name
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = loads_json(line)
+                except ValueError:
+                    continue  # torn final write
+                if record.get('id') is None:
+                    continue
+                yield {**record, 'post_id': record['id'], 'platform': platform,
+                       'influencer_name': influencer_name}
+
+
+def iter_ai_results(results_dir: str, kind: str) -> Iterator[Dict[str, Any]]:
+    """
+    Semantic or sentiment results from every analysis/ai_results*/<kind>/ run.
+
+    Each run directory (ai_results, ai_results_gemini, ...) is kept as the
+    row's `source`, so results of different providers sit side by side.
+    Batch results that nest the emotions are flattened like the realtime ones.
+    """
+    for path in sorted(Path(results_dir).glob(f'ai_results*/{kind}/{AI_RESULT_FILES[kind]}')):
+        try:
+            results = load_json(str(path))
+        except ValueError as e:
+            print(f"Skipping unreadable {path}: {e}")
+            continue
+        source = path.parent.parent.name
+        for result in results:
+            if not isinstance(result, dict) or not result.get('video_id'):
+                continue
+            record = {**result.get('emotions', {}), **result}
+            record.update({
+                'post_id': result['video_id'],
+                'platform': result.get('platform'),
+                'influencer_name': result.get('influencer'),
+                'source': source,
+            })
+            yield record
+
+
+def iter_video_results(results_dir: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    (transcript, OCR) records from the video pipeline's batch_*_results.json
+    files in every analysis/video_results*/ directory.
+
+    Videos are named by post id, and sit in output/<influencer>/<platform>/.
+    Either record is None when that stage has no output for the video.
+    """
+    for path in sorted(Path(results_dir).glob(VIDEO_RESULTS_GLOB)):
+        try:
+            results = load_json(str(path))
+        except ValueError as e:
+            print(f"Skipping unreadable {path}: {e}")
+            continue
+        for result in results:
+            video_path = Path(result.get('video_path', ''))
+            if not video_path.name:
+                continue
+            keys = {
+                'post_id': result.get('video_name') or video_path.stem,
+                'platform': video_path.parent.name,
+                'influencer_name': result.get('influencer') or video_path.parent.parent.name,
+                'video_path': str(video_path),
+            }
+            transcript = result.get('transcript')
+            ocr = result.get('ocr')
+            yield (
+                {**keys, **(transcript.get('stats') or {}), 'text': transcript.get('text')} if transcript else None,
+                {**keys, 'frame_count': ocr.get('frame_count'), 'text': ocr.get('unique_text'),
+                 'entities': ocr.get('entities')} if ocr else None,
+            )
+
+
+def source_files(output_dir: str = None, results_dir: str = None) -> List[Path]:
+    """The snapshot, AI result and video result files a build reads, besides the posts"""
+    paths = []
+    if output_dir:
+        paths += Path(output_dir).glob(f'*/*/{ENGAGEMENT_FILE}')
+    if results_dir:
+        for kind, filename in AI_RESULT_FILES.items():
+            paths += Path(results_dir).glob(f'ai_results*/{kind}/{filename}')
+        paths += Path(results_dir).glob(VIDEO_RESULTS_GLOB)
+    return sorted(paths)
+
+
+def sources_stamp(output_dir: str = None, results_dir: str = None) -> str:
+    """Path, size and mtime of every source file; changes when one is added, edited or removed"""
+    stamp = []
+    for path in source_files(output_dir, results_dir):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        stamp.append([str(path), stat.st_size, stat.st_mtime_ns])
+    return json.dumps(stamp)
+
+
+def corpus_db_current(data_dir: str, output_dir: str = None, results_dir: str = None) -> bool:
+    """
+    Whether data_dir/corpus.db was built from the source files as they are
+    now. The posts are not checked; the manifest tracks those.
+    """
+    db_path = Path(data_dir) / DB_NAME
+    if not db_path.exists():
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM build_info WHERE key = 'sources'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False  # built before the stamp was recorded
+    return row is not None and row[0] == sources_stamp(output_dir, results_dir)
+
+
+def build_corpus_db(posts: List[Post], data_dir: str, output_dir: str = None,
+                    results_dir: str = None) -> Path:
+    """
+    Write data_dir/corpus.db from posts and whatever results exist on disk.
+
+    Snapshots are read from output_dir, and AI results, transcripts and OCR
+    from the ai_results*/ and video_results*/ directories in results_dir
+    (the analysis directory); either is skipped when not given. Where
+    directories overlap, the last one in name order wins. The database is
+    built next to the old one and swapped in, so readers never see a
+    half-built file. The source files' stamp is stored with it for
+    corpus_db_current.
+    """
+    db_path = Path(data_dir) / DB_NAME
+    # Taken before reading, so a file changed mid-build is picked up next run
+    stamp = sources_stamp(output_dir, results_dir)
+    tmp_path = db_path.with_suffix('.db.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Nothing reads the file until it is swapped in, so skip the journal
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(_create_tables())
+        conn.execute("CREATE TABLE build_info (key TEXT PRIMARY KEY, value TEXT)")
+        with conn:
+            conn.execute("INSERT INTO build_info VALUES ('sources', ?)", (stamp,))
+            _insert(conn, 'posts', (post.to_dict() for post in posts))
+            if output_dir:
+                _insert(conn, 'engagement_snapshots', iter_snapshots(output_dir))
+            if results_dir:
+                for kind in ('semantic', 'sentiment'):
+                    _insert(conn, f'{kind}_results', iter_ai_results(results_dir, kind))
+                transcripts, ocr = [], []
+                for transcript, ocr_record in iter_video_results(results_dir):
+                    if transcript:
+                        transcripts.append(transcript)
+                    if ocr_record:
+                        ocr.append(ocr_record)
+                _insert(conn, 'transcripts', transcripts)
+                _insert(conn, 'ocr_text', ocr)
+
+        # Indexes are cheaper to build once the rows are in
+        conn.executescript(_create_indexes())
+
+        # Batch AI results may lack the platform and influencer; take them from the post
+        with conn:
+            for table in ('semantic_results', 'sentiment_results'):
+                conn.execute(f"""
+                    UPDATE OR IGNORE {table} SET
+                        platform = COALESCE((SELECT p.platform FROM posts p
+                                             WHERE p.post_id = {table}.post_id LIMIT 1), ''),
+                        influencer_name = COALESCE((SELECT p.influencer_name FROM posts p
+                                                    WHERE p.post_id = {table}.post_id LIMIT 1), '')
+                    WHERE platform = '' AND influencer_name = ''
+                """)
+
+        conn.execute("ANALYZE")
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    print(f"Wrote {db_path}: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+    return db_path
+
+
+class CorpusDB:
+    """
+    Read-only queries over corpus.db, returned as DataFrames.
+
+    Every table has post_id, platform and influencer_name, and joins to
+    posts on (platform, post_id). Dates are ISO strings, so they compare and
+    sort as text. Missing post text is '', as from load_posts, and list
+    fields are JSON text (readable with json_each). For example, sentiment
+    vs. views of NJ-relevant TikToks posted in March 2025:
+
+        db.query('''
+            SELECT p.post_id, p.view_count, s.sentiment_score
+            FROM posts p
+            JOIN sentiment_results s USING (platform, post_id)
+            JOIN semantic_results m USING (platform, post_id)
+            WHERE p.platform = 'tiktok' AND m.nj_relevance_score >= 0.5
+              AND p.upload_date BETWEEN '2025-03-01' AND '2025-03-31'
+        ''')
+    """
+
+    def __init__(self, path: str):
+        path = Path(path)
+        self.path = path / DB_NAME if path.is_dir() else path
+        if not self.path.exists():
+            raise FileNotFoundError(f"Could not find {self.path}; run consolidate.py first")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> pd.DataFrame:
+        """Run a SELECT with ? placeholders"""
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=tuple(params))
+
+    def tables(self) -> Dict[str, int]:
+        """Row count of each table"""
+        with self._connect() as conn:
+            return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+
+    @staticmethod
+    def _where(alias: str, platform: Optional[str], influencer: Optional[str],
+               start: Optional[str], end: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if platform:
+            clauses.append(f"{alias}.platform = ?")
+            params.append(platform)
+        if influencer:
+            clauses.append(f"{alias}.influencer_name = ?")
+            params.append(influencer)
+        if start:
+            clauses.append(f"{alias}.upload_date >= ?")
+            params.append(str(start))
+        if end:
+            clauses.append(f"{alias}.upload_date <= ?")
+            params.append(str(end))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def posts(self, platform: str = None, influencer: str = None, start: str = None, end: str = None,
+              columns: Iterable[str] = None) -> pd.DataFrame:
+        """Posts filtered by platform, influencer and upload date range (inclusive, YYYY-MM-DD)"""
+        select = ", ".join(f"p.{c}" for c in columns) if columns else "p.*"
+        where, params = self._where('p', platform, influencer, start, end)
+        return self.query(f"SELECT {select} FROM posts p{where}", params)
+
+    def results(self, table: str, platform: str = None, influencer: str = None, start: str = None,
+                end: str = None, source: str = None) -> pd.DataFrame:
+        """
+        Rows of a result table with the post's upload date and counts.
+
+        Filters apply to the post, as in posts(); source limits AI results
+        to one run directory (e.g. 'ai_results_gemini').
+        """
+        if table not in RESULT_TABLES + ('engagement_snapshots',):
+            raise ValueError(f"Unknown result table: {table}")
+        where, params = self._where('p', platform, influencer, start, end)
+        if source:
+            where += (" AND " if where else " WHERE ") + "r.source = ?"
+            params.append(source)
+        post_columns = ", ".join(f"p.{c} AS post_{c}" if c in TABLES[table][0] else f"p.{c}"
+                                 for c in ('upload_date', 'view_count', 'like_count', 'comment_count'))
+        return self.query(
+            f"SELECT r.*, {post_columns} FROM {table} r "
+            f"JOIN posts p ON p.platform = r.platform AND p.post_id = r.post_id{where}",
+            params,
+        )
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from corpus import load_posts
+
+    parser = argparse.ArgumentParser(description="Rebuild corpus.db from consolidated posts and analysis results")
+    parser.add_argument("--output-dir", "-o", default="../output", help="Path to scraped output directory")
+    parser.add_argument("--data-dir", default=str(Path(__file__).parent / 'data'),
+                        help="Directory with the consolidated posts")
+    args = parser.parse_args()
+
+    posts_df = load_posts(args.data_dir)
+    for name in LIST_COLUMNS:
+        posts_df[name] = posts_df[name].map(lambda v: list(v) if v is not None and not isinstance(v, str) else v)
+    posts_df['upload_date'] = posts_df['upload_date'].dt.strftime('%Y-%m-%d')
+    records = posts_df.astype(object).where(posts_df.notna(), None).to_dict('records')
+    build_corpus_db([Post.from_dict(record) for record in records], args.data_dir, args.output_dir, str(Path(__file__).parent))
@@ -0,0 +1,56 @@
+"""
+Info JSON Key Extractor
+Reads selected top-level keys from yt-dlp .info.json files without building
+the large nested values (formats, thumbnails, captions, heatmap)
+"""
+
+from typing import Dict, Any, Iterable
+
+from metadata_store import load_json
+
+try:
+    import simdjson
+except ImportError:  # optional (pysimdjson), load_json decodes the whole file without it
+    simdjson = None
+
+# One parser per process; it reuses its buffers across documents
+_parser = simdjson.Parser() if simdjson is not None else None
+
+
+def _to_python(value: Any) -> Any:
+    """Turn a simdjson proxy into a dict or list, leaving scalars as they are"""
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def load_info(json_path: str, keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Read the given top-level keys from an .info.json file.
+
+    With pysimdjson installed the file is parsed into simdjson's own tape and
+    only the wanted values become Python objects; formats, thumbnails,
+    automatic_captions and heatmap are never built. Without it the file is
+    fully decoded by load_json. Keys that are missing are absent from the
+    result either way, as with dict.get on a full parse.
+
+    Raises:
+        ValueError: The file is not a JSON object
+    """
+    if _parser is None:
+        data = load_json(json_path)
+        if not isinstance(data, dict):
+            raise ValueError(f"Expecting a JSON object in {json_path}")
+        return {key: data[key] for key in keys if key in data}
+
+    with open(json_path, 'rb') as f:
+        doc = _parser.parse(f.read())
+    if not isinstance(doc, simdjson.Object):
+        raise ValueError(f"Expecting a JSON object in {json_path}")
+
+    # Copy everything out before the next parse reuses the parser's buffers
+    found = {key: _to_python(doc[key]) for key in keys if key in doc}
+    del doc
+    return found
@@ -3,17 +3,21 @@ Instagram Data Parser
 Parses instaloader JSON metadata from Instagram posts
 """
 
-import json
 import os
 from pathlib import Path
-from typing import Dict, List, Any
-from datetime import datetime
+from typing import Dict, List, Any, Tuple
+from datetime import datetime, timezone
 
+from metadata_store import load_json, read_metadata, has_fields
+from post import Post, count
 
-def parse_instagram_post(json_path: str) -> Dict[str, Any]:
+# Fields a metadata.jsonl record needs to stand in for the post's JSON file
+RECORD_FIELDS = ('shortcode', 'id', 'owner_username', 'date', 'display_url')
+
+
+def parse_instagram_post(json_path: str) -> Post:
     """Parse a single Instagram JSON file from instaloader"""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(json_path)
 
     # Instaloader wraps data in 'node' key
     node = data.get('node', data)
@@ -56,48 +60,116 @@ def parse_instagram_post(json_path: str) -> Dict[str, Any]:
     # Get video view count if available
     video_view_count = node.get('video_view_count', 0) if is_video else 0
 
-    return {
-        'platform': 'instagram',
-        'post_id': node.get('id', '') or node.get('shortcode', ''),
-        'shortcode': node.get('shortcode', ''),
-        'username': node.get('owner', {}).get('username', ''),
-        'caption': caption,
-        'like_count': like_count,
-        'comment_count': comment_count,
-        'video_view_count': video_view_count,
-        'media_type': media_type,
-        'is_video': is_video,
-        'timestamp': timestamp,
-        'upload_date': date.strftime('%Y-%m-%d') if date else '',
-        'url': f"https://www.instagram.com/p/{node.get('shortcode', '')}/",
-        'thumbnail': node.get('display_url', ''),
-        'file_path': json_path
+    return Post(
+        'instagram',
+        post_id=node.get('id', '') or node.get('shortcode', ''),
+        shortcode=node.get('shortcode', ''),
+        username=node.get('owner', {}).get('username', ''),
+        caption=caption,
+        like_count=count(like_count),
+        comment_count=count(comment_count),
+        video_view_count=count(video_view_count),
+        media_type=media_type,
+        is_video=is_video,
+        timestamp=timestamp,
+        upload_date=date.strftime('%Y-%m-%d') if date else '',
+        url=f"https://www.instagram.com/p/{node.get('shortcode', '')}/",
+        thumbnail=node.get('display_url', ''),
+        file_path=json_path
+    )
+
+
+def instagram_post_from_record(record: Dict[str, Any], json_path: str) -> Post:
+    """Build a post from a scraper metadata.jsonl record"""
+    date_utc = datetime.fromisoformat(record['date']).replace(tzinfo=timezone.utc)
+    timestamp = int(date_utc.timestamp())
+    date = datetime.fromtimestamp(timestamp)
+
+    typename = record.get('typename', '')
+    is_video = bool(record.get('is_video')) or typename == 'GraphVideo'
+    media_type = 'video' if is_video else 'image'
+    if typename == 'GraphSidecar':
+        media_type = 'carousel'
+
+    return Post(
+        'instagram',
+        post_id=record.get('id', '') or record.get('shortcode', ''),
+        shortcode=record.get('shortcode', ''),
+        username=record.get('owner_username', ''),
+        caption=record.get('caption') or '',
+        like_count=count(record.get('likes', 0)),
+        comment_count=count(record.get('comments', 0)),
+        video_view_count=count(record.get('video_view_count', 0)) if is_video else 0,
+        media_type=media_type,
+        is_video=is_video,
+        timestamp=timestamp,
+        upload_date=date.strftime('%Y-%m-%d'),
+        url=f"https://www.instagram.com/p/{record.get('shortcode', '')}/",
+        thumbnail=record.get('display_url', ''),
+        file_path=json_path
+    )
+
+
+def is_post_json(filename: str) -> bool:
+    """
+    Whether a file in an Instagram directory is a post's JSON ({date_utc}_UTC.json),
+    rather than the scraper's metadata.json or cursor.json, or instaloader's
+    comments or profile JSON
+    """
+    return filename.endswith('_UTC.json')
+
+
+def _record_filename(record: Dict[str, Any]) -> str:
+    """Name of the JSON file instaloader writes for a post ({date_utc}_UTC.json)"""
+    date_utc = datetime.fromisoformat(record['date'])
+    return date_utc.strftime('%Y-%m-%d_%H-%M-%S') + '_UTC.json'
+
+
+def parse_instagram_files(platform_dir: str, filenames: List[str], influencer_name: str) -> Tuple[List[Post], List[str]]:
+    """Parse the given post JSON files of one Instagram directory, returning posts and per-file errors"""
+    posts = []
+    errors = []
+
+    # metadata.jsonl already holds the fields we need, so only posts missing
+    # from it require parsing their JSON file
+    by_filename = {
+        _record_filename(r): r
+        for r in read_metadata(platform_dir, key='shortcode').values()
+        if has_fields(r, RECORD_FIELDS)
     }
 
+    for filename in filenames:
+        json_file = Path(platform_dir) / filename
+        try:
+            record = by_filename.get(filename)
+            if record:
+                post = instagram_post_from_record(record, str(json_file))
+            else:
+                post = parse_instagram_post(str(json_file))
+            post.influencer_name = influencer_name
+            posts.append(post)
+        except Exception as e:
+            errors.append(f"Error parsing {json_file}: {e}")
+
+    return posts, errors
+
 
-def parse_influencer_instagram(influencer_dir: str, influencer_name: str) -> List[Dict[str, Any]]:
+def parse_influencer_instagram(influencer_dir: str, influencer_name: str) -> List[Post]:
     """Parse all Instagram posts for an influencer"""
     instagram_dir = Path(influencer_dir) / 'instagram'
-    posts = []
 
     if not instagram_dir.exists():
-        return posts
+        return []
 
-    # Skip metadata.json, only process post JSON files
-    for json_file in instagram_dir.glob('*.json'):
-        if json_file.name == 'metadata.json':
-            continue
-        try:
-            post = parse_instagram_post(str(json_file))
-            post['influencer_name'] = influencer_name
-            posts.append(post)
-        except Exception as e:
-            print(f"Error parsing {json_file}: {e}")
+    filenames = [p.name for p in instagram_dir.glob('*.json') if is_post_json(p.name)]
+    posts, errors = parse_instagram_files(str(instagram_dir), filenames, influencer_name)
+    for error in errors:
+        print(error)
 
     return posts
 
 
-def parse_all_instagram(output_dir: str) -> List[Dict[str, Any]]:
+def parse_all_instagram(output_dir: str) -> List[Post]:
     """Parse all Instagram data from output directory"""
     output_path = Path(output_dir)
     all_posts = []
@@ -112,18 +184,18 @@ def parse_all_instagram(output_dir: str) -> List[Dict[str, Any]]:
     return all_posts
 
 
-def get_instagram_stats(posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+def get_instagram_stats(posts: List[Post]) -> Dict[str, Any]:
     """Calculate aggregate statistics for Instagram posts"""
     if not posts:
         return {}
 
-    total_likes = sum(p.get('like_count', 0) or 0 for p in posts)
-    total_comments = sum(p.get('comment_count', 0) or 0 for p in posts)
-    total_video_views = sum(p.get('video_view_count', 0) or 0 for p in posts)
+    total_likes = sum(p.like_count or 0 for p in posts)
+    total_comments = sum(p.comment_count or 0 for p in posts)
+    total_video_views = sum(p.video_view_count or 0 for p in posts)
 
-    videos = [p for p in posts if p.get('is_video')]
-    images = [p for p in posts if not p.get('is_video') and p.get('media_type') != 'carousel']
-    carousels = [p for p in posts if p.get('media_type') == 'carousel']
+    videos = [p for p in posts if p.is_video]
+    images = [p for p in posts if not p.is_video and p.media_type != 'carousel']
+    carousels = [p for p in posts if p.media_type == 'carousel']
 
     return {
         'total_posts': len(posts),
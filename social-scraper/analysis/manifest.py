@@ -0,0 +1,158 @@
+"""
+Consolidation Manifest
+Remembers the posts parsed from each metadata file so re-runs only parse
+new or changed files
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
+
+from metadata_store import load_json
+from post import FIELDS, Post
+
+# 2: posts stored as rows in post.FIELDS order
+MANIFEST_VERSION = 2
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class Manifest:
+    """
+    Map of post file path -> (size, mtime, content hash, parsed post rows).
+
+    A file whose size and mtime are unchanged is trusted without reading it.
+    If only the mtime moved (e.g. the file was re-downloaded), its hash
+    decides whether the stored rows are still valid. Files that failed to
+    parse are not recorded, so they are retried on the next run.
+
+    `changed` is set when the posts differ from the saved manifest (a file
+    added, removed or with new contents); `dirty` whenever the manifest
+    itself needs saving, e.g. a touched file's new mtime.
+    """
+
+    def __init__(self, path: str, output_dir: str):
+        self.path = Path(path)
+        self.output_dir = str(output_dir)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.changed = False
+        self.dirty = False
+
+        if self.path.exists():
+            try:
+                data = load_json(str(self.path))
+            except ValueError:
+                print(f"Ignoring unreadable manifest {self.path}")
+                data = {}
+            # A manifest built for another output tree or post schema has nothing to offer
+            if (data.get('version') == MANIFEST_VERSION and data.get('output_dir') == self.output_dir
+                    and data.get('fields') == list(FIELDS)):
+                self.files = data.get('files', {})
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def plan(self, tasks: List[Tuple[str, str, str, List[str]]]) -> List[Tuple[str, str, str, List[str]]]:
+        """
+        Compare scanned files to the manifest and return the tasks that still need parsing.
+
+        Tasks are the (platform, platform_dir, influencer_name, filenames)
+        tuples from consolidate.scan_output; the returned ones keep only the
+        new or changed files. Entries for files no longer on disk are dropped.
+        """
+        seen = set()
+        pending = []
+
+        for platform, platform_dir, influencer_name, filenames in tasks:
+            stale = []
+            for filename in filenames:
+                path = os.path.join(platform_dir, filename)
+                seen.add(path)
+                if not self._is_current(path, influencer_name):
+                    stale.append(filename)
+            if stale:
+                pending.append((platform, platform_dir, influencer_name, stale))
+
+        removed = [path for path in self.files if path not in seen]
+        for path in removed:
+            del self.files[path]
+        if removed:
+            self.changed = True
+            self.dirty = True
+
+        return pending
+
+    def _is_current(self, path: str, influencer_name: str) -> bool:
+        entry = self.files.get(path)
+        if entry is None or entry['influencer_name'] != influencer_name:
+            return False
+
+        stat = os.stat(path)
+        if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        if stat.st_size == entry['size'] and file_hash(path) == entry['sha256']:
+            # Same contents, so the posts stand; only the mtime is new
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self.dirty = True
+            return True
+        return False
+
+    def record(self, platform_dir: str, filenames: List[str], influencer_name: str,
+               posts: List[Post]) -> None:
+        """Store the posts parsed from a task's files (files with no posts had errors)"""
+        by_path = {}
+        for post in posts:
+            # Lists, as rows read back from the saved JSON are, so they compare equal
+            by_path.setdefault(post.file_path, []).append(list(post.to_row()))
+
+        for filename in filenames:
+            path = os.path.join(platform_dir, filename)
+            if path not in by_path:
+                if self.files.pop(path, None) is not None:
+                    self.changed = self.dirty = True
+                continue
+            stat = os.stat(path)
+            entry = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': file_hash(path),
+                'influencer_name': influencer_name,
+                'posts': by_path[path],
+            }
+            old = self.files.get(path)
+            if old is None or any(old[key] != entry[key] for key in ('sha256', 'influencer_name', 'posts')):
+                self.changed = True
+            self.files[path] = entry
+            self.dirty = True
+
+    def posts(self, tasks: List[Tuple[str, str, str, List[str]]]) -> List[Post]:
+        """All recorded posts, in the order of the scanned tasks"""
+        all_posts = []
+        for _, platform_dir, _, filenames in tasks:
+            for filename in filenames:
+                entry = self.files.get(os.path.join(platform_dir, filename))
+                if entry:
+                    all_posts.extend(Post.from_row(row) for row in entry['posts'])
+        return all_posts
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'output_dir': self.output_dir,
+                'fields': list(FIELDS),
+                'files': self.files,
+            }, f)
+        tmp_path.replace(self.path)
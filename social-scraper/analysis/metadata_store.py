@@ -0,0 +1,59 @@
+"""
+Metadata Store Reader
+Reads the append-only metadata.jsonl files written by the scrapers
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterable
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up decoding
+    orjson = None
+
+
+def load_json(path: str) -> Any:
+    """Decode a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def loads_json(text: str) -> Any:
+    """Decode a JSON string, with orjson when it is installed."""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def read_metadata(platform_dir: str, key: str = 'id') -> Dict[str, Dict[str, Any]]:
+    """
+    Load a platform directory's metadata.jsonl keyed by post id.
+
+    The last record for an id wins. Lines that don't parse (e.g. a torn
+    final write) are skipped. Returns an empty dict if there is no store.
+    """
+    path = Path(platform_dir) / 'metadata.jsonl'
+    records = {}
+
+    if not path.exists():
+        return records
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = loads_json(line)
+            except ValueError:
+                continue
+            if record.get(key) is not None:
+                records[str(record[key])] = record
+
+    return records
+
+
+def has_fields(record: Dict[str, Any], fields: Iterable[str]) -> bool:
+    """Check that a record was written with every field a parser needs."""
+    return all(field in record for field in fields)
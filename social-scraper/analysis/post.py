@@ -0,0 +1,102 @@
+"""
+Post Record
+The one record type the platform parsers build, with a fixed set of fields
+"""
+
+from operator import attrgetter
+from typing import Dict, List, Any, Iterable, Optional
+
+# Every post field, in corpus column order
+FIELDS = ('platform', 'post_id', 'influencer_name', 'username', 'channel_id', 'shortcode', 'title',
+          'description', 'caption', 'media_type', 'url', 'thumbnail', 'file_path', 'timestamp',
+          'duration_seconds', 'view_count', 'like_count', 'comment_count', 'repost_count',
+          'video_view_count', 'upload_date', 'is_video', 'categories', 'tags')
+
+# The fields each platform fills in; the others stay None (not the platform's
+# to have, as opposed to 0 or ''), and are left out of to_dict()
+PLATFORM_FIELDS = {
+    'tiktok': ('platform', 'post_id', 'username', 'channel_id', 'title', 'description',
+               'duration_seconds', 'view_count', 'like_count', 'comment_count', 'repost_count',
+               'timestamp', 'upload_date', 'url', 'thumbnail', 'file_path', 'influencer_name'),
+    'youtube': ('platform', 'post_id', 'username', 'channel_id', 'title', 'description',
+                'duration_seconds', 'view_count', 'like_count', 'comment_count', 'timestamp',
+                'upload_date', 'url', 'thumbnail', 'categories', 'tags', 'file_path', 'influencer_name'),
+    'instagram': ('platform', 'post_id', 'shortcode', 'username', 'caption', 'like_count',
+                  'comment_count', 'video_view_count', 'media_type', 'is_video', 'timestamp',
+                  'upload_date', 'url', 'thumbnail', 'file_path', 'influencer_name'),
+}
+
+_row_of = attrgetter(*FIELDS)
+
+
+def count(value: Any) -> Optional[int]:
+    """A scraped count as an int; a null count stays None (an empty CSV cell)"""
+    return None if value is None else int(value)
+
+
+class Post:
+    """
+    One parsed post.
+
+    Slotted, so a post costs a fixed handful of pointers instead of a dict,
+    and every field exists on every post. Counts are ints, or None where the
+    scraped data had a null count, so sums still need `or 0`. Posts compare
+    by value and, being mutable, are unhashable.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, platform: str, **fields):
+        for name in FIELDS:
+            setattr(self, name, None)
+        self.platform = platform
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    @property
+    def views(self) -> int:
+        """Video views on any platform (Instagram reports them as video_view_count)"""
+        return (self.video_view_count if self.platform == 'instagram' else self.view_count) or 0
+
+    @property
+    def text(self) -> str:
+        """The post's own words: the caption on Instagram, the title elsewhere"""
+        return (self.caption if self.platform == 'instagram' else self.title) or ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The platform's fields as a dict (the row written to the platform CSVs)"""
+        fields = PLATFORM_FIELDS.get(self.platform, FIELDS)
+        return {name: getattr(self, name) for name in fields}
+
+    def to_row(self) -> tuple:
+        """All fields as a tuple in FIELDS order, the compact form stored in the manifest"""
+        return _row_of(self)
+
+    @classmethod
+    def from_row(cls, row: Iterable[Any]) -> 'Post':
+        post = cls.__new__(cls)
+        for name, value in zip(FIELDS, row):
+            setattr(post, name, value)
+        return post
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> 'Post':
+        """A post from a dict with FIELDS keys (e.g. a corpus row); other keys are ignored"""
+        return cls(**{name: record[name] for name in FIELDS if name in record})
+
+    def __reduce__(self):
+        # Pickled as one tuple (pool workers send posts back this way)
+        return Post.from_row, (self.to_row(),)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Post) and self.to_row() == other.to_row()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Post({self.platform!r}, post_id={self.post_id!r}, influencer_name={self.influencer_name!r})"
+
+
+def post_columns(posts: List[Post], fields: Iterable[str] = FIELDS) -> Dict[str, List[Any]]:
+    """Posts as a dict of column lists, ready for a DataFrame or Arrow table"""
+    return {name: list(map(attrgetter(name), posts)) for name in fields}
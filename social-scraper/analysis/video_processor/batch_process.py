@@ -20,11 +20,15 @@ Usage:
 
     # Skip transcription (frames/OCR only)
     python batch_process.py /path/to/output --skip-transcription
+
+    # Process videos as the scraper downloads them (python main.py --queue)
+    python batch_process.py /path/to/output --queue
 """
 
 import os
 import sys
 import json
+import time
 import argparse
 from pathlib import Path
 from datetime import datetime
@@ -39,6 +43,57 @@ from video_processor.transcriber import transcribe_with_speedup, export_to_srt,
 from video_processor.frame_extractor import extract_frames
 from video_processor.ocr_processor import process_frames_ocr, deduplicate_text, extract_entities
 
+# The scrapers' work queue and media store only need the standard library, so
+# they are imported directly rather than through the scrapers package (which
+# needs instaloader and yt-dlp)
+SCRAPERS_DIR = Path(__file__).parent.parent.parent / "scrapers"
+
+
+def _use_scraper_modules():
+    if str(SCRAPERS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRAPERS_DIR))
+
+
+def open_media_store(output_dir: str):
+    """Open the scraper's media store index, if the output directory has one."""
+    _use_scraper_modules()
+    from media_store import MediaStore, media_store_path
+
+    root = media_store_path(output_dir)
+    return MediaStore(root) if (root / "index.db").exists() else None
+
+
+def media_key(video_path: str, media_store=None) -> str:
+    """
+    Identify a video's content.
+
+    Uses the media store digest when the video was ingested, otherwise the
+    file's inode (links to the same blob share one).
+    """
+    digest = media_store.digest_for(video_path) if media_store else None
+    if digest:
+        return digest
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return str(video_path)
+    return f"inode:{stat.st_dev}:{stat.st_ino}"
+
+
+def share_result(result: Dict[str, Any], video_path: str, influencer: str) -> Dict[str, Any]:
+    """Copy a processed video's result to another post using the same media."""
+    shared = dict(result)
+    shared.update({
+        "video_path": str(video_path),
+        "video_name": Path(video_path).stem,
+        "influencer": influencer,
+        "shared_from": result["video_path"]
+    })
+    if isinstance(shared.get("ocr"), dict):
+        # The OCR cost was paid once, by the original
+        shared["ocr"] = {**shared["ocr"], "gemini_calls": 0, "estimated_cost": 0}
+    return shared
+
 
 def find_platform_videos(
     output_dir: str,
@@ -245,6 +300,10 @@ def batch_process(
     results_path = Path(results_dir)
     results_path.mkdir(parents=True, exist_ok=True)
 
+    # Identical videos (e.g. cross-posts) are processed once
+    media_store = open_media_store(output_dir)
+    processed = {}
+
     # Process in batches
     all_results = []
     batch_num = 0
@@ -262,8 +321,6 @@ def batch_process(
         print(f"{'='*60}")
 
         batch_results = []
-        batch_gemini_calls = 0
-        batch_cost = 0.0
 
         for video_info in tqdm(batch, desc=f"Batch {batch_num}"):
             video_path = video_info["path"]
@@ -272,6 +329,11 @@ def batch_process(
             # Output directory for this video
             video_output = results_path / influencer
 
+            key = media_key(video_path, media_store)
+            if key in processed:
+                batch_results.append(share_result(processed[key], video_path, influencer))
+                continue
+
             try:
                 result = process_single_video(
                     video_path,
@@ -285,6 +347,8 @@ def batch_process(
                     skip_ocr
                 )
                 result["influencer"] = influencer
+                result["media_key"] = key
+                processed[key] = result
                 batch_results.append(result)
             except Exception as e:
                 batch_results.append({
@@ -296,55 +360,219 @@ def batch_process(
 
         all_results.extend(batch_results)
 
-        # Extract cost data from results
-        for r in batch_results:
-            if r.get("ocr") and isinstance(r["ocr"], dict):
-                # Cost is stored per video in OCR results
-                video_cost = r["ocr"].get("estimated_cost", 0)
-                video_calls = r["ocr"].get("gemini_calls", 0)
-                batch_cost += video_cost
-                batch_gemini_calls += video_calls
-
         # Update totals
+        batch_cost, batch_gemini_calls = save_batch_results(
+            results_path / f"batch_{batch_num:03d}_results.json", batch_num, batch_results
+        )
         total_gemini_calls += batch_gemini_calls
         total_estimated_cost += batch_cost
+        print(f"  Running total: ${total_estimated_cost:.4f} ({total_gemini_calls} Gemini calls)")
+
+    return write_summary(results_path, total_videos, all_results, total_gemini_calls, total_estimated_cost, {
+        "whisper_model": whisper_model,
+        "speed_factor": speed_factor,
+        "fps": fps,
+        "platform": platform,
+        "skip_transcription": skip_transcription,
+        "skip_ocr": skip_ocr,
+        "use_openai_api": bool(openai_api_key)
+    })
+
+
+def process_queue(
+    output_dir: str,
+    results_dir: str,
+    platform: Optional[str] = None,
+    batch_size: int = 100,
+    whisper_model: str = "medium",
+    speed_factor: float = 2.0,
+    fps: float = 1.0,
+    gemini_api_key: Optional[str] = None,
+    openai_api_key: Optional[str] = None,
+    skip_transcription: bool = False,
+    skip_ocr: bool = False,
+    poll_interval: float = 10.0,
+    stale_after: float = 3600.0
+) -> Dict[str, Any]:
+    """
+    Process videos from the scraper's work queue as they are downloaded.
 
-        # Save batch results
-        batch_file = results_path / f"batch_{batch_num:03d}_results.json"
-        with open(batch_file, "w", encoding="utf-8") as f:
-            json.dump(batch_results, f, indent=2, ensure_ascii=False)
+    Run alongside `python main.py --queue`. Each video is processed once,
+    in download order. The consumer waits for new videos while a scraper is
+    still running and exits once the queue is drained. Results are written
+    to batch_stream_NNN_results.json every `batch_size` videos, and whenever
+    the queue runs dry.
+    """
+    _use_scraper_modules()
+    from work_queue import WorkQueue, queue_path
 
-        # Print batch summary
-        successful = sum(1 for r in batch_results if r.get("status") == "success")
-        partial = sum(1 for r in batch_results if r.get("status") == "partial")
-        failed = sum(1 for r in batch_results if r.get("status") == "failed")
+    queue_file = queue_path(output_dir)
+    if not queue_file.exists():
+        print(f"No work queue at {queue_file}. Run the scraper with --queue first.")
+        return {}
 
-        print(f"\nBatch {batch_num} complete: {successful} success, {partial} partial, {failed} failed")
-        print(f"  Batch cost: ${batch_cost:.4f} ({batch_gemini_calls} Gemini calls)")
+    work_queue = WorkQueue(queue_file)
+    requeued = work_queue.requeue_stale(stale_after)
+    if requeued:
+        print(f"Requeued {requeued} videos left unfinished by an earlier run")
+
+    counts = work_queue.counts()
+    print(f"Queue: {counts['pending']} pending, {counts['done']} done, {counts['failed']} failed")
+
+    results_path = Path(results_dir)
+    results_path.mkdir(parents=True, exist_ok=True)
+
+    # Continue numbering after batch files from earlier runs
+    batch_num = len(list(results_path.glob("batch_stream_*_results.json")))
+    processed = {}
+    all_results = []
+    batch_results = []
+    total_gemini_calls = 0
+    total_estimated_cost = 0.0
+
+    def flush():
+        nonlocal batch_num, batch_results, total_gemini_calls, total_estimated_cost
+        if not batch_results:
+            return
+        batch_num += 1
+        batch_cost, batch_gemini_calls = save_batch_results(
+            results_path / f"batch_stream_{batch_num:03d}_results.json", batch_num, batch_results
+        )
+        total_gemini_calls += batch_gemini_calls
+        total_estimated_cost += batch_cost
         print(f"  Running total: ${total_estimated_cost:.4f} ({total_gemini_calls} Gemini calls)")
+        batch_results = []
+
+    progress = tqdm(desc="Queued videos", unit="video")
+    item = None
+    try:
+        while True:
+            item = work_queue.claim(platform)
+            if item is None:
+                flush()
+                if not work_queue.has_producers():
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            influencer = item["influencer"]
+            key = item["digest"] or media_key(item["path"])
+            # Reuse the result of identical media processed in this or an earlier run
+            original = processed.get(key) or (item["digest"] and work_queue.find_result(item["digest"]))
+            if original:
+                result = share_result(original, item["path"], influencer)
+            else:
+                try:
+                    result = process_single_video(
+                        item["path"],
+                        str(results_path / influencer),
+                        whisper_model,
+                        speed_factor,
+                        fps,
+                        gemini_api_key,
+                        openai_api_key,
+                        skip_transcription,
+                        skip_ocr
+                    )
+                    result["influencer"] = influencer
+                    result["media_key"] = key
+                    processed[key] = result
+                except Exception as e:
+                    result = {
+                        "video_path": item["path"],
+                        "influencer": influencer,
+                        "status": "failed",
+                        "error": str(e)
+                    }
+
+            if result.get("status") == "failed":
+                work_queue.fail(item["id"], result.get("error") or "; ".join(result.get("errors", [])))
+            else:
+                work_queue.complete(item["id"], result)
+            item = None
+
+            batch_results.append(result)
+            all_results.append(result)
+            progress.update(1)
+            if len(batch_results) >= batch_size:
+                flush()
+    except KeyboardInterrupt:
+        print("\nInterrupted, saving results so far")
+        if item is not None:
+            work_queue.release(item["id"])
+        flush()
+    finally:
+        progress.close()
+
+    return write_summary(results_path, len(all_results), all_results, total_gemini_calls, total_estimated_cost, {
+        "whisper_model": whisper_model,
+        "speed_factor": speed_factor,
+        "fps": fps,
+        "platform": platform,
+        "skip_transcription": skip_transcription,
+        "skip_ocr": skip_ocr,
+        "use_openai_api": bool(openai_api_key),
+        "queue": str(queue_file)
+    })
+
+
+def save_batch_results(batch_file: Path, batch_num: int, batch_results: List[Dict[str, Any]]) -> tuple:
+    """
+    Save one batch of results and print its summary.
 
-    # Save final summary
+    Returns:
+        (estimated cost, Gemini calls) of the batch
+    """
+    batch_gemini_calls = 0
+    batch_cost = 0.0
+
+    # Extract cost data from results
+    for r in batch_results:
+        if r.get("ocr") and isinstance(r["ocr"], dict):
+            # Cost is stored per video in OCR results
+            video_cost = r["ocr"].get("estimated_cost", 0)
+            video_calls = r["ocr"].get("gemini_calls", 0)
+            batch_cost += video_cost
+            batch_gemini_calls += video_calls
+
+    # Save batch results
+    with open(batch_file, "w", encoding="utf-8") as f:
+        json.dump(batch_results, f, indent=2, ensure_ascii=False)
+
+    # Print batch summary
+    successful = sum(1 for r in batch_results if r.get("status") == "success")
+    partial = sum(1 for r in batch_results if r.get("status") == "partial")
+    failed = sum(1 for r in batch_results if r.get("status") == "failed")
+
+    print(f"\nBatch {batch_num} complete: {successful} success, {partial} partial, {failed} failed")
+    print(f"  Batch cost: ${batch_cost:.4f} ({batch_gemini_calls} Gemini calls)")
+
+    return batch_cost, batch_gemini_calls
+
+
+def write_summary(
+    results_path: Path,
+    total_videos: int,
+    all_results: List[Dict[str, Any]],
+    total_gemini_calls: int,
+    total_estimated_cost: float,
+    run_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Save processing_summary.json and print the final report."""
     summary = {
         "total_videos": total_videos,
         "processed": len(all_results),
         "successful": sum(1 for r in all_results if r.get("status") == "success"),
         "partial": sum(1 for r in all_results if r.get("status") == "partial"),
         "failed": sum(1 for r in all_results if r.get("status") == "failed"),
+        "shared": sum(1 for r in all_results if r.get("shared_from")),
         "timestamp": datetime.now().isoformat(),
         "cost_summary": {
             "total_gemini_calls": total_gemini_calls,
             "total_estimated_cost_usd": round(total_estimated_cost, 4),
             "cost_per_video_usd": round(total_estimated_cost / len(all_results), 4) if all_results else 0
         },
-        "config": {
-            "whisper_model": whisper_model,
-            "speed_factor": speed_factor,
-            "fps": fps,
-            "platform": platform,
-            "skip_transcription": skip_transcription,
-            "skip_ocr": skip_ocr,
-            "use_openai_api": bool(openai_api_key)
-        }
+        "config": run_config
     }
 
     summary_file = results_path / "processing_summary.json"
@@ -358,6 +586,8 @@ def batch_process(
     print(f"Successful: {summary['successful']}")
     print(f"Partial: {summary['partial']}")
     print(f"Failed: {summary['failed']}")
+    if summary["shared"]:
+        print(f"Reused for identical videos: {summary['shared']}")
     print(f"\nCOST SUMMARY:")
     print(f"  Total Gemini API calls: {total_gemini_calls}")
     print(f"  Total estimated cost: ${total_estimated_cost:.4f}")
@@ -439,6 +669,17 @@ def main():
         default=0,
         help="End at video N (exclusive, 0 = process all)"
     )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Consume the scraper's work queue (main.py --queue) instead of scanning for videos"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=10.0,
+        help="Seconds to wait for new videos while the scraper is running (--queue)"
+    )
 
     args = parser.parse_args()
 
@@ -451,6 +692,23 @@ def main():
     else:
         print("Using local Whisper for transcription")
 
+    if args.queue:
+        process_queue(
+            args.output_dir,
+            args.results_dir,
+            args.platform,
+            args.batch_size,
+            args.whisper_model,
+            args.speed_factor,
+            args.fps,
+            gemini_key,
+            openai_key,
+            args.skip_transcription,
+            args.skip_ocr,
+            args.poll_interval
+        )
+        return
+
     batch_process(
         args.output_dir,
         args.results_dir,
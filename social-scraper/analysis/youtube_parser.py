@@ -3,18 +3,34 @@ YouTube Data Parser
 Parses yt-dlp JSON metadata from YouTube videos
 """
 
-import json
 import os
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from datetime import datetime
 
+from info_extract import load_info
+from metadata_store import read_metadata, has_fields
+from post import Post, count
 
-def parse_youtube_post(json_path: str) -> Dict[str, Any]:
+# Fields a metadata.jsonl record needs to stand in for its .info.json
+RECORD_FIELDS = ('id', 'timestamp', 'uploader', 'webpage_url', 'thumbnail', 'categories', 'tags')
+
+# Top-level .info.json keys read by the post builder; the rest of the file
+# (formats, thumbnails, captions, heatmap) is not built when pysimdjson is installed
+INFO_FIELDS = ('id', 'timestamp', 'upload_date', 'uploader', 'channel', 'channel_id', 'title',
+               'description', 'duration', 'view_count', 'like_count', 'comment_count',
+               'webpage_url', 'thumbnail', 'categories', 'tags')
+
+
+def parse_youtube_post(json_path: str) -> Post:
     """Parse a single YouTube .info.json file"""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_info(json_path, INFO_FIELDS)
+
+    return youtube_post_from_info(data, json_path)
+
 
+def youtube_post_from_info(data: Dict[str, Any], json_path: str) -> Post:
+    """Build a post from yt-dlp info (an .info.json dict or a metadata.jsonl record)"""
     # Extract timestamp
     timestamp = data.get('timestamp')
     upload_date = data.get('upload_date', '')
@@ -26,47 +42,68 @@ def parse_youtube_post(json_path: str) -> Dict[str, Any]:
     else:
         date = None
 
-    return {
-        'platform': 'youtube',
-        'post_id': data.get('id', ''),
-        'username': data.get('uploader', '') or data.get('channel', ''),
-        'channel_id': data.get('channel_id', ''),
-        'title': data.get('title', ''),
-        'description': data.get('description', ''),
-        'duration_seconds': data.get('duration', 0),
-        'view_count': data.get('view_count', 0),
-        'like_count': data.get('like_count', 0),
-        'comment_count': data.get('comment_count', 0),
-        'timestamp': timestamp,
-        'upload_date': date.strftime('%Y-%m-%d') if date else '',
-        'url': data.get('webpage_url', ''),
-        'thumbnail': data.get('thumbnail', ''),
-        'categories': data.get('categories', []),
-        'tags': data.get('tags', []),
-        'file_path': json_path
-    }
+    return Post(
+        'youtube',
+        post_id=data.get('id', ''),
+        username=data.get('uploader', '') or data.get('channel', ''),
+        channel_id=data.get('channel_id', ''),
+        title=data.get('title', ''),
+        description=data.get('description', ''),
+        duration_seconds=data.get('duration', 0),
+        view_count=count(data.get('view_count', 0)),
+        like_count=count(data.get('like_count', 0)),
+        comment_count=count(data.get('comment_count', 0)),
+        timestamp=timestamp,
+        upload_date=date.strftime('%Y-%m-%d') if date else '',
+        url=data.get('webpage_url', ''),
+        thumbnail=data.get('thumbnail', ''),
+        categories=data.get('categories', []),
+        tags=data.get('tags', []),
+        file_path=json_path
+    )
+
+
+def parse_youtube_files(platform_dir: str, filenames: List[str], influencer_name: str) -> Tuple[List[Post], List[str]]:
+    """Parse the given .info.json files of one YouTube directory, returning posts and per-file errors"""
+    posts = []
+    errors = []
+
+    # metadata.jsonl already holds the fields we need, so only posts missing
+    # from it require parsing their (much larger) .info.json
+    records = read_metadata(platform_dir)
+
+    for filename in filenames:
+        json_file = Path(platform_dir) / filename
+        try:
+            record = records.get(filename[:-len('.info.json')])
+            if record and has_fields(record, RECORD_FIELDS):
+                post = youtube_post_from_info(record, str(json_file))
+            else:
+                post = parse_youtube_post(str(json_file))
+            post.influencer_name = influencer_name
+            posts.append(post)
+        except Exception as e:
+            errors.append(f"Error parsing {json_file}: {e}")
+
+    return posts, errors
 
 
-def parse_influencer_youtube(influencer_dir: str, influencer_name: str) -> List[Dict[str, Any]]:
+def parse_influencer_youtube(influencer_dir: str, influencer_name: str) -> List[Post]:
     """Parse all YouTube posts for an influencer"""
     youtube_dir = Path(influencer_dir) / 'youtube'
-    posts = []
 
     if not youtube_dir.exists():
-        return posts
+        return []
 
-    for json_file in youtube_dir.glob('*.info.json'):
-        try:
-            post = parse_youtube_post(str(json_file))
-            post['influencer_name'] = influencer_name
-            posts.append(post)
-        except Exception as e:
-            print(f"Error parsing {json_file}: {e}")
+    filenames = [p.name for p in youtube_dir.glob('*.info.json')]
+    posts, errors = parse_youtube_files(str(youtube_dir), filenames, influencer_name)
+    for error in errors:
+        print(error)
 
     return posts
 
 
-def parse_all_youtube(output_dir: str) -> List[Dict[str, Any]]:
+def parse_all_youtube(output_dir: str) -> List[Post]:
     """Parse all YouTube data from output directory"""
     output_path = Path(output_dir)
     all_posts = []
@@ -81,15 +118,15 @@ def parse_all_youtube(output_dir: str) -> List[Dict[str, Any]]:
     return all_posts
 
 
-def get_youtube_stats(posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+def get_youtube_stats(posts: List[Post]) -> Dict[str, Any]:
     """Calculate aggregate statistics for YouTube posts"""
     if not posts:
         return {}
 
-    total_views = sum(p.get('view_count', 0) or 0 for p in posts)
-    total_likes = sum(p.get('like_count', 0) or 0 for p in posts)
-    total_comments = sum(p.get('comment_count', 0) or 0 for p in posts)
-    total_duration = sum(p.get('duration_seconds', 0) or 0 for p in posts)
+    total_views = sum(p.view_count or 0 for p in posts)
+    total_likes = sum(p.like_count or 0 for p in posts)
+    total_comments = sum(p.comment_count or 0 for p in posts)
+    total_duration = sum(p.duration_seconds or 0 for p in posts)
 
     return {
         'total_posts': len(posts),
@@ -0,0 +1 @@
+"""Scraper benchmarks against a local fake platform."""
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Influencer metrics benchmark: per-influencer loops vs. grouped aggregation.
+
+consolidate.py used to group posts into a dict of lists and sum each
+platform's counts with separate list comprehensions, about a dozen passes
+over every influencer's posts. calculate_influencer_metrics now sums parsed
+posts per (influencer, platform) in one pass, or does a single grouped sum
+over a columnar table. This times both on generated posts (or the posts of
+a scrape output directory), checks that they give the same rows, and times
+the table path and the optional extra metrics. Building the table from
+parsed posts costs more than the one-pass sums, so main only builds it when
+the extra metrics need it.
+
+Usage (from social-scraper/):
+    python -m benchmarks.bench_influencer_metrics --posts 200000 --influencers 500
+    python -m benchmarks.bench_influencer_metrics --dir output/
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "analysis"))
+
+from consolidate import calculate_influencer_metrics, calculate_monthly_metrics, consolidate_all_posts, posts_frame
+from post import Post
+
+PLATFORMS = ("tiktok", "youtube", "instagram")
+
+
+def generate_posts(count: int, influencers: int, seed: int = 0) -> list[Post]:
+    """Posts with each platform's counts, some of them 0 as scraped data has"""
+    rng = random.Random(seed)
+    posts = []
+    for i in range(count):
+        platform = rng.choice(PLATFORMS)
+        post = Post(
+            platform,
+            influencer_name=f"influencer{rng.randrange(influencers):04d}",
+            post_id=str(i),
+            upload_date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            like_count=rng.randint(0, 10 ** 5),
+            comment_count=rng.randint(0, 10 ** 3) if rng.random() > 0.05 else 0,
+        )
+        if platform == "instagram":
+            post.video_view_count = rng.randint(0, 10 ** 6) if rng.random() > 0.5 else 0
+        else:
+            post.view_count = rng.randint(0, 10 ** 6)
+        if platform == "tiktok":
+            post.repost_count = rng.randint(0, 10 ** 3)
+        posts.append(post)
+    return posts
+
+
+def loop_metrics(posts: list[dict]) -> list[dict]:
+    """The per-influencer list comprehension version consolidate.py used before, on post dicts"""
+
+    # Group posts by influencer
+    influencer_posts = defaultdict(list)
+    for post in posts:
+        influencer_posts[post['influencer_name']].append(post)
+
+    metrics = []
+    for name, inf_posts in influencer_posts.items():
+        # Split by platform
+        tiktok = [p for p in inf_posts if p['platform'] == 'tiktok']
+        youtube = [p for p in inf_posts if p['platform'] == 'youtube']
+        instagram = [p for p in inf_posts if p['platform'] == 'instagram']
+
+        # TikTok metrics
+        tiktok_views = sum(p.get('view_count', 0) or 0 for p in tiktok)
+        tiktok_likes = sum(p.get('like_count', 0) or 0 for p in tiktok)
+        tiktok_comments = sum(p.get('comment_count', 0) or 0 for p in tiktok)
+        tiktok_reposts = sum(p.get('repost_count', 0) or 0 for p in tiktok)
+
+        # YouTube metrics
+        youtube_views = sum(p.get('view_count', 0) or 0 for p in youtube)
+        youtube_likes = sum(p.get('like_count', 0) or 0 for p in youtube)
+        youtube_comments = sum(p.get('comment_count', 0) or 0 for p in youtube)
+
+        # Instagram metrics
+        instagram_likes = sum(p.get('like_count', 0) or 0 for p in instagram)
+        instagram_comments = sum(p.get('comment_count', 0) or 0 for p in instagram)
+        instagram_video_views = sum(p.get('video_view_count', 0) or 0 for p in instagram)
+
+        # Combined metrics
+        total_views = tiktok_views + youtube_views + instagram_video_views
+        total_likes = tiktok_likes + youtube_likes + instagram_likes
+        total_comments = tiktok_comments + youtube_comments + instagram_comments
+        total_engagement = total_likes + total_comments + tiktok_reposts
+
+        metrics.append({
+            'influencer_name': name,
+            'total_posts': len(inf_posts),
+            'tiktok_posts': len(tiktok),
+            'youtube_posts': len(youtube),
+            'instagram_posts': len(instagram),
+            'total_views': total_views,
+            'total_likes': total_likes,
+            'total_comments': total_comments,
+            'total_engagement': total_engagement,
+            'tiktok_views': tiktok_views,
+            'tiktok_likes': tiktok_likes,
+            'tiktok_comments': tiktok_comments,
+            'tiktok_reposts': tiktok_reposts,
+            'youtube_views': youtube_views,
+            'youtube_likes': youtube_likes,
+            'youtube_comments': youtube_comments,
+            'instagram_likes': instagram_likes,
+            'instagram_comments': instagram_comments,
+            'instagram_video_views': instagram_video_views,
+            'avg_engagement_per_post': total_engagement / len(inf_posts) if inf_posts else 0,
+            'engagement_rate': total_engagement / total_views if total_views else 0
+        })
+
+    # Sort by total engagement
+    metrics.sort(key=lambda x: x['total_engagement'], reverse=True)
+    return metrics
+
+
+def same_rows(expected: list[dict], actual: list[dict]) -> bool:
+    if [row["influencer_name"] for row in expected] != [row["influencer_name"] for row in actual]:
+        return False
+    for old, new in zip(expected, actual):
+        for key, value in old.items():
+            if not math.isclose(new[key], value, rel_tol=1e-9) if isinstance(value, float) else new[key] != value:
+                return False
+    return True
+
+
+def time_call(func: Callable, posts, repeat: int) -> float:
+    """Best-of-`repeat` wall time"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(posts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(posts: list[Post], repeat: int = 3) -> dict:
+    """Time the loop and grouped versions on the same posts and check they agree"""
+    rows = [post.to_dict() for post in posts]
+    table = posts_frame(posts)
+    expected = loop_metrics(rows)
+    if not (same_rows(expected, calculate_influencer_metrics(posts))
+            and same_rows(expected, calculate_influencer_metrics(table))):
+        raise AssertionError("Grouped influencer metrics disagree with the loop version")
+
+    # "from posts" is the one-pass sum main uses; the table timings start
+    # from a table already built, as main shares one for the extra metrics
+    timings = {
+        "loop": time_call(loop_metrics, rows, repeat),
+        "from posts": time_call(calculate_influencer_metrics, posts, repeat),
+        "build table": time_call(posts_frame, posts, repeat),
+        "grouped": time_call(calculate_influencer_metrics, table, repeat),
+        "grouped+extra": time_call(lambda t: calculate_influencer_metrics(t, extra_metrics=True), table, repeat),
+        "monthly": time_call(calculate_monthly_metrics, table, repeat),
+    }
+    return {
+        "posts": len(posts),
+        "influencers": len({post.influencer_name for post in posts}),
+        "seconds": timings,
+    }
+
+
+def print_report(report: dict) -> None:
+    print("\n" + "=" * 60)
+    print("INFLUENCER METRICS BENCHMARK")
+    print("=" * 60)
+    print(f"Posts: {report['posts']:,} from {report['influencers']:,} influencers")
+    baseline = report["seconds"]["loop"]
+    for name, seconds in report["seconds"].items():
+        print(f"  {name:14} {seconds * 1000:9.1f} ms  {baseline / seconds:5.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark grouped influencer metrics against the loop version")
+    parser.add_argument("--dir", type=Path, default=None, help="Scrape output directory to consolidate")
+    parser.add_argument("--posts", type=int, default=200000, help="Generated posts")
+    parser.add_argument("--influencers", type=int, default=500, help="Influencers the generated posts belong to")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.dir:
+        posts = consolidate_all_posts(str(args.dir))
+        if not posts:
+            sys.exit(f"No posts under {args.dir}")
+    else:
+        posts = generate_posts(args.posts, args.influencers)
+    report = run_benchmark(posts, repeat=args.repeat)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
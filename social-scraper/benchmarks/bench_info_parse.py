@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+.info.json parsing benchmark: full JSON decode vs. top-level key extraction.
+
+The analysis parsers read about 15 top-level keys from each yt-dlp
+.info.json, but YouTube files are mostly formats, thumbnails, captions and
+heatmap data. This compares full decodes (json.load, and orjson through
+metadata_store.load_json) with extractors that skip the nested values
+without building them: analysis/info_extract.py's pysimdjson path, and an
+ijson (yajl2_c backend) event walk. It runs on real files from a scrape
+output directory, or on generated files shaped like real YouTube and TikTok
+metadata.
+
+Results with the defaults (100 YouTube files with 150 caption languages,
+100 TikTok; 77.6 MB, largest 0.75 MB; Python 3.11):
+
+    json      1.12 ms/file   1.0x   peak 1.95 MB
+    orjson    0.57 ms/file   2.0x   peak 1.95 MB
+    simdjson  0.16 ms/file   6.9x   peak 0.76 MB   (info_extract.load_info)
+    ijson     1.73 ms/file   0.7x   peak 0.22 MB
+
+simdjson is the only extractor that beats a full orjson decode, so
+load_info uses it when pysimdjson is installed and falls back to load_json.
+ijson uses the least memory, but its per-event Python loop costs more than
+decoding everything in C, so it is measured here and not used.
+
+Usage (from social-scraper/):
+    python -m benchmarks.bench_info_parse --dir output/
+    python -m benchmarks.bench_info_parse --files 200 --caption-langs 150
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "analysis"))
+
+from info_extract import load_info
+from metadata_store import load_json
+from tiktok_parser import INFO_FIELDS as TIKTOK_FIELDS
+from youtube_parser import INFO_FIELDS as YOUTUBE_FIELDS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+CAPTION_EXTS = ("json3", "srv1", "srv2", "srv3", "ttml", "vtt", "srt")
+
+
+def _url(rng: random.Random, length: int) -> str:
+    chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+    return "https://rr3---sn-ab5l6nr6.googlevideo.com/videoplayback?" + "".join(
+        rng.choice(chars) for _ in range(length)
+    )
+
+
+def _format(rng: random.Random, i: int) -> dict:
+    return {
+        "format_id": str(100 + i),
+        "format_note": f"{144 * (1 + i % 8)}p",
+        "ext": "mp4" if i % 2 else "webm",
+        "protocol": "https",
+        "acodec": "none" if i % 3 else "mp4a.40.2",
+        "vcodec": "avc1.4d401e" if i % 2 else "vp9",
+        "url": _url(rng, 900),
+        "width": 256 * (1 + i % 8),
+        "height": 144 * (1 + i % 8),
+        "fps": 30,
+        "tbr": rng.uniform(50, 5000),
+        "filesize": rng.randint(10 ** 5, 10 ** 8),
+        "http_headers": {
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-us,en;q=0.5",
+            "Sec-Fetch-Mode": "navigate",
+        },
+        "downloader_options": {"http_chunk_size": 10485760},
+        "fragments": [{"url": _url(rng, 120), "duration": 10.0} for _ in range(5)] if i < 4 else None,
+    }
+
+
+def youtube_info(rng: random.Random, video_id: str, caption_langs: int = 150, formats: int = 60) -> dict:
+    """yt-dlp style YouTube info dict, with real-sized arrays in yt-dlp's key order"""
+    return {
+        "id": video_id,
+        "title": f"Video {video_id} about New Jersey",
+        "formats": [_format(rng, i) for i in range(formats)],
+        "thumbnails": [
+            {"url": f"https://i.ytimg.com/vi/{video_id}/{i}.jpg", "preference": -i, "id": str(i),
+             "height": 90 * (1 + i % 6), "width": 120 * (1 + i % 6), "resolution": "120x90"}
+            for i in range(40)
+        ],
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
+        "description": "A description with links and hashtags #nj " * 20,
+        "channel_id": "UC" + video_id * 2,
+        "duration": rng.randint(60, 3600),
+        "view_count": rng.randint(0, 10 ** 6),
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "categories": ["People & Blogs"],
+        "tags": ["new jersey", "nj", "local"],
+        "automatic_captions": {
+            f"lang{n}": [
+                {"ext": ext, "url": _url(rng, 500), "name": f"Language {n}"}
+                for ext in CAPTION_EXTS
+            ]
+            for n in range(caption_langs)
+        },
+        "subtitles": {},
+        "comment_count": rng.randint(0, 10 ** 4),
+        "chapters": None,
+        "heatmap": [
+            {"start_time": i * 6.0, "end_time": (i + 1) * 6.0, "value": rng.random()}
+            for i in range(100)
+        ],
+        "like_count": rng.randint(0, 10 ** 5),
+        "channel": "NJ Creator",
+        "uploader": "NJ Creator",
+        "uploader_id": "@njcreator",
+        "upload_date": "20240115",
+        "timestamp": 1700000000 + rng.randint(0, 10 ** 7),
+        "availability": "public",
+        "extractor": "youtube",
+        "format_id": "137+251",
+        "requested_formats": [_format(rng, 0), _format(rng, 1)],
+        "_type": "video",
+        "_version": {"version": "2024.08.06", "release_git_head": None, "repository": "yt-dlp/yt-dlp"},
+    }
+
+
+def tiktok_info(rng: random.Random, video_id: str) -> dict:
+    """yt-dlp style TikTok info dict (a handful of formats, no captions)"""
+    info = youtube_info(rng, video_id, caption_langs=0, formats=6)
+    info["repost_count"] = rng.randint(0, 10 ** 4)
+    for key in ("automatic_captions", "heatmap", "chapters", "categories", "tags"):
+        info.pop(key)
+    return info
+
+
+def generate_files(directory: Path, count: int, caption_langs: int, seed: int = 0) -> list[tuple[Path, tuple]]:
+    """Write `count` YouTube and `count` TikTok .info.json files"""
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        path = directory / f"yt{i:05d}.info.json"
+        path.write_text(json.dumps(youtube_info(rng, f"yt{i:05d}", caption_langs)), encoding="utf-8")
+        files.append((path, YOUTUBE_FIELDS))
+        path = directory / f"tt{i:05d}.info.json"
+        path.write_text(json.dumps(tiktok_info(rng, f"tt{i:05d}")), encoding="utf-8")
+        files.append((path, TIKTOK_FIELDS))
+    return files
+
+
+def find_files(output_dir: Path, limit: Optional[int]) -> list[tuple[Path, tuple]]:
+    """Real .info.json files from a scrape output directory"""
+    files = []
+    for platform, fields in (("youtube", YOUTUBE_FIELDS), ("tiktok", TIKTOK_FIELDS)):
+        found = sorted(output_dir.glob(f"*/{platform}/*.info.json"))
+        files.extend((path, fields) for path in found[:limit])
+    return files
+
+
+def _json_full(path: Path, fields: tuple) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {k: data[k] for k in fields if k in data}
+
+
+def _orjson_full(path: Path, fields: tuple) -> dict:
+    data = load_json(str(path))
+    return {k: data[k] for k in fields if k in data}
+
+
+def _load_info(path: Path, fields: tuple) -> dict:
+    return load_info(str(path), fields)
+
+
+def _ijson_extract(path: Path, fields: tuple) -> dict:
+    """Build only the wanted top-level values from ijson's event stream"""
+    wanted = set(fields)
+    found = {}
+    with open(path, "rb") as f:
+        events = ijson.basic_parse(f)
+        next(events)  # the document's start_map
+        depth = 0
+        key = builder = None
+        for event, value in events:
+            if depth == 0:
+                if event == "end_map":
+                    break
+                if event == "map_key":
+                    key = value
+                    builder = ObjectBuilder() if value in wanted else None
+                    continue
+            if builder is not None:
+                builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth == 0 and builder is not None:
+                found[key] = builder.value
+                builder = None
+                if len(found) == len(wanted):
+                    break
+    return found
+
+
+def time_parser(parse: Callable, files: list[tuple[Path, tuple]], repeat: int) -> dict:
+    """Best-of-`repeat` wall time, and peak traced memory of the largest file"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, fields in files:
+            parse(path, fields)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    largest = max(files, key=lambda f: f[0].stat().st_size)
+    tracemalloc.start()
+    parse(*largest)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "ms_per_file": best * 1000 / len(files), "peak_bytes": peak}
+
+
+def run_benchmark(files: list[tuple[Path, tuple]], repeat: int = 3) -> dict:
+    """Time every available parser on the same files and check they agree"""
+    parsers = {"json": _json_full}
+    if orjson is not None:
+        parsers["orjson"] = _orjson_full
+    if simdjson is not None:
+        parsers["simdjson"] = _load_info
+    if ijson is not None:
+        parsers["ijson"] = _ijson_extract
+
+    for path, fields in files:
+        expected = _json_full(path, fields)
+        for name, parse in parsers.items():
+            if parse(path, fields) != expected:
+                raise AssertionError(f"{name} disagrees with json.load on {path}")
+
+    sizes = [path.stat().st_size for path, _ in files]
+    return {
+        "files": len(files),
+        "total_bytes": sum(sizes),
+        "largest_bytes": max(sizes),
+        "parsers": {name: time_parser(parse, files, repeat) for name, parse in parsers.items()},
+    }
+
+
+def print_report(report: dict) -> None:
+    print("\n" + "=" * 60)
+    print("INFO.JSON PARSE BENCHMARK")
+    print("=" * 60)
+    print(f"Files: {report['files']} ({report['total_bytes'] / 1e6:.1f} MB, "
+          f"largest {report['largest_bytes'] / 1e6:.2f} MB)")
+    baseline = report["parsers"]["json"]["seconds"]
+    for name, stats in report["parsers"].items():
+        print(f"  {name:9} {stats['ms_per_file']:7.2f} ms/file  {baseline / stats['seconds']:5.1f}x  "
+              f"peak {stats['peak_bytes'] / 1e6:6.2f} MB on the largest file")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark .info.json key extraction against full decoding")
+    parser.add_argument("--dir", type=Path, default=None, help="Scrape output directory with real files")
+    parser.add_argument("--limit", type=int, default=None, help="Files per platform from --dir")
+    parser.add_argument("--files", type=int, default=100, help="Generated files per platform")
+    parser.add_argument("--caption-langs", type=int, default=150,
+                        help="automatic_captions languages in generated YouTube files")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="info-bench-") as tmp:
+        if args.dir:
+            files = find_files(args.dir, args.limit)
+            if not files:
+                sys.exit(f"No .info.json files under {args.dir}/*/{{youtube,tiktok}}/")
+        else:
+            files = generate_files(Path(tmp), args.files, args.caption_langs)
+        report = run_benchmark(files, repeat=args.repeat)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Scraper throughput benchmark against the local fake platform.
+
+Runs the real TikTok, YouTube and Instagram scrapers through the
+ScrapeScheduler, pointed at benchmarks/fake_platform.py instead of the live
+sites, and reports accounts/min, bytes/s and per-account latency
+percentiles. Use it to check concurrency, rate-limit and engine changes.
+
+Usage (from social-scraper/):
+    python -m benchmarks.bench_scrapers --accounts 20 --workers tiktok=4,youtube=2
+    python -m benchmarks.bench_scrapers --engine subprocess --latency-ms 200 --rate-429 0.05
+
+Rate limits are lifted unless --respect-rate-limits is given, so the numbers
+show what the code can do; the circuit breaker keeps its behaviour but with
+a short backoff (--breaker-delay). Every run scrapes into a fresh temporary
+directory, and rate-limit state is kept there too, so real runs are not
+affected.
+"""
+
+import argparse
+import json
+import math
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config
+from scrapers import InstagramScraper, TikTokScraper, YouTubeScraper
+from scrapers import instagram as instagram_module
+from scrapers.base import MEDIA_SUFFIXES
+from scrapers.instagram_sessions import InstagramSession, SessionPool
+from scrapers.media_store import MediaStore, media_store_path
+from scrapers.scheduler import ScrapeScheduler, parse_workers
+from scrapers.ytdlp_engine import ENGINES, YtDlpEngine
+
+from benchmarks.fake_instaloader import FakeInstaloader, FakeProfile
+from benchmarks.fake_platform import FakePlatform
+
+PLUGIN_DIR = Path(__file__).resolve().parent / "plugins"
+
+PLATFORM_URL_RE = re.compile(r"^https://www\.(?P<platform>tiktok|youtube)\.com/@(?P<user>[^/?#]+).*$")
+
+
+class BenchEngine(YtDlpEngine):
+    """YtDlpEngine that sends profile URLs to the fake platform's yt-dlp extractor."""
+
+    def __init__(self, mode: str, base_url: str):
+        super().__init__(mode)
+        self.base_url = base_url
+
+    def run(self, args, url, output_template, **kwargs) -> dict:
+        url = PLATFORM_URL_RE.sub(lambda m: f"{self.base_url}/{m['platform']}/@{m['user']}", url)
+        return super().run([*args, "--plugin-dirs", str(PLUGIN_DIR)], url, output_template, **kwargs)
+
+
+class TimedScraper:
+    """Records how long each account took, for the latency percentiles."""
+
+    def __init__(self, scraper, timings: list):
+        self.scraper = scraper
+        self.timings = timings
+
+    def scrape(self, url: str, influencer_name: str) -> dict:
+        start = time.perf_counter()
+        try:
+            return self.scraper.scrape(url, influencer_name)
+        finally:
+            self.timings.append(time.perf_counter() - start)
+
+    def close(self) -> None:
+        self.scraper.close()
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def bench_influencers(count: int) -> list[dict]:
+    """Synthetic influencers with an account on every platform."""
+    return [
+        {
+            "name": f"Bench {i:04d}",
+            "tiktok_url": f"https://www.tiktok.com/@bench{i:04d}",
+            "instagram_url": f"https://www.instagram.com/bench{i:04d}/",
+            "youtube_url": f"https://www.youtube.com/@bench{i:04d}",
+        }
+        for i in range(count)
+    ]
+
+
+def media_bytes_on_disk(output_dir: Path) -> int:
+    """Size of the media files in the influencer directories, each inode counted once."""
+    seen = set()
+    total = 0
+    for path in output_dir.glob("*/*/*"):
+        if path.parts[-3].startswith(".") or path.suffix not in MEDIA_SUFFIXES + (".jpg",):
+            continue
+        stat = path.stat()
+        if (stat.st_dev, stat.st_ino) not in seen:
+            seen.add((stat.st_dev, stat.st_ino))
+            total += stat.st_size
+    return total
+
+
+def run_benchmark(
+    accounts: int = 10,
+    platforms: tuple = ("tiktok", "youtube", "instagram"),
+    workers: Optional[dict[str, int]] = None,
+    engine: str = "inprocess",
+    download_profile: str = config.DOWNLOAD_PROFILE,
+    metadata_only: bool = False,
+    dedupe_media: bool = True,
+    respect_rate_limits: bool = False,
+    breaker_delay: float = 1.0,
+    output_dir: Optional[Path] = None,
+    **server_options,
+) -> dict:
+    """
+    Scrape `accounts` synthetic influencers on each platform and measure the run.
+
+    Args:
+        server_options: FakePlatform settings (posts_per_account, page_size,
+            media_bytes, latency, latency_jitter, rate_429, failure_rate, seed)
+
+    Returns:
+        Report dict with throughput, bytes and per-platform latency percentiles
+    """
+    keep_output = output_dir is not None
+    output_dir = Path(output_dir or tempfile.mkdtemp(prefix="scraper-bench-"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Keep benchmark state out of the real output directory
+    config.RATE_LIMIT_STATE_DIR = output_dir / ".ratelimit"
+    if not respect_rate_limits:
+        config.RATE_LIMITS = {p: {"requests_per_minute": 1e6, "burst": 1000} for p in config.RATE_LIMITS}
+    config.CIRCUIT_BREAKER = {**config.CIRCUIT_BREAKER, "base_delay": breaker_delay, "max_delay": breaker_delay * 8}
+    if not respect_rate_limits:
+        config.INSTAGRAM_SESSION_RATE = {"requests_per_minute": 1e6, "burst": 1000}
+    if "posts_per_account" in server_options:
+        config.MAX_POSTS_PER_ACCOUNT = server_options["posts_per_account"]
+
+    if engine == "inprocess":
+        # The in-process YoutubeDL loads plugins from the global plugin dirs
+        from yt_dlp.globals import plugin_dirs
+        plugin_dirs.value = ["default", str(PLUGIN_DIR)]
+
+    server = FakePlatform(**server_options)
+    base_url = server.start()
+    instagram_module.Profile = FakeProfile
+
+    timings: dict[str, list[float]] = {p: [] for p in platforms}
+    media_store = MediaStore(media_store_path(output_dir)) if dedupe_media else None
+    shared = {"metadata_only": metadata_only, "media_store": media_store, "download_profile": download_profile}
+
+    def ytdlp_factory(scraper_class, platform):
+        def factory():
+            scraper = scraper_class(output_dir, True, engine, **shared)
+            scraper.engine = BenchEngine(engine, base_url)
+            return TimedScraper(scraper, timings[platform])
+        return factory
+
+    # One fake logged-in session per Instagram worker
+    session_pool = SessionPool([
+        InstagramSession(f"bench{i}", FakeInstaloader(base_url))
+        for i in range((workers or {}).get("instagram", 1))
+    ], cooldown=breaker_delay)
+
+    def instagram_factory():
+        scraper = InstagramScraper(output_dir, True, **shared, session_pool=session_pool)
+        return TimedScraper(scraper, timings["instagram"])
+
+    factories = {
+        "tiktok": ytdlp_factory(TikTokScraper, "tiktok"),
+        "youtube": ytdlp_factory(YouTubeScraper, "youtube"),
+        "instagram": instagram_factory,
+    }
+    factories = {p: f for p, f in factories.items() if p in platforms}
+
+    try:
+        start = time.perf_counter()
+        results = ScrapeScheduler(factories, workers).run(bench_influencers(accounts))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.stop()
+
+    report = {
+        "accounts": accounts,
+        "engine": engine,
+        "download_profile": download_profile,
+        "elapsed": round(elapsed, 2),
+        "jobs": sum(len(r["platforms"]) for r in results),
+        # Includes scrapes of blocked accounts that were deferred and retried
+        "scrapes": sum(len(timings[p]) for p in platforms),
+        "accounts_per_min": round(sum(len(r["platforms"]) for r in results) / elapsed * 60, 1),
+        "bytes_on_wire": server.stats["bytes_sent"],
+        "wire_bytes_per_sec": round(server.stats["bytes_sent"] / elapsed),
+        "bytes_on_disk": media_bytes_on_disk(output_dir),
+        "requests": server.stats["requests"],
+        "status_counts": {str(k): v for k, v in sorted(server.stats["status"].items())},
+        "platforms": {},
+    }
+    for platform in platforms:
+        platform_results = [r["platforms"][platform] for r in results if platform in r["platforms"]]
+        report["platforms"][platform] = {
+            "succeeded": sum(1 for r in platform_results if r["success"]),
+            "failed": sum(1 for r in platform_results if not r["success"]),
+            "posts": sum(r["posts_downloaded"] for r in platform_results),
+            "snapshots": sum(r.get("snapshots", 0) for r in platform_results),
+            **{f"p{p}": percentile(timings[platform], p) for p in (50, 95, 99)},
+        }
+
+    if not keep_output:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return report
+
+
+def print_report(report: dict) -> None:
+    """Print a benchmark report in the style of the scraping summary."""
+    def ms(seconds):
+        return "-" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+    print("\n" + "=" * 60)
+    print("SCRAPER BENCHMARK")
+    print("=" * 60)
+    print(f"Engine: {report['engine']}, profile: {report['download_profile']}")
+    print(f"Accounts scraped: {report['jobs']} in {report['elapsed']:.1f}s "
+          f"({report['accounts_per_min']:.1f} accounts/min, {report['scrapes']} scrapes incl. retries)")
+    print(f"On the wire: {report['bytes_on_wire'] / 1e6:.1f} MB "
+          f"({report['wire_bytes_per_sec'] / 1e6:.2f} MB/s), on disk: {report['bytes_on_disk'] / 1e6:.1f} MB")
+    print(f"Requests: {report['requests']} (status {report['status_counts']})")
+    print()
+    for platform, stats in report["platforms"].items():
+        print(f"{platform.upper()}:")
+        print(f"  Succeeded: {stats['succeeded']}, failed: {stats['failed']}, posts: {stats['posts']}")
+        print(f"  Per account: p50 {ms(stats['p50'])}, p95 {ms(stats['p95'])}, p99 {ms(stats['p99'])}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local fake platform")
+    parser.add_argument("--accounts", type=int, default=10, help="Synthetic influencers to scrape")
+    parser.add_argument("--platforms", nargs="+", choices=["tiktok", "instagram", "youtube"],
+                        default=["tiktok", "youtube", "instagram"])
+    parser.add_argument("--workers", type=parse_workers, default=None,
+                        help="Concurrent workers per platform, e.g. tiktok=4,instagram=1,youtube=3")
+    parser.add_argument("--engine", choices=ENGINES, default="inprocess")
+    parser.add_argument("--profile", choices=list(config.DOWNLOAD_PROFILES), default=config.DOWNLOAD_PROFILE)
+    parser.add_argument("--metadata-only", action="store_true")
+    parser.add_argument("--no-media-store", action="store_true")
+    parser.add_argument("--posts", type=int, default=5, help="Posts per account")
+    parser.add_argument("--page-size", type=int, default=10, help="Posts per listing page")
+    parser.add_argument("--media-kb", type=int, default=256, help="Size of the largest rendition (KB)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Added latency per request")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Random share of the latency (0-1)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--respect-rate-limits", action="store_true",
+                        help="Keep config.RATE_LIMITS instead of lifting them")
+    parser.add_argument("--breaker-delay", type=float, default=1.0,
+                        help="Circuit breaker base backoff in seconds")
+    parser.add_argument("--output", type=Path, default=None, help="Keep the scraped files here")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        accounts=args.accounts,
+        platforms=tuple(args.platforms),
+        workers=args.workers,
+        engine=args.engine,
+        download_profile=args.profile,
+        metadata_only=args.metadata_only,
+        dedupe_media=not args.no_media_store,
+        respect_rate_limits=args.respect_rate_limits,
+        breaker_delay=args.breaker_delay,
+        output_dir=args.output,
+        posts_per_account=args.posts,
+        page_size=args.page_size,
+        media_bytes=args.media_kb * 1024,
+        latency=args.latency_ms / 1000,
+        latency_jitter=args.jitter,
+        rate_429=args.rate_429,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,86 @@
+"""
+instaloader stand-ins that read from the local benchmark server.
+
+InstagramScraper only touches instaloader through Profile.from_username,
+the profile's post iterator and Instaloader.download_post. The classes here
+provide those against benchmarks/fake_platform.py, raising instaloader's own
+ConnectionException on 429s and server errors like the real client does.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import requests
+from instaloader.exceptions import ConnectionException
+
+
+class FakeInstaloader:
+    """Instaloader replacement holding one HTTP session, like the real loader."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.context = self
+        self.session = requests.Session()
+
+    def get(self, path: str) -> requests.Response:
+        response = self.session.get(self.base_url + path, timeout=30)
+        if response.status_code == 429:
+            raise ConnectionException("429 Too Many Requests")
+        if response.status_code >= 400:
+            raise ConnectionException(f"HTTP error code {response.status_code}")
+        return response
+
+    def download_post(self, post: "FakePost", target: Path) -> bool:
+        """Write the post's media under instaloader's {date_utc}_UTC file names."""
+        prefix = Path(target) / (post.date_utc.strftime("%Y-%m-%d_%H-%M-%S") + "_UTC")
+        for path, suffix in ((post.url, ".jpg"), (post.video_url, ".mp4")):
+            if path:
+                Path(f"{prefix}{suffix}").write_bytes(self.get(path).content)
+        return True
+
+
+class FakeProfile:
+    """Profile whose posts are paged from the benchmark server."""
+
+    is_private = False
+    followed_by_viewer = False
+
+    def __init__(self, loader: FakeInstaloader, username: str):
+        self.loader = loader
+        self.username = username
+
+    @classmethod
+    def from_username(cls, context: FakeInstaloader, username: str) -> "FakeProfile":
+        # The real call fetches the profile page first
+        context.get(f"/instagram/@{username}/posts?page=1")
+        return cls(context, username)
+
+    def get_posts(self):
+        page = 1
+        while True:
+            listing = self.loader.get(f"/instagram/@{self.username}/posts?page={page}").json()
+            for post in listing["posts"]:
+                yield FakePost(post, self.username)
+            if not listing["has_more"]:
+                return
+            page += 1
+
+
+class FakePost:
+    """The Post attributes InstagramScraper reads."""
+
+    is_pinned = False
+
+    def __init__(self, data: dict, owner_username: str):
+        self.shortcode = data["shortcode"]
+        self.mediaid = int(data["id"])
+        self.owner_username = owner_username
+        self.typename = data["typename"]
+        self.date_utc = datetime.fromisoformat(data["date"]).replace(tzinfo=None)
+        self.caption = data["caption"]
+        self.likes = data["likes"]
+        self.comments = data["comments"]
+        self.is_video = data["is_video"]
+        self.video_view_count = data["video_view_count"]
+        self.url = data["display_url"]
+        self.video_url = data["video_url"]
@@ -0,0 +1,257 @@
+"""
+Local HTTP stand-in for TikTok, YouTube and Instagram.
+
+Serves synthetic profiles, paginated post listings, .info.json-style post
+metadata and small generated media, with configurable latency, 429
+injection and failure rates, so the scrapers can be benchmarked without
+touching the live platforms.
+
+Endpoints (any username exists):
+    GET /<platform>/@<user>/posts?page=N    post listing, newest first
+    GET /<platform>/video/<id>.info.json    yt-dlp style metadata with formats
+    GET /media/<id>-<format>.<ext>          generated media bytes
+
+The yt-dlp side is the fake_platform extractor plugin in benchmarks/plugins;
+the Instagram side is benchmarks/fake_instaloader.py.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+PLATFORMS = ("tiktok", "youtube", "instagram")
+
+# Newest synthetic post; older posts are spaced an hour apart
+NEWEST_POST = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+# Media renditions per platform: (format_id, width, height, share of media_bytes)
+FORMATS = {
+    "tiktok": [("540p", 540, 960, 0.5), ("720p", 720, 1280, 1.0)],
+    "youtube": [("360p", 640, 360, 0.25), ("480p", 854, 480, 0.5), ("720p", 1280, 720, 1.0)],
+    "instagram": [("720p", 720, 1280, 1.0)],
+}
+
+LISTING_RE = re.compile(r"^/(?P<platform>\w+)/@(?P<user>[^/]+)/posts$")
+INFO_RE = re.compile(r"^/(?P<platform>\w+)/video/(?P<id>[\w-]+)\.info\.json$")
+MEDIA_RE = re.compile(r"^/media/(?P<id>[\w-]+)-(?P<format>\w+)\.(?P<ext>\w+)$")
+
+
+class FakePlatform:
+    """
+    Threaded HTTP server generating platform content on the fly.
+
+    Args:
+        posts_per_account: Posts every profile has
+        page_size: Posts per listing page
+        media_bytes: Size of the largest rendition of a post's media
+        latency: Seconds added to every response
+        latency_jitter: Random share of `latency` added or removed (0-1)
+        rate_429: Share of requests answered with 429 Too Many Requests
+        failure_rate: Share of requests answered with 500
+        seed: Seed for the random latency and error injection
+
+    Use as a context manager, or call start() and stop().
+    """
+
+    def __init__(
+        self,
+        posts_per_account: int = 20,
+        page_size: int = 10,
+        media_bytes: int = 256 * 1024,
+        latency: float = 0.05,
+        latency_jitter: float = 0.5,
+        rate_429: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = 0,
+    ):
+        self.posts_per_account = posts_per_account
+        self.page_size = max(1, page_size)
+        self.media_bytes = media_bytes
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_429 = rate_429
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes_sent": 0, "status": {}}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Start serving on a free local port and return the base URL."""
+        platform = self
+
+        class Handler(_Handler):
+            fake = platform
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-platform", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Content
+
+    @staticmethod
+    def post_id(platform: str, user: str, number: int) -> str:
+        """Stable numeric post id, unique per platform, user and post number."""
+        digest = hashlib.sha1(f"{platform}/{user}".encode()).hexdigest()
+        return f"{int(digest[:8], 16)}{number:05d}"
+
+    def listing(self, platform: str, user: str, page: int) -> dict:
+        start = (page - 1) * self.page_size
+        numbers = range(start, min(start + self.page_size, self.posts_per_account))
+        return {
+            "user": user,
+            "page": page,
+            "posts": [self.post(platform, user, n) for n in numbers],
+            "has_more": start + self.page_size < self.posts_per_account,
+        }
+
+    def post(self, platform: str, user: str, number: int) -> dict:
+        """Listing entry of a post; Instagram entries carry everything instaloader would."""
+        post_id = self.post_id(platform, user, number)
+        date = NEWEST_POST - timedelta(hours=number)
+        post = {"id": post_id, "timestamp": int(date.timestamp())}
+        if platform == "instagram":
+            is_video = number % 2 == 0
+            post.update({
+                "shortcode": f"B{post_id}",
+                "date": date.isoformat(),
+                "typename": "GraphVideo" if is_video else "GraphImage",
+                "is_video": is_video,
+                "caption": f"Post {number} by {user} #nj",
+                "likes": 1000 - number,
+                "comments": 50 + number,
+                "video_view_count": 5000 - number if is_video else None,
+                "display_url": f"/media/{post_id}-thumb.jpg",
+                "video_url": f"/media/{post_id}-720p.mp4" if is_video else None,
+            })
+        return post
+
+    def info(self, platform: str, post_id: str) -> dict:
+        """yt-dlp style info dict of a post, with one format per rendition."""
+        number = int(post_id[-5:])
+        date = NEWEST_POST - timedelta(hours=number)
+        return {
+            "id": post_id,
+            "title": f"Synthetic {platform} post {number}",
+            "description": f"Benchmark post {number} #nj",
+            "timestamp": int(date.timestamp()),
+            "upload_date": date.strftime("%Y%m%d"),
+            "duration": 15 + number % 45,
+            "view_count": 10000 - number,
+            "like_count": 1000 - number,
+            "comment_count": 50 + number,
+            "repost_count": number,
+            "uploader": "bench",
+            "uploader_id": "bench",
+            "channel": "bench",
+            "channel_id": "bench",
+            "thumbnail": f"/media/{post_id}-thumb.jpg",
+            "formats": [
+                {
+                    "format_id": format_id,
+                    "url": f"/media/{post_id}-{format_id}.mp4",
+                    "ext": "mp4",
+                    "width": width,
+                    "height": height,
+                    "vcodec": "avc1.64001F",
+                    "acodec": "mp4a.40.2",
+                    "filesize": int(self.media_bytes * share),
+                    "tbr": height * 2,
+                }
+                for format_id, width, height, share in FORMATS.get(platform, FORMATS["youtube"])
+            ],
+        }
+
+    def media(self, post_id: str, format_id: str) -> bytes:
+        """Deterministic bytes of a rendition, unique per post and format."""
+        shares = {f[0]: f[3] for formats in FORMATS.values() for f in formats}
+        size = int(self.media_bytes * shares.get(format_id, 0.05))
+        block = hashlib.sha256(f"{post_id}-{format_id}".encode()).digest()
+        return (block * (size // len(block) + 1))[:size]
+
+    # Fault injection
+
+    def _inject(self) -> Optional[int]:
+        """Sleep for the configured latency and maybe pick an error status."""
+        with self._lock:
+            jitter = self._random.uniform(-self.latency_jitter, self.latency_jitter)
+            roll = self._random.random()
+        if self.latency > 0:
+            time.sleep(self.latency * (1 + jitter))
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.failure_rate:
+            return 500
+        return None
+
+    def _count(self, status: int, sent: int) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += sent
+            self.stats["status"][status] = self.stats["status"].get(status, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakePlatform
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        error = self.fake._inject()
+        if error is not None:
+            self._send(error, b'{"error": "injected"}', "application/json")
+            return
+
+        url = urlparse(self.path)
+        if match := LISTING_RE.match(url.path):
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            body = self.fake.listing(match["platform"], match["user"], page)
+        elif match := INFO_RE.match(url.path):
+            body = self.fake.info(match["platform"], match["id"])
+        elif match := MEDIA_RE.match(url.path):
+            content_type = "image/jpeg" if match["ext"] == "jpg" else "video/mp4"
+            self._send(200, self.fake.media(match["id"], match["format"]), content_type)
+            return
+        else:
+            self._send(404, b'{"error": "not found"}', "application/json")
+            return
+
+        self._send(200, json.dumps(body).encode(), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.fake._count(status, len(body))
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
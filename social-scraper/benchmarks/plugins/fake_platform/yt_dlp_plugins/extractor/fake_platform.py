@@ -0,0 +1,42 @@
+"""yt-dlp extractors for the local benchmark server (benchmarks/fake_platform.py)."""
+
+from yt_dlp.extractor.common import InfoExtractor
+
+_BASE_RE = r"(?P<base>https?://(?:127\.0\.0\.1|localhost):\d+)/(?P<platform>tiktok|youtube)"
+
+
+class FakePlatformUserIE(InfoExtractor):
+    IE_NAME = "fakeplatform:user"
+    _VALID_URL = _BASE_RE + r"/@(?P<id>[^/?#]+)"
+
+    def _entries(self, base, platform, user):
+        page = 1
+        while True:
+            listing = self._download_json(
+                f"{base}/{platform}/@{user}/posts?page={page}", user, note=f"Downloading page {page}"
+            )
+            for post in listing["posts"]:
+                yield self.url_result(
+                    f"{base}/{platform}/video/{post['id']}", FakePlatformVideoIE, post["id"]
+                )
+            if not listing.get("has_more"):
+                return
+            page += 1
+
+    def _real_extract(self, url):
+        base, platform, user = self._match_valid_url(url).group("base", "platform", "id")
+        return self.playlist_result(self._entries(base, platform, user), user, user)
+
+
+class FakePlatformVideoIE(InfoExtractor):
+    IE_NAME = "fakeplatform:video"
+    _VALID_URL = _BASE_RE + r"/video/(?P<id>[\w-]+)"
+
+    def _real_extract(self, url):
+        base, platform, video_id = self._match_valid_url(url).group("base", "platform", "id")
+        info = self._download_json(f"{base}/{platform}/video/{video_id}.info.json", video_id)
+        for fmt in info["formats"]:
+            fmt["url"] = base + fmt["url"]
+        info["thumbnail"] = base + info["thumbnail"]
+        info["webpage_url"] = url
+        return info
@@ -19,6 +19,78 @@ OUTPUT_DIR = BASE_DIR / "output"
 MAX_POSTS_PER_ACCOUNT = 50
 REQUEST_DELAY = 2  # seconds between requests
 
+# Per-platform token buckets shared by all workers (and processes) of a platform.
+# burst is how many requests may go out back to back after an idle period.
+RATE_LIMITS = {
+    "tiktok": {"requests_per_minute": 30, "burst": 5},
+    "instagram": {"requests_per_minute": 20, "burst": 3},
+    "youtube": {"requests_per_minute": 60, "burst": 10},
+}
+RATE_LIMIT_STATE_DIR = OUTPUT_DIR / ".ratelimit"
+
+# Incremental scraping: stop at the first post already scraped on a previous run.
+# yt-dlp keeps a download archive per account; Instagram keeps a date cursor.
+INCREMENTAL_SCRAPING = True
+DOWNLOAD_ARCHIVE_FILE = "download_archive.txt"
+CURSOR_FILE = "cursor.json"
+
+# Circuit breaker per platform: after failure_threshold blocked scrapes in a
+# row, that platform's workers pause for base_delay seconds, doubling on every
+# blocked probe up to max_delay (minus up to `jitter` of it, at random).
+# Blocked accounts are put back in the queue up to MAX_BLOCKED_DEFERRALS times.
+CIRCUIT_BREAKER = {"failure_threshold": 2, "base_delay": 60, "max_delay": 1800, "jitter": 0.5}
+MAX_BLOCKED_DEFERRALS = 3
+
+# Job table of every influencer x platform scrape, used to resume runs,
+# retry failed jobs and share one run between several processes
+JOBS_DB = OUTPUT_DIR / ".jobs" / "jobs.db"
+
+# Content-addressed media store: downloaded videos are kept once per unique
+# content under OUTPUT_DIR/.media and linked into each post's directory
+MEDIA_STORE = True
+
+# Metadata-only runs append timestamped view/like/comment counts here
+ENGAGEMENT_FILE = "engagement.jsonl"
+
+# Shortest side (px) a video needs for on-screen text to stay readable for
+# OCR at the 1 fps frames the video processor extracts
+ANALYSIS_MIN_RESOLUTION = 480
+
+# yt-dlp format options per download profile and platform (Instagram has no
+# format choice). "standard" keeps the original behaviour; "analysis" takes the
+# smallest rendition at or above ANALYSIS_MIN_RESOLUTION plus the best audio,
+# which is all transcription and OCR need; "audio-only" keeps just the audio
+# (extracted to .m4a) for transcription-only studies.
+DOWNLOAD_PROFILE = "standard"
+DOWNLOAD_PROFILES = {
+    "standard": {
+        "tiktok": ["-f", "best"],
+        "youtube": ["-f", "bestvideo[height<=720]+bestaudio/best[height<=720]/best"],
+    },
+    "analysis": {
+        # TikTok videos are portrait with muxed audio: floor the width, prefer small files
+        "tiktok": ["-f", f"b[width>={ANALYSIS_MIN_RESOLUTION}]/b", "-S", "+size,+br"],
+        # Lowest resolution above the floor, preferring mp4/m4a so videos stay .mp4
+        "youtube": [
+            "-f", f"bv*[height>={ANALYSIS_MIN_RESOLUTION}]+ba/b[height>={ANALYSIS_MIN_RESOLUTION}]/bv*+ba/b",
+            "-S", "ext:mp4:m4a,+res,+vbr",
+        ],
+    },
+    "archive": {
+        "tiktok": ["-f", "best"],
+        "youtube": ["-f", "bv*+ba/b"],
+    },
+    "audio-only": {
+        "tiktok": ["-f", "ba/b", "-S", "+size,+br", "-x", "--audio-format", "m4a"],
+        "youtube": ["-f", "ba[ext=m4a]/ba/b", "-x", "--audio-format", "m4a"],
+    },
+}
+
+# How TikTok/YouTube scrapers run yt-dlp: "subprocess" starts the yt-dlp
+# executable per account; "inprocess" keeps one yt_dlp.YoutubeDL per worker
+# and reuses its extractors and HTTP connections across accounts.
+YTDLP_ENGINE = "subprocess"
+
 
 class Config:
     """Configuration container for scraper defaults."""
@@ -31,6 +103,16 @@ class Config:
 INSTAGRAM_USERNAME = os.getenv("INSTAGRAM_UN", "")
 INSTAGRAM_PASSWORD = os.getenv("INSTAGRAM_PW", "")
 
+# Saved instaloader sessions to spread Instagram requests across, e.g.
+# INSTAGRAM_SESSIONS=research1,research2 (save each with: instaloader -l USER).
+# Defaults to INSTAGRAM_USERNAME; without any, Instagram is scraped logged out.
+INSTAGRAM_SESSIONS = [u.strip() for u in os.getenv("INSTAGRAM_SESSIONS", "").split(",") if u.strip()]
+
+# Request budget of each session, on top of RATE_LIMITS["instagram"] for the
+# whole machine, and how long a rate-limited session rests (doubling on repeats)
+INSTAGRAM_SESSION_RATE = {"requests_per_minute": 10, "burst": 2}
+INSTAGRAM_SESSION_COOLDOWN = 600
+
 # Column indices in CSV (0-indexed)
 CSV_COLUMNS = {
     "name": 0,
@@ -7,8 +7,10 @@ Reads influencer data from CSV and scrapes their social media accounts.
 
 import csv
 import logging
+import os
 import sys
 import json
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -17,6 +19,13 @@ from tqdm import tqdm
 
 import config
 from scrapers import TikTokScraper, InstagramScraper, YouTubeScraper
+from scrapers.scheduler import PLATFORM_URL_KEYS, ScrapeScheduler, parse_workers
+from scrapers.base import MEDIA_SUFFIXES
+from scrapers.jobs import JobStore
+from scrapers.media_store import MediaStore, media_store_path
+from scrapers.store import compact_metadata
+from scrapers.work_queue import WorkQueue, queue_path
+from scrapers.ytdlp_engine import ENGINES
 
 # Configure logging
 logging.basicConfig(
@@ -97,24 +106,47 @@ def scrape_influencer(
     return results
 
 
+def ingest_media(output_dir: Path) -> dict:
+    """Add every downloaded video under the output directory to the media store."""
+    media_store = MediaStore(media_store_path(output_dir))
+    videos = [
+        path
+        for influencer_dir in sorted(output_dir.iterdir())
+        if influencer_dir.is_dir() and not influencer_dir.name.startswith(".")
+        for path in sorted(influencer_dir.glob("*/*"))
+        if path.suffix in MEDIA_SUFFIXES
+    ]
+
+    for path in tqdm(videos, desc="Hashing videos"):
+        try:
+            media_store.ingest(path, influencer=path.parent.parent.name, platform=path.parent.name)
+        except OSError as e:
+            logger.warning(f"Could not add {path} to the media store: {e}")
+
+    return media_store.stats()
+
+
 def generate_report(all_results: list[dict], output_dir: Path) -> None:
     """Generate a summary report of scraping results."""
     report = {
         "timestamp": datetime.now().isoformat(),
         "total_influencers": len(all_results),
         "summary": {
-            "tiktok": {"success": 0, "failed": 0, "total_posts": 0},
-            "instagram": {"success": 0, "failed": 0, "total_posts": 0},
-            "youtube": {"success": 0, "failed": 0, "total_posts": 0},
+            platform: {"success": 0, "failed": 0, "pending": 0, "total_posts": 0, "total_snapshots": 0}
+            for platform in ("tiktok", "instagram", "youtube")
         },
         "details": all_results,
     }
 
     for result in all_results:
         for platform, data in result["platforms"].items():
-            if data["success"]:
+            if data.get("status") in ("pending", "running"):
+                # Not finished yet, e.g. still running in another process
+                report["summary"][platform]["pending"] += 1
+            elif data["success"]:
                 report["summary"][platform]["success"] += 1
                 report["summary"][platform]["total_posts"] += data["posts_downloaded"]
+                report["summary"][platform]["total_snapshots"] += data.get("snapshots", 0)
             else:
                 report["summary"][platform]["failed"] += 1
 
@@ -134,7 +166,11 @@ def generate_report(all_results: list[dict], output_dir: Path) -> None:
         print(f"{platform.upper()}:")
         print(f"  Successful: {stats['success']}")
         print(f"  Failed: {stats['failed']}")
+        if stats["pending"]:
+            print(f"  Not finished: {stats['pending']}")
         print(f"  Total posts downloaded: {stats['total_posts']}")
+        if stats["total_snapshots"]:
+            print(f"  Engagement snapshots: {stats['total_snapshots']}")
         print()
 
     print(f"Report saved to: {report_path}")
@@ -145,6 +181,16 @@ def main(
     start_index: int = 0,
     end_index: Optional[int] = None,
     platforms: Optional[list[str]] = None,
+    workers: Optional[dict[str, int]] = None,
+    incremental: bool = config.INCREMENTAL_SCRAPING,
+    engine: str = config.YTDLP_ENGINE,
+    metadata_only: bool = False,
+    queue_videos: bool = False,
+    dedupe_media: bool = config.MEDIA_STORE,
+    resume: bool = False,
+    retry_failed: bool = False,
+    jobs_db: Path = config.JOBS_DB,
+    download_profile: str = config.DOWNLOAD_PROFILE,
 ):
     """
     Main entry point for the scraper.
@@ -153,6 +199,16 @@ def main(
         start_index: Start from this influencer index (0-based)
         end_index: End at this influencer index (exclusive)
         platforms: List of platforms to scrape (tiktok, instagram, youtube)
+        workers: Number of concurrent workers per platform (default: 1 each)
+        incremental: Stop at posts already scraped on a previous run
+        engine: How TikTok/YouTube run yt-dlp ("subprocess" or "inprocess")
+        metadata_only: Skip media and save engagement snapshots instead
+        queue_videos: Enqueue each finished video for batch_process.py --queue
+        dedupe_media: Keep videos in the content-addressed media store
+        resume: Skip jobs that finished on an earlier run of the same jobs
+        retry_failed: Resume, and run the jobs that failed again
+        jobs_db: SQLite job table shared by runs and processes
+        download_profile: yt-dlp format profile from config.DOWNLOAD_PROFILES
     """
     print("=" * 60)
     print("NJ INFLUENCER SOCIAL MEDIA SCRAPER")
@@ -184,51 +240,62 @@ def main(
     print(f"Output directory: {config.OUTPUT_DIR}")
     print()
 
-    # Initialize scrapers
-    tiktok_scraper = TikTokScraper(config.OUTPUT_DIR)
-    instagram_scraper = InstagramScraper(config.OUTPUT_DIR)
-    youtube_scraper = YouTubeScraper(config.OUTPUT_DIR)
+    work_queue = WorkQueue(queue_path(config.OUTPUT_DIR)) if queue_videos else None
+    if work_queue:
+        print(f"Queueing videos for processing: {work_queue.path}")
+
+    media_store = MediaStore(media_store_path(config.OUTPUT_DIR)) if dedupe_media else None
+
+    # Each worker builds its own scraper; scrapers of one platform share a rate budget
+    shared = {
+        "metadata_only": metadata_only,
+        "work_queue": work_queue,
+        "media_store": media_store,
+        "download_profile": download_profile,
+    }
+    scraper_factories = {
+        "tiktok": lambda: TikTokScraper(config.OUTPUT_DIR, incremental, engine, **shared),
+        "instagram": lambda: InstagramScraper(config.OUTPUT_DIR, incremental, **shared, session_pool=session_pool),
+        "youtube": lambda: YouTubeScraper(config.OUTPUT_DIR, incremental, engine, **shared),
+    }
 
     # Filter platforms if specified
     if platforms:
         platforms = [p.lower() for p in platforms]
+        scraper_factories = {p: f for p, f in scraper_factories.items() if p in platforms}
+
+    # Instagram workers share one pool of saved sessions
+    session_pool = InstagramScraper.build_session_pool(metadata_only) if "instagram" in scraper_factories else None
+
+    job_store = JobStore(jobs_db)
+    counts = job_store.prepare(
+        [
+            (influencer["name"], platform, influencer[PLATFORM_URL_KEYS[platform]])
+            for influencer in influencers
+            for platform in scraper_factories
+            if influencer[PLATFORM_URL_KEYS[platform]]
+        ],
+        resume=resume or retry_failed,
+        retry_failed=retry_failed,
+    )
+    if resume or retry_failed:
+        print(f"Resuming: {counts['done']} jobs done, {counts['failed']} failed, "
+              f"{counts['running']} running elsewhere, {counts['pending']} to scrape")
 
-    # Scrape each influencer
-    all_results = []
+    scheduler = ScrapeScheduler(scraper_factories, workers, job_store=job_store)
 
-    for influencer in tqdm(influencers, desc="Processing influencers"):
-        try:
-            # Filter URLs based on platform selection
-            filtered_influencer = influencer.copy()
-            if platforms:
-                if "tiktok" not in platforms:
-                    filtered_influencer["tiktok_url"] = None
-                if "instagram" not in platforms:
-                    filtered_influencer["instagram_url"] = None
-                if "youtube" not in platforms:
-                    filtered_influencer["youtube_url"] = None
-
-            result = scrape_influencer(
-                filtered_influencer,
-                tiktok_scraper,
-                instagram_scraper,
-                youtube_scraper,
-            )
-            all_results.append(result)
-
-        except KeyboardInterrupt:
-            logger.info("Interrupted by user")
-            break
-        except Exception as e:
-            logger.error(f"Error processing {influencer['name']}: {e}")
-            all_results.append({
-                "name": influencer["name"],
-                "platforms": {},
-                "error": str(e),
-            })
-
-    # Generate report
-    generate_report(all_results, config.OUTPUT_DIR)
+    # While registered as a producer, queue consumers wait for more videos
+    producing = work_queue.producing(f"main-{os.getpid()}") if work_queue else nullcontext()
+
+    with producing, tqdm(total=counts["pending"], desc="Scraping accounts") as progress:
+        scheduler.run(
+            influencers,
+            on_job_done=lambda platform, influencer, result: progress.update(1),
+        )
+
+    # Report every job of this run from the table, including jobs finished
+    # by earlier runs or by other processes
+    generate_report(job_store.results(), config.OUTPUT_DIR)
 
 
 if __name__ == "__main__":
@@ -253,6 +320,70 @@ if __name__ == "__main__":
         choices=["tiktok", "instagram", "youtube"],
         help="Specific platforms to scrape",
     )
+    parser.add_argument(
+        "--workers",
+        type=parse_workers,
+        default=None,
+        help="Concurrent workers per platform, e.g. tiktok=4,instagram=1,youtube=3",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Ignore saved cursors and download archives; re-check the newest posts",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=config.YTDLP_ENGINE,
+        help="Run yt-dlp as a subprocess per account or in-process with one session per worker",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(config.DOWNLOAD_PROFILES),
+        default=config.DOWNLOAD_PROFILE,
+        help="Download profile: analysis keeps only what transcription/OCR need, archive the best quality",
+    )
+    parser.add_argument(
+        "--metadata-only",
+        action="store_true",
+        help="Skip media downloads and append engagement snapshots to engagement.jsonl",
+    )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Queue each downloaded video for analysis/video_processor/batch_process.py --queue",
+    )
+    parser.add_argument(
+        "--no-media-store",
+        action="store_true",
+        help="Keep a separate copy of every video instead of deduplicating into output/.media",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Only scrape jobs that did not finish on an earlier run (or are not claimed by another process)",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Like --resume, but also scrape failed jobs again",
+    )
+    parser.add_argument(
+        "--jobs-db",
+        type=Path,
+        default=config.JOBS_DB,
+        help="SQLite job table to use (default: output/.jobs/jobs.db)",
+    )
+    parser.add_argument(
+        "--ingest-media",
+        action="store_true",
+        help="Add all videos already downloaded to the media store and exit",
+    )
+    parser.add_argument(
+        "--compact-metadata",
+        action="store_true",
+        help="Compact every metadata.jsonl under the output directory and exit",
+    )
     parser.add_argument(
         "--test",
         action="store_true",
@@ -261,6 +392,21 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    if args.compact_metadata:
+        stats = compact_metadata(
+            config.OUTPUT_DIR,
+            keys={InstagramScraper.platform_name: InstagramScraper.metadata_key},
+        )
+        print(f"Compacted {stats['stores']} metadata stores: "
+              f"{stats['kept']} records kept, {stats['dropped']} duplicates/bad lines dropped")
+        sys.exit(0)
+
+    if args.ingest_media:
+        stats = ingest_media(config.OUTPUT_DIR)
+        print(f"Media store: {stats['paths']} videos, {stats['blobs']} unique, "
+              f"{stats['bytes_saved'] / 1e6:.1f} MB saved by deduplication")
+        sys.exit(0)
+
     if args.test:
         args.end = 1
 
@@ -268,4 +414,14 @@ if __name__ == "__main__":
         start_index=args.start,
         end_index=args.end,
         platforms=args.platforms,
+        workers=args.workers,
+        incremental=not args.full_refresh,
+        engine=args.engine,
+        metadata_only=args.metadata_only,
+        queue_videos=args.queue,
+        dedupe_media=config.MEDIA_STORE and not args.no_media_store,
+        resume=args.resume,
+        retry_failed=args.retry_failed,
+        jobs_db=args.jobs_db,
+        download_profile=args.profile,
     )
@@ -6,8 +6,12 @@ Uses Claude, Gemini, or OpenAI for semantic and sentiment analysis of NJ influen
 Analyzes post titles, descriptions, and captions.
 
 Supports two modes:
-- Real-time: Process one at a time with checkpointing (default)
+- Real-time: Concurrent requests under per-provider rate limits, with checkpointing (default)
 - Batch mode: Submit all to Claude's Batch API for 50% cost savings (--batch-mode)
+
+Either mode can ask for semantic and sentiment analysis in one request per
+post (--combined), halving the requests. In real-time mode --pack also packs
+several short posts into each request.
 """
 
 import os
@@ -29,17 +33,19 @@ from datetime import datetime
 
 from content_analysis.semantic_analyzer import SemanticAnalyzer, ContentAnalysis
 from content_analysis.sentiment_analyzer import SentimentAnalyzer
+from content_analysis.combined_analyzer import CombinedAnalyzer, PACK_TOKENS
+from request_engine import DEFAULT_CONCURRENCY
+from response_cache import default_cache
+from corpus import load_posts as load_corpus
+
+# Corpus columns the analysis prompts are built from
+POST_COLUMNS = ['post_id', 'influencer_name', 'platform', 'title', 'caption', 'description',
+                'duration_seconds']
 
 
 def load_posts(data_dir: str = "analysis/data") -> pd.DataFrame:
     """Load consolidated post data."""
-    csv_path = Path(data_dir) / "all_posts.csv"
-    if not csv_path.exists():
-        raise FileNotFoundError(f"Run consolidate.py first: {csv_path}")
-
-    df = pd.read_csv(csv_path)
-    print(f"Loaded {len(df)} posts from {csv_path}")
-    return df
+    return load_corpus(data_dir, columns=POST_COLUMNS)
 
 
 def prepare_content_for_analysis(df: pd.DataFrame) -> list:
@@ -77,7 +83,11 @@ def run_semantic_analysis(
     content_list: list,
     output_dir: str,
     limit: int = 0,
-    provider: str = "claude"
+    provider: str = "claude",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rpm: int = None,
+    tpm: int = None,
+    cache=None
 ):
     """Run semantic analysis on content."""
     print(f"\n{'='*60}")
@@ -90,7 +100,7 @@ def run_semantic_analysis(
     else:
         print(f"Analyzing all {len(content_list)} posts")
 
-    analyzer = SemanticAnalyzer(provider=provider)
+    analyzer = SemanticAnalyzer(provider=provider, concurrency=concurrency, rpm=rpm, tpm=tpm, cache=cache)
 
     output_path = Path(output_dir) / "semantic"
     output_path.mkdir(parents=True, exist_ok=True)
@@ -107,7 +117,11 @@ def run_sentiment_analysis(
     content_list: list,
     output_dir: str,
     limit: int = 0,
-    provider: str = "claude"
+    provider: str = "claude",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rpm: int = None,
+    tpm: int = None,
+    cache=None
 ):
     """Run sentiment analysis on content."""
     print(f"\n{'='*60}")
@@ -117,7 +131,7 @@ def run_sentiment_analysis(
     if limit > 0:
         content_list = content_list[:limit]
 
-    analyzer = SentimentAnalyzer(provider=provider)
+    analyzer = SentimentAnalyzer(provider=provider, concurrency=concurrency, rpm=rpm, tpm=tpm, cache=cache)
 
     output_path = Path(output_dir) / "sentiment"
     output_path.mkdir(parents=True, exist_ok=True)
@@ -130,7 +144,40 @@ def run_sentiment_analysis(
     return results
 
 
-def run_batch_analysis(content_list: list, output_dir: str, limit: int = 0):
+def run_combined_analysis(
+    content_list: list,
+    output_dir: str,
+    limit: int = 0,
+    provider: str = "claude",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rpm: int = None,
+    tpm: int = None,
+    cache=None,
+    pack_tokens: int = 0
+):
+    """Run semantic and sentiment analysis on content, one request per post (or pack of short posts)."""
+    print(f"\n{'='*60}")
+    print(f"SEMANTIC + SENTIMENT ANALYSIS, COMBINED (using {provider.upper()})")
+    print(f"{'='*60}")
+
+    if limit > 0:
+        content_list = content_list[:limit]
+        print(f"Analyzing {limit} posts (limited)")
+    else:
+        print(f"Analyzing all {len(content_list)} posts")
+
+    analyzer = CombinedAnalyzer(provider=provider, concurrency=concurrency, rpm=rpm, tpm=tpm, cache=cache,
+                                pack_tokens=pack_tokens)
+
+    semantic_results, sentiment_results = analyzer.batch_analyze(content_list, output_dir)
+
+    print(f"\nCombined analysis complete: {len(semantic_results)} posts analyzed")
+    print(f"API calls made: {analyzer.total_api_calls}")
+
+    return semantic_results, sentiment_results
+
+
+def run_batch_analysis(content_list: list, output_dir: str, limit: int = 0, cache=None, combined: bool = False):
     """Run batch analysis using Claude's Batch API (50% cost savings)."""
     from content_analysis.batch_analyzer import ClaudeBatchAnalyzer
 
@@ -145,8 +192,8 @@ def run_batch_analysis(content_list: list, output_dir: str, limit: int = 0):
     else:
         print(f"Analyzing all {len(content_list)} posts")
 
-    analyzer = ClaudeBatchAnalyzer()
-    results = analyzer.run_full_batch_analysis(content_list, output_dir)
+    analyzer = ClaudeBatchAnalyzer(cache=cache)
+    results = analyzer.run_full_batch_analysis(content_list, output_dir, combined=combined)
 
     return results
 
@@ -164,9 +211,29 @@ def main():
     parser.add_argument("--sentiment-only", action="store_true", help="Only run sentiment analysis")
     parser.add_argument("--batch-mode", action="store_true",
                         help="Use Claude Batch API for 50% cost savings (async, ~1hr)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Real-time requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rpm", type=int, default=None,
+                        help="Requests per minute limit (default: the provider's lowest paid tier)")
+    parser.add_argument("--tpm", type=int, default=None,
+                        help="Input tokens per minute limit (default: the provider's lowest paid tier)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the response cache and call the API for every post")
+    parser.add_argument("--combined", action="store_true",
+                        help="Ask for semantic and sentiment analysis in one request per post")
+    parser.add_argument("--pack", action="store_true",
+                        help="Like --combined, but pack several short posts into each request")
+    parser.add_argument("--pack-tokens", type=int, default=PACK_TOKENS,
+                        help=f"Input token budget of a packed request (default: {PACK_TOKENS})")
 
     args = parser.parse_args()
 
+    if args.pack and args.batch_mode:
+        parser.error("--pack is for real-time mode; use --combined with --batch-mode")
+    args.combined = args.combined or args.pack
+    if args.combined and (args.semantic_only or args.sentiment_only):
+        parser.error("--combined and --pack run both analyses; drop --semantic-only/--sentiment-only")
+
     # Load data
     df = load_posts(args.data_dir)
     content_list = prepare_content_for_analysis(df)
@@ -178,12 +245,15 @@ def main():
         content_list = content_list[args.offset:]
         print(f"Skipping first {args.offset} posts (offset), {len(content_list)} remaining")
 
+    # None selects the shared response cache, False turns caching off
+    cache = False if args.no_cache else None
+
     # Batch mode (Claude only, 50% cost savings)
     if args.batch_mode:
         if not os.environ.get("ANTHROPIC_API_KEY"):
             print("ERROR: ANTHROPIC_API_KEY required for batch mode")
             sys.exit(1)
-        run_batch_analysis(content_list, args.output, args.limit)
+        run_batch_analysis(content_list, args.output, args.limit, cache, args.combined)
         return
 
     # Real-time mode - check API key
@@ -208,16 +278,25 @@ def main():
     output_path.mkdir(parents=True, exist_ok=True)
 
     # Run analyses
-    if not args.sentiment_only:
-        run_semantic_analysis(content_list, args.output, args.limit, args.provider)
+    if args.combined:
+        run_combined_analysis(content_list, args.output, args.limit, args.provider,
+                              args.concurrency, args.rpm, args.tpm, cache,
+                              args.pack_tokens if args.pack else 0)
+
+    if not args.sentiment_only and not args.combined:
+        run_semantic_analysis(content_list, args.output, args.limit, args.provider,
+                              args.concurrency, args.rpm, args.tpm, cache)
 
-    if not args.semantic_only:
-        run_sentiment_analysis(content_list, args.output, args.limit, args.provider)
+    if not args.semantic_only and not args.combined:
+        run_sentiment_analysis(content_list, args.output, args.limit, args.provider,
+                               args.concurrency, args.rpm, args.tpm, cache)
 
     print(f"\n{'='*60}")
     print("AI ANALYSIS COMPLETE")
     print(f"{'='*60}")
     print(f"Results saved to: {args.output}")
+    if not args.no_cache:
+        print(default_cache().summary())
 
 
 if __name__ == "__main__":
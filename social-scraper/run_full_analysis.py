@@ -9,19 +9,13 @@ import sys
 import time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / "analysis" / "content_analysis"))
+
+from checkpoint_log import count_completed
+
 BATCH_SIZE = 500
 TOTAL_POSTS = 3364
 
-def get_checkpoint_count(checkpoint_path):
-    """Get number of completed items from checkpoint."""
-    import json
-    try:
-        with open(checkpoint_path) as f:
-            data = json.load(f)
-            return len(data.get("completed_ids", []))
-    except:
-        return 0
-
 def run_batch(limit):
     """Run analysis up to specified limit."""
     print(f"\n{'='*60}")
@@ -46,11 +40,8 @@ def main():
     print("="*60 + "\n")
 
     # Check current progress
-    semantic_checkpoint = Path("analysis/ai_results/semantic/analysis_checkpoint.json")
-    sentiment_checkpoint = Path("analysis/ai_results/sentiment/sentiment_checkpoint.json")
-
-    semantic_done = get_checkpoint_count(semantic_checkpoint)
-    sentiment_done = get_checkpoint_count(sentiment_checkpoint)
+    semantic_done = count_completed("analysis/ai_results/semantic", "analysis_checkpoint")
+    sentiment_done = count_completed("analysis/ai_results/sentiment", "sentiment_checkpoint")
 
     print(f"Current progress:")
     print(f"  Semantic: {semantic_done} posts")
@@ -15,6 +15,10 @@ from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent / "analysis" / "content_analysis"))
+
+from checkpoint_log import count_completed
+
 # Configuration
 PROVIDERS = {
     "claude": {
@@ -46,16 +50,8 @@ def check_api_keys():
 def get_checkpoint_count(output_dir, analysis_type):
     """Get completed count from checkpoint file."""
     if analysis_type == "semantic":
-        checkpoint_path = Path(output_dir) / "semantic" / "analysis_checkpoint.json"
-    else:
-        checkpoint_path = Path(output_dir) / "sentiment" / "sentiment_checkpoint.json"
-
-    try:
-        with open(checkpoint_path) as f:
-            data = json.load(f)
-            return len(data.get("completed_ids", []))
-    except:
-        return 0
+        return count_completed(Path(output_dir) / "semantic", "analysis_checkpoint")
+    return count_completed(Path(output_dir) / "sentiment", "sentiment_checkpoint")
 
 
 def run_provider_batch(provider, start_idx, end_idx):
@@ -1,26 +1,59 @@
 """Base scraper class with common functionality."""
 
 import json
-import time
 import logging
+import sqlite3
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import config
+from .ratelimit import get_limiter
+from .media_store import MediaStore
+from .store import JsonlStore, metadata_store
+from .work_queue import WorkQueue
 
 logger = logging.getLogger(__name__)
 
+# yt-dlp exit code when --max-downloads or --break-on-existing stopped the run
+YTDLP_DOWNLOADS_STOPPED = 101
+
+VIDEO_SUFFIXES = (".mp4", ".webm", ".mkv")
+AUDIO_SUFFIXES = (".m4a", ".mp3", ".opus")  # audio-only download profile
+MEDIA_SUFFIXES = VIDEO_SUFFIXES + AUDIO_SUFFIXES
+
 
 class BaseScraper(ABC):
     """Base class for all social media scrapers."""
 
     platform_name: str = "base"
-
-    def __init__(self, output_dir: Path):
+    metadata_key: str = "id"  # Field that identifies a post in metadata records
+
+    def __init__(
+        self,
+        output_dir: Path,
+        incremental: bool = config.INCREMENTAL_SCRAPING,
+        metadata_only: bool = False,
+        work_queue: Optional[WorkQueue] = None,
+        media_store: Optional[MediaStore] = None,
+        download_profile: str = config.DOWNLOAD_PROFILE,
+    ):
+        if download_profile not in config.DOWNLOAD_PROFILES:
+            raise ValueError(
+                f"Unknown download profile: {download_profile} "
+                f"(expected one of {', '.join(config.DOWNLOAD_PROFILES)})"
+            )
         self.output_dir = output_dir
         self.max_posts = config.MAX_POSTS_PER_ACCOUNT
         self.delay = config.REQUEST_DELAY
+        self.metadata_only = metadata_only
+        # Snapshots must cover the newest posts every time, not only unseen ones
+        self.incremental = incremental and not metadata_only
+        self.work_queue = work_queue
+        self.media_store = media_store
+        self.download_profile = download_profile
+        self.limiter = get_limiter(self.platform_name)
 
     def get_output_path(self, influencer_name: str) -> Path:
         """Get the output directory for an influencer's content."""
@@ -32,33 +65,122 @@ class BaseScraper(ABC):
         path.mkdir(parents=True, exist_ok=True)
         return path
 
-    def save_metadata(self, output_path: Path, metadata: dict) -> None:
-        """Save metadata to a JSON file."""
-        metadata_file = output_path / "metadata.json"
-
-        # Load existing metadata if it exists
-        existing = []
-        if metadata_file.exists():
-            try:
-                with open(metadata_file, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
-                    if not isinstance(existing, list):
-                        existing = [existing]
-            except json.JSONDecodeError:
-                existing = []
-
-        # Append new metadata
-        if isinstance(metadata, list):
-            existing.extend(metadata)
-        else:
-            existing.append(metadata)
-
-        with open(metadata_file, "w", encoding="utf-8") as f:
-            json.dump(existing, f, indent=2, default=str, ensure_ascii=False)
+    def save_metadata(self, output_path: Path, metadata) -> None:
+        """Append post metadata to the platform directory's metadata.jsonl, skipping known posts."""
+        store = metadata_store(output_path, key=self.metadata_key)
+        written = store.append(metadata)
+        logger.debug(f"Saved {written} new metadata records to {store.path}")
+
+    def save_snapshots(self, output_path: Path, snapshots: list[dict]) -> int:
+        """
+        Append engagement snapshots to the platform directory's engagement.jsonl.
+
+        Every record gets the same capture time, and null counts are dropped
+        to keep the file small. Each record holds the post's id under "id".
+
+        Returns:
+            Number of snapshots written
+        """
+        captured_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        records = [
+            {"id": s["id"], "captured_at": captured_at, **{k: v for k, v in s.items() if v is not None and k != "id"}}
+            for s in snapshots
+            if s.get("id") is not None
+        ]
+        store = JsonlStore(output_path / config.ENGAGEMENT_FILE, key=None)
+        written = store.append(records)
+        logger.debug(f"Saved {written} engagement snapshots to {store.path}")
+        return written
+
+    def format_args(self) -> list[str]:
+        """yt-dlp format options of the scraper's download profile."""
+        return list(config.DOWNLOAD_PROFILES[self.download_profile].get(self.platform_name, []))
+
+    def on_videos(self, paths) -> None:
+        """
+        Handle video files as soon as they are on disk.
+
+        Each video (or audio-only download) is added to the media store
+        (deduplicating identical files) and queued for the video processor,
+        where those are set. Only .mp4 files are queued, matching
+        batch_process.find_platform_videos.
+        """
+        for path in paths:
+            path = Path(path)
+            if path.suffix not in MEDIA_SUFFIXES or not path.exists():
+                continue
+            # Same influencer name batch_process derives from the directory layout
+            influencer = path.parent.parent.name
+
+            digest = None
+            if self.media_store is not None:
+                try:
+                    digest = self.media_store.ingest(path, influencer, self.platform_name)
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"Could not add {path} to the media store: {e}")
+
+            if self.work_queue is not None and path.suffix == ".mp4":
+                try:
+                    if self.work_queue.enqueue(path, influencer, self.platform_name, digest):
+                        logger.debug(f"Queued {path} for video processing")
+                except sqlite3.Error as e:
+                    # The video is on disk either way; a batch_process scan can still find it
+                    logger.warning(f"Could not queue {path} for video processing: {e}")
+
+    def load_cursor(self, output_path: Path) -> dict:
+        """Load the per-account high-water mark saved by a previous run."""
+        cursor_file = output_path / config.CURSOR_FILE
+        if not cursor_file.exists():
+            return {}
+        try:
+            with open(cursor_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable cursor {cursor_file}: {e}")
+            return {}
+
+    def save_cursor(self, output_path: Path, cursor: dict) -> None:
+        """Persist the per-account high-water mark."""
+        cursor_file = output_path / config.CURSOR_FILE
+        tmp_file = cursor_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cursor, f, indent=2, default=str)
+        tmp_file.replace(cursor_file)
+
+    def get_download_archive(self, output_path: Path) -> Path:
+        """
+        Return the account's yt-dlp download archive, seeding it on first use.
+
+        Accounts scraped before archives existed get one built from the
+        *.info.json files already on disk, so the first incremental run does
+        not fetch everything again.
+        """
+        archive = output_path / config.DOWNLOAD_ARCHIVE_FILE
+        if not archive.exists():
+            ids = []
+            for json_file in output_path.glob("*.info.json"):
+                video_id = json_file.name[: -len(".info.json")]
+                ids.append(f"{self.platform_name} {video_id}\n")
+            if ids:
+                archive.write_text("".join(sorted(ids)), encoding="utf-8")
+                logger.info(f"Seeded download archive with {len(ids)} existing posts: {archive}")
+        return archive
 
     def rate_limit(self) -> None:
-        """Apply rate limiting delay."""
-        time.sleep(self.delay)
+        """
+        Wait for a request slot in the platform's shared token bucket.
+
+        Call this before each request. All scrapers of one platform, across
+        threads and processes, draw from the same bucket, so it only sleeps
+        for as long as the platform limit actually requires.
+        """
+        waited = self.limiter.acquire()
+        if waited > 1:
+            logger.debug(f"Waited {waited:.1f}s for {self.platform_name} rate limit")
+
+    def close(self) -> None:
+        """Release resources held between scrapes (called when a worker finishes)."""
+        pass
 
     @abstractmethod
     def extract_username(self, url: str) -> Optional[str]:
@@ -75,5 +197,10 @@ class BaseScraper(ABC):
                 - success: bool
                 - posts_downloaded: int
                 - errors: list of error messages
+                - snapshots: engagement snapshots saved (metadata-only runs)
+                - blocked: the platform is blocking requests; the scheduler
+                  backs off and tries the account again later
+                - retry: the account should be tried again later for a reason
+                  that is not the platform's (e.g. a retired session)
         """
         pass
@@ -0,0 +1,109 @@
+"""Per-platform circuit breaker that pauses scraping while a platform blocks us."""
+
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops a platform's workers after repeated blocked scrapes.
+
+    While closed, scrapes run normally. After `failure_threshold` blocked
+    scrapes in a row the breaker opens, and acquire() holds every worker of
+    the platform for an exponentially growing, jittered delay. When the delay
+    is over, one worker is let through as a probe (half-open): if its scrape
+    gets through the breaker closes again, if it is blocked as well the
+    breaker reopens with twice the delay, up to `max_delay`.
+
+    The breaker is thread-safe and shared by the workers of one platform.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 2,
+        base_delay: float = 60.0,
+        max_delay: float = 1800.0,
+        jitter: float = 0.5,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.state = CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """
+        Wait until scrapes may go out on this platform.
+
+        Returns:
+            False if `stop` was set while waiting
+        """
+        with self._cond:
+            while True:
+                if stop is not None and stop.is_set():
+                    return False
+                if self.state == CLOSED:
+                    return True
+
+                now = time.monotonic()
+                if self.state == OPEN and now >= self._open_until:
+                    # This worker probes whether the platform has recovered
+                    self.state = HALF_OPEN
+                    logger.info(f"Probing {self.name} after backoff")
+                    return True
+
+                # Wake up regularly to notice `stop`; while half-open, the
+                # probe's outcome also wakes us
+                timeout = self._open_until - now if self.state == OPEN else 1.0
+                self._cond.wait(timeout=min(timeout, 1.0))
+
+    def record_success(self) -> None:
+        """Record a scrape that was not blocked, closing the breaker."""
+        with self._cond:
+            if self.state != CLOSED:
+                logger.info(f"{self.name} is reachable again, resuming workers")
+            self.state = CLOSED
+            self._failures = 0
+            self._trips = 0
+            self._cond.notify_all()
+
+    def record_blocked(self) -> float:
+        """
+        Record a blocked scrape, opening the breaker once the threshold is hit.
+
+        Scrapes that were already running when the breaker opened don't
+        extend the pause.
+
+        Returns:
+            Seconds the platform is paused for (0 if the breaker stays closed)
+        """
+        with self._cond:
+            self._failures += 1
+            if self.state == OPEN:
+                return max(0.0, self._open_until - time.monotonic())
+            if self.state == CLOSED and self._failures < self.failure_threshold:
+                return 0.0
+
+            delay = min(self.max_delay, self.base_delay * 2 ** self._trips)
+            delay *= 1 - self.jitter * random.random()
+            self._trips += 1
+            self.state = OPEN
+            self._open_until = time.monotonic() + delay
+            logger.warning(f"{self.name} is blocking requests, pausing its workers for {delay:.0f}s")
+            self._cond.notify_all()
+            return delay
@@ -2,6 +2,7 @@
 
 import re
 import logging
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
@@ -16,52 +17,59 @@ from instaloader.exceptions import (
 
 import config
 from .base import BaseScraper
+from .instagram_sessions import ANONYMOUS, InstagramSession, NoSessionAvailableError, SessionPool, SessionsCoolingDownError
+from .store import metadata_store
+from .media_store import MediaStore
+from .work_queue import WorkQueue
 
 logger = logging.getLogger(__name__)
 
+# Posts per page of a profile's post listing; each page is one GraphQL request
+LISTING_PAGE_SIZE = 12
+
 
 class InstagramScraper(BaseScraper):
     """Scraper for Instagram posts using instaloader."""
 
     platform_name = "instagram"
+    metadata_key = "shortcode"
+
+    def __init__(
+        self,
+        output_dir: Path,
+        incremental: bool = config.INCREMENTAL_SCRAPING,
+        metadata_only: bool = False,
+        work_queue: Optional[WorkQueue] = None,
+        media_store: Optional[MediaStore] = None,
+        download_profile: str = config.DOWNLOAD_PROFILE,
+        session_pool: Optional[SessionPool] = None,
+    ):
+        # instaloader has no format choice, so the profile doesn't change Instagram downloads
+        super().__init__(output_dir, incremental, metadata_only, work_queue, media_store, download_profile)
+        # Workers share one pool; a scraper built on its own gets a private one
+        self.sessions = session_pool or self.build_session_pool(metadata_only)
+        self.session: Optional[InstagramSession] = None
+        self.loader = None
 
-    def __init__(self, output_dir: Path):
-        super().__init__(output_dir)
-        self.loader = instaloader.Instaloader(
-            download_videos=True,
-            download_video_thumbnails=True,
+    @staticmethod
+    def new_loader(metadata_only: bool = False) -> instaloader.Instaloader:
+        """Create an Instaloader with the scraper's download settings."""
+        return instaloader.Instaloader(
+            download_pictures=not metadata_only,
+            download_videos=not metadata_only,
+            download_video_thumbnails=not metadata_only,
             download_geotags=False,
             download_comments=False,
-            save_metadata=True,
+            save_metadata=not metadata_only,
             compress_json=False,
             post_metadata_txt_pattern="",
             max_connection_attempts=3,
         )
 
-        # Try to load existing session first
-        if config.INSTAGRAM_USERNAME:
-            try:
-                self.loader.load_session_from_file(config.INSTAGRAM_USERNAME)
-                logger.info(f"Loaded Instagram session for {config.INSTAGRAM_USERNAME}")
-                return
-            except FileNotFoundError:
-                logger.info("No saved session found, attempting login...")
-            except Exception as e:
-                logger.warning(f"Could not load session: {e}")
-
-        # Try to login if credentials are provided
-        if config.INSTAGRAM_USERNAME and config.INSTAGRAM_PASSWORD:
-            try:
-                self.loader.login(config.INSTAGRAM_USERNAME, config.INSTAGRAM_PASSWORD)
-                # Save session for future use
-                self.loader.save_session_to_file()
-                logger.info("Successfully logged into Instagram and saved session")
-            except Exception as e:
-                logger.warning(f"Could not login to Instagram: {e}")
-                if "two-factor" in str(e).lower():
-                    logger.warning("2FA required. Run: instaloader -l YOUR_USERNAME")
-                    logger.warning("This will prompt for 2FA code and save the session.")
-                logger.warning("Continuing without login - some features may be limited")
+    @classmethod
+    def build_session_pool(cls, metadata_only: bool = False) -> SessionPool:
+        """Load the saved sessions from config into a pool for all Instagram workers."""
+        return SessionPool.from_config(lambda: cls.new_loader(metadata_only))
 
     def extract_username(self, url: str) -> Optional[str]:
         """Extract Instagram username from URL."""
@@ -85,7 +93,69 @@ class InstagramScraper(BaseScraper):
 
         return None
 
+    def _last_post_date(self, output_path: Path) -> Optional[datetime]:
+        """
+        Get the date of the newest post scraped on a previous run.
+
+        Falls back to the newest date in the metadata store for accounts
+        scraped before cursors were saved.
+        """
+        cursor = self.load_cursor(output_path)
+        if cursor.get("last_post_date"):
+            return datetime.fromisoformat(cursor["last_post_date"])
+
+        store = metadata_store(output_path, key=self.metadata_key)
+        dates = [record["date"] for record in store if record.get("date")]
+        return datetime.fromisoformat(max(dates)) if dates else None
+
+    def rate_limit(self) -> None:
+        """Wait for both the platform budget and the current session's own budget."""
+        super().rate_limit()
+        if self.session is not None:
+            self.session.limiter.acquire()
+
+    @staticmethod
+    def _is_challenge(error: Exception) -> bool:
+        """Whether instaloader's error means the session itself is no longer usable."""
+        message = str(error).lower()
+        return any(word in message for word in ("checkpoint", "challenge", "login_required", "login required"))
+
     def scrape(self, url: str, influencer_name: str) -> dict:
+        """Scrape one profile with a session from the pool."""
+        try:
+            self.session = self.sessions.acquire()
+        except NoSessionAvailableError as e:
+            return {"success": False, "posts_downloaded": 0, "errors": [str(e)]}
+        except SessionsCoolingDownError as e:
+            # Let the scheduler back off and retry the account later
+            return {"success": False, "posts_downloaded": 0, "errors": [str(e)], "blocked": True}
+
+        self.loader = self.session.loader
+        result = {"success": False, "posts_downloaded": 0, "errors": []}
+        try:
+            result = self._scrape(url, influencer_name)
+            result["session"] = self.session.name
+        finally:
+            self.sessions.release(
+                self.session,
+                blocked=bool(result.get("blocked")),
+                challenged=bool(result.get("challenged")),
+            )
+            self.session = None
+        return result
+
+    def _flag_connection_error(self, result: dict, error: Exception) -> None:
+        """Record an instaloader ConnectionException as a challenge or a rate limit."""
+        if self._is_challenge(error) and self.session.name != ANONYMOUS:
+            result["errors"].append(f"Instagram session {self.session.name} was challenged: {error}")
+            # Retire the session and give the account to another one
+            result["challenged"] = True
+            result["retry"] = True
+        else:
+            result["errors"].append(f"Connection error: {str(error)}. Instagram may be rate limiting.")
+            result["blocked"] = True
+
+    def _scrape(self, url: str, influencer_name: str) -> dict:
         """Scrape Instagram posts using instaloader."""
         result = {
             "success": False,
@@ -104,12 +174,20 @@ class InstagramScraper(BaseScraper):
 
         try:
             # Get profile
+            self.rate_limit()
             profile = Profile.from_username(self.loader.context, username)
 
             if profile.is_private and not profile.followed_by_viewer:
                 result["errors"].append(f"Profile @{username} is private")
                 return result
 
+            # Posts come newest first; stop at the first one scraped on a previous run
+            since = self._last_post_date(output_path) if self.incremental else None
+            newest = None
+
+            if self.metadata_only:
+                return self._snapshot_posts(profile, output_path, result)
+
             # Download posts
             posts_downloaded = 0
             metadata = []
@@ -118,14 +196,30 @@ class InstagramScraper(BaseScraper):
                 if posts_downloaded >= self.max_posts:
                     break
 
+                if since and post.date_utc <= since:
+                    if post.is_pinned:
+                        # Pinned posts sit above newer ones, so they don't mark the cursor
+                        continue
+                    logger.info(f"Reached posts already scraped for @{username}")
+                    break
+
                 try:
                     # Download the post
+                    self.rate_limit()
                     self.loader.download_post(post, target=output_path)
                     posts_downloaded += 1
+                    if post.is_video or post.typename == "GraphSidecar":
+                        # instaloader names files {date_utc}_UTC[_n].mp4
+                        prefix = post.date_utc.strftime("%Y-%m-%d_%H-%M-%S") + "_UTC"
+                        self.on_videos(output_path.glob(f"{prefix}*.mp4"))
+                    if newest is None or post.date_utc > newest:
+                        newest = post.date_utc
 
                     # Collect metadata
                     post_metadata = {
                         "shortcode": post.shortcode,
+                        "id": str(post.mediaid),
+                        "owner_username": post.owner_username,
                         "url": f"https://www.instagram.com/p/{post.shortcode}/",
                         "typename": post.typename,
                         "date": post.date_utc.isoformat(),
@@ -134,11 +228,14 @@ class InstagramScraper(BaseScraper):
                         "comments": post.comments,
                         "is_video": post.is_video,
                         "video_view_count": post.video_view_count if post.is_video else None,
+                        "display_url": post.url,
                     }
                     metadata.append(post_metadata)
 
-                    self.rate_limit()
-
+                except ConnectionException as e:
+                    # Blocked mid-account: keep what was downloaded and let the scheduler retry later
+                    self._flag_connection_error(result, e)
+                    break
                 except Exception as e:
                     logger.warning(f"Error downloading post {post.shortcode}: {e}")
                     continue
@@ -148,9 +245,23 @@ class InstagramScraper(BaseScraper):
             if metadata:
                 self.save_metadata(output_path, metadata)
 
-            if posts_downloaded > 0:
+            # A blocked run may have stopped above older unseen posts, so the
+            # cursor only moves once an account was scraped without interruption
+            interrupted = result.get("blocked") or result.get("challenged")
+            if newest and not interrupted:
+                self.save_cursor(output_path, {
+                    "last_post_date": max(newest, since) if since else newest,
+                    "updated_at": datetime.now().isoformat(),
+                })
+
+            if interrupted:
+                logger.warning(f"Instagram stopped @{username} after {posts_downloaded} posts")
+            elif posts_downloaded > 0:
                 result["success"] = True
                 logger.info(f"Downloaded {posts_downloaded} Instagram posts for @{username}")
+            elif since:
+                result["success"] = True
+                logger.info(f"No new Instagram posts for @{username}")
             else:
                 result["errors"].append(f"No posts downloaded for @{username}")
 
@@ -158,12 +269,43 @@ class InstagramScraper(BaseScraper):
             result["errors"].append(f"Profile @{username} does not exist")
         except PrivateProfileNotFollowedException:
             result["errors"].append(f"Profile @{username} is private and not followed")
-        except LoginRequiredException:
-            result["errors"].append("Login required. Set INSTAGRAM_USERNAME and INSTAGRAM_PASSWORD env vars")
+        except LoginRequiredException as e:
+            if self.session.name != ANONYMOUS:
+                # The saved session expired or was logged out
+                self._flag_connection_error(result, e)
+            else:
+                result["errors"].append("Login required. Set INSTAGRAM_USERNAME and INSTAGRAM_PASSWORD env vars")
         except ConnectionException as e:
-            result["errors"].append(f"Connection error: {str(e)}. Instagram may be rate limiting.")
+            self._flag_connection_error(result, e)
         except Exception as e:
             result["errors"].append(f"Error scraping Instagram: {str(e)}")
             logger.exception(f"Error scraping Instagram for {username}")
 
         return result
+
+    def _snapshot_posts(self, profile: Profile, output_path: Path, result: dict) -> dict:
+        """Save engagement counts of the newest posts without downloading anything."""
+        snapshots = []
+        # A slot for the listing's first page, then one per page after it
+        self.rate_limit()
+        for post in profile.get_posts():
+            if len(snapshots) >= self.max_posts:
+                break
+            # Counts usually come with the profile's post listing, so no per-post request is needed
+            snapshots.append({
+                "id": post.shortcode,
+                "view_count": post.video_view_count if post.is_video else None,
+                "like_count": post.likes,
+                "comment_count": post.comments,
+            })
+            if len(snapshots) % LISTING_PAGE_SIZE == 0 and len(snapshots) < self.max_posts:
+                # The next post comes from a new page
+                self.rate_limit()
+
+        result["snapshots"] = self.save_snapshots(output_path, snapshots)
+        if snapshots:
+            result["success"] = True
+            logger.info(f"Saved {result['snapshots']} Instagram engagement snapshots for @{profile.username}")
+        else:
+            result["errors"].append(f"No posts found for @{profile.username}")
+        return result
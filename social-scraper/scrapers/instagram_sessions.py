@@ -0,0 +1,143 @@
+"""Pool of saved Instagram sessions, each with its own request budget and cooldown."""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import config
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS = "anonymous"
+
+
+class NoSessionAvailableError(Exception):
+    """Every session in the pool has been retired."""
+
+
+class SessionsCoolingDownError(Exception):
+    """Every usable session is resting after being rate limited."""
+
+
+class InstagramSession:
+    """One logged-in (or anonymous) instaloader.Instaloader and its request budget."""
+
+    def __init__(self, name: Optional[str], loader):
+        self.name = name or ANONYMOUS
+        self.loader = loader
+        self.limiter = TokenBucket(
+            f"instagram-{self.name}",
+            state_dir=config.RATE_LIMIT_STATE_DIR,
+            **config.INSTAGRAM_SESSION_RATE,
+        )
+        self.cooldown_until = 0.0
+        self.strikes = 0
+        self.retired = False
+        self.in_use = False
+        self.last_used = 0.0
+
+
+class SessionPool:
+    """
+    Hands out Instagram sessions to scraper workers, one worker per session.
+
+    Profiles go to the ready session used least recently, so requests are
+    spread across accounts. A session that gets rate limited rests for
+    `cooldown` seconds (doubling on repeated limits) while the others carry
+    on; a session that gets challenged (checkpoint, expired login) is retired
+    for the rest of the run. The pool is thread-safe and shared by all
+    Instagram workers.
+    """
+
+    def __init__(self, sessions: list[InstagramSession], cooldown: float = config.INSTAGRAM_SESSION_COOLDOWN):
+        self.sessions = sessions
+        self.cooldown = cooldown
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, loader_factory: Callable[[], object]) -> "SessionPool":
+        """
+        Build a pool from the saved sessions in config.INSTAGRAM_SESSIONS.
+
+        Falls back to INSTAGRAM_USERNAME (logging in with INSTAGRAM_PASSWORD
+        if it has no saved session yet), and to one anonymous session if no
+        account can be used.
+        """
+        usernames = config.INSTAGRAM_SESSIONS or ([config.INSTAGRAM_USERNAME] if config.INSTAGRAM_USERNAME else [])
+        sessions = []
+        for username in usernames:
+            loader = loader_factory()
+            try:
+                loader.load_session_from_file(username)
+                logger.info(f"Loaded Instagram session for {username}")
+            except FileNotFoundError:
+                if username != config.INSTAGRAM_USERNAME or not config.INSTAGRAM_PASSWORD:
+                    logger.warning(f"No saved Instagram session for {username}. Run: instaloader -l {username}")
+                    continue
+                logger.info("No saved session found, attempting login...")
+                try:
+                    loader.login(config.INSTAGRAM_USERNAME, config.INSTAGRAM_PASSWORD)
+                    # Save session for future use
+                    loader.save_session_to_file()
+                    logger.info("Successfully logged into Instagram and saved session")
+                except Exception as e:
+                    logger.warning(f"Could not login to Instagram: {e}")
+                    if "two-factor" in str(e).lower():
+                        logger.warning("2FA required. Run: instaloader -l YOUR_USERNAME")
+                        logger.warning("This will prompt for 2FA code and save the session.")
+                    continue
+            except Exception as e:
+                logger.warning(f"Could not load session for {username}: {e}")
+                continue
+            sessions.append(InstagramSession(username, loader))
+
+        if not sessions:
+            logger.warning("Continuing without login - some features may be limited")
+            sessions.append(InstagramSession(None, loader_factory()))
+        return cls(sessions)
+
+    def acquire(self) -> InstagramSession:
+        """
+        Take the least recently used ready session, waiting while all are busy.
+
+        Raises:
+            NoSessionAvailableError: Every session has been retired
+            SessionsCoolingDownError: No session is busy and all usable ones are resting
+        """
+        with self._cond:
+            while True:
+                active = [s for s in self.sessions if not s.retired]
+                if not active:
+                    raise NoSessionAvailableError("All Instagram sessions were challenged and retired")
+
+                now = time.time()
+                ready = [s for s in active if not s.in_use and s.cooldown_until <= now]
+                if ready:
+                    session = min(ready, key=lambda s: s.last_used)
+                    session.in_use = True
+                    session.last_used = now
+                    return session
+
+                if not any(s.in_use for s in active):
+                    wait = min(s.cooldown_until for s in active) - now
+                    raise SessionsCoolingDownError(f"All Instagram sessions are rate limited for another {wait:.0f}s")
+                self._cond.wait(timeout=1.0)
+
+    def release(self, session: InstagramSession, blocked: bool = False, challenged: bool = False) -> None:
+        """Return a session, resting it if it was rate limited and retiring it if challenged."""
+        with self._cond:
+            session.in_use = False
+            if challenged:
+                session.retired = True
+                remaining = sum(1 for s in self.sessions if not s.retired)
+                logger.warning(f"Instagram session {session.name} was challenged; retired ({remaining} left)")
+            elif blocked:
+                rest = min(self.cooldown * 2 ** session.strikes, self.cooldown * 16)
+                session.strikes += 1
+                session.cooldown_until = time.time() + rest
+                logger.warning(f"Instagram session {session.name} is rate limited; resting it for {rest:.0f}s")
+            else:
+                session.strikes = 0
+            self._cond.notify_all()
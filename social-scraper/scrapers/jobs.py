@@ -0,0 +1,220 @@
+"""
+Persistent job table for scraping runs.
+
+Every influencer x platform pair is a row with its state, attempts, last
+error, timings and result. Workers claim jobs atomically, so a run can be
+resumed after a crash, failed jobs can be retried on their own, and several
+main.py processes on one machine can work through the same table.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from .work_queue import pid_alive
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    influencer TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    pid INTEGER,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    UNIQUE (influencer, platform)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (platform, status, id);
+"""
+
+
+class JobStore:
+    """
+    SQLite table of scrape jobs.
+
+    prepare() registers the jobs of a run and limits this process's claims
+    to them. Like WorkQueue, each call opens a short-lived connection, so one
+    JobStore can be shared by the scheduler's worker threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._job_ids: list[int] = []
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def prepare(
+        self,
+        jobs: list[tuple[str, str, str]],
+        resume: bool = False,
+        retry_failed: bool = False,
+    ) -> dict[str, int]:
+        """
+        Register the (influencer, platform, url) jobs of a run.
+
+        A fresh run sets every job back to pending. With `resume`, finished
+        jobs are kept and only unfinished ones run; `retry_failed` also
+        reruns failed jobs. Either way, jobs left "running" by a process that
+        has died are set back to pending, and jobs a live process is running
+        are left alone.
+
+        Returns:
+            Job counts by state for this run
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            ids = []
+            for influencer, platform, url in jobs:
+                conn.execute(
+                    "INSERT OR IGNORE INTO jobs (influencer, platform, url, created_at) VALUES (?, ?, ?, ?)",
+                    (influencer, platform, url, now),
+                )
+                row = conn.execute(
+                    "SELECT id, status, pid FROM jobs WHERE influencer = ? AND platform = ?",
+                    (influencer, platform),
+                ).fetchone()
+                ids.append(row["id"])
+
+                if row["status"] == RUNNING and row["pid"] and pid_alive(row["pid"]):
+                    continue
+                reset = (
+                    not resume
+                    or row["status"] == RUNNING
+                    or (retry_failed and row["status"] == FAILED)
+                )
+                if reset:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, url = ?, pid = NULL, worker = NULL WHERE id = ?",
+                        (PENDING, url, row["id"]),
+                    )
+            conn.execute("COMMIT")
+
+        self._job_ids = ids
+        return self.counts()
+
+    def _scope(self) -> tuple[str, list]:
+        placeholders = ",".join("?" * len(self._job_ids)) or "NULL"
+        return f"id IN ({placeholders})", list(self._job_ids)
+
+    def claim(self, platform: str) -> Optional[dict]:
+        """
+        Take the next pending job of a platform from this run, or return None.
+
+        Jobs tried fewer times come first, so deferred jobs wait behind the
+        ones not tried yet.
+        """
+        scope, params = self._scope()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE platform = ? AND status = ? AND {scope} ORDER BY attempts, id LIMIT 1",
+                [platform, PENDING, *params],
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, pid = ?, worker = ?, "
+                "started_at = ?, finished_at = NULL, duration = NULL WHERE id = ?",
+                (RUNNING, os.getpid(), threading.current_thread().name, time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+            return dict(row)
+
+    def finish(self, job_id: int, result: dict) -> None:
+        """Record a job's scrape result; it is done if the scrape succeeded, failed otherwise."""
+        now = time.time()
+        status = DONE if result.get("success") else FAILED
+        last_error = "; ".join(result.get("errors") or []) or None
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, result = ?, finished_at = ?, "
+                "duration = ? - started_at WHERE id = ?",
+                (status, last_error, json.dumps(result, default=str), now, now, job_id),
+            )
+
+    def defer(self, job_id: int, error: Optional[str] = None) -> None:
+        """Return a claimed job to pending (e.g. while its platform is blocking us)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, last_error = COALESCE(?, last_error), pid = NULL, "
+                "worker = NULL WHERE id = ? AND status = ?",
+                (PENDING, error, job_id, RUNNING),
+            )
+
+    def pending_count(self, platform: Optional[str] = None) -> int:
+        """Number of pending jobs in this run (of one platform, if given)."""
+        scope, params = self._scope()
+        query = f"SELECT COUNT(*) FROM jobs WHERE status = ? AND {scope}"
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        with self._connect() as conn:
+            return conn.execute(query, [PENDING, *params]).fetchone()[0]
+
+    def counts(self) -> dict[str, int]:
+        """Job counts by state for this run."""
+        scope, params = self._scope()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT status, COUNT(*) FROM jobs WHERE {scope} GROUP BY status", params
+            ).fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def results(self) -> list[dict]:
+        """
+        Results of this run's jobs, in the {"name", "platforms"} shape of
+        ScrapeScheduler.run, including jobs finished by earlier or concurrent
+        runs. Each platform entry also carries the job's status, attempts and
+        duration.
+        """
+        scope, params = self._scope()
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM jobs WHERE {scope} ORDER BY id", params).fetchall()
+
+        by_name: dict[str, dict] = {}
+        for row in rows:
+            entry = by_name.setdefault(row["influencer"], {"name": row["influencer"], "platforms": {}})
+            result = json.loads(row["result"]) if row["result"] and row["status"] in (DONE, FAILED) else {
+                "success": False,
+                "posts_downloaded": 0,
+                "errors": [],
+            }
+            result.update({
+                "status": row["status"],
+                "attempts": row["attempts"],
+                "duration": round(row["duration"], 1) if row["duration"] is not None else None,
+            })
+            entry["platforms"][row["platform"]] = result
+        return list(by_name.values())
@@ -0,0 +1,168 @@
+"""
+Content-addressed store for downloaded media.
+
+Each file is hashed (SHA-256) when it is ingested and kept once under
+output/.media/<digest[:2]>/<digest><ext>. The per-platform path the scraper
+wrote becomes a hard link to that blob, so every tool that reads
+output/<influencer>/<platform>/ keeps working while identical files take
+the disk space of one. A SQLite index maps digests to every post path that
+uses them, which lets the video processor handle each unique file once.
+
+This module only uses the standard library so the video processor can
+import it without the scraper dependencies.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    path TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES blobs (digest),
+    influencer TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    linked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_links_digest ON links (digest);
+"""
+
+
+def media_store_path(output_dir) -> Path:
+    """Location of the media store inside a scraper output directory."""
+    return Path(output_dir) / ".media"
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class MediaStore:
+    """
+    Digest-addressed blob directory with a SQLite index of the paths using each blob.
+
+    Like WorkQueue, every call opens its own short-lived connection, so one
+    MediaStore can be shared by scraper threads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.index_path = self.root / "index.db"
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def blob_path(self, digest: str, ext: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{ext}"
+
+    def ingest(self, path, influencer: str, platform: str) -> str:
+        """
+        Move a downloaded file into the store and link it back to its path.
+
+        Files whose content is already stored are replaced by a link to the
+        existing blob. Paths that are already links to their blob are only
+        looked up, not hashed again.
+
+        Returns:
+            The file's SHA-256 digest
+        """
+        path = Path(path)
+        known = self.digest_for(path)
+        if known:
+            blob = self.blob_path(known, path.suffix)
+            if blob.exists() and os.path.samefile(blob, path):
+                return known
+
+        digest = file_digest(path)
+        blob = self.blob_path(digest, path.suffix)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+
+        if not blob.exists():
+            # First copy of this content: it becomes the blob
+            try:
+                os.link(path, blob)
+            except FileExistsError:
+                pass  # stored by another worker in the meantime
+            except OSError:
+                shutil.copy2(path, blob)
+        if not os.path.samefile(blob, path):
+            self._link(blob, path)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs (digest, ext, size, created_at) VALUES (?, ?, ?, ?)",
+                (digest, path.suffix, blob.stat().st_size, time.time()),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO links (path, digest, influencer, platform, linked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(path), digest, influencer, platform, time.time()),
+            )
+        return digest
+
+    @staticmethod
+    def _link(blob: Path, path: Path) -> None:
+        """Replace `path` with a link to `blob`, keeping the copy if links aren't supported."""
+        tmp_path = path.with_name(path.name + ".link")
+        try:
+            os.link(blob, tmp_path)
+        except OSError:
+            try:
+                os.symlink(blob.resolve(), tmp_path)
+            except OSError:
+                # e.g. different filesystem without symlink rights: the index
+                # still records the digest, so processing is still deduplicated
+                return
+        os.replace(tmp_path, path)
+
+    def digest_for(self, path) -> Optional[str]:
+        """Digest recorded for a post path, if it was ingested."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT digest FROM links WHERE path = ?", (str(path),)).fetchone()
+        return row["digest"] if row else None
+
+    def paths_for(self, digest: str) -> list[dict]:
+        """Every post path using a blob, with its influencer and platform."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT path, influencer, platform FROM links WHERE digest = ? ORDER BY path", (digest,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict[str, int]:
+        """Counts of unique blobs, linked paths, and bytes saved by deduplication."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(DISTINCT b.digest), COUNT(l.path), "
+                "COALESCE(SUM(b.size), 0) - COALESCE((SELECT SUM(size) FROM blobs), 0) "
+                "FROM links l JOIN blobs b ON b.digest = l.digest"
+            ).fetchone()
+        return {"blobs": row[0], "paths": row[1], "bytes_saved": row[2]}
@@ -0,0 +1,128 @@
+"""Token-bucket rate limiting shared by all scrapers of a platform."""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process limiting
+    fcntl = None
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket limiter configured in requests per minute with a burst allowance.
+
+    Tokens refill continuously at `requests_per_minute / 60` per second up to
+    `burst`. acquire() only sleeps when the bucket is empty, so time already
+    spent on slow requests counts toward the next one.
+
+    The bucket is thread-safe. When `state_dir` is given, its state lives in
+    a small file guarded by an OS file lock, so several processes on one
+    machine draw from the same budget.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        burst: int = 1,
+        state_dir: Optional[Path] = None,
+    ):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._updated = time.time()
+
+        self.state_file = None
+        if state_dir is not None and fcntl is not None:
+            self.state_file = Path(state_dir) / f"{name}.bucket"
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Take tokens from the bucket, sleeping until they are available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = self._try_take(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def _try_take(self, tokens: int) -> float:
+        """Take tokens if available; otherwise return seconds until they will be."""
+        if self.state_file is None:
+            return self._take_local(tokens)
+
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_file, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                    self._tokens = float(state["tokens"])
+                    self._updated = float(state["updated"])
+                except (ValueError, KeyError):
+                    self._tokens, self._updated = float(self.capacity), time.time()
+
+                wait = self._take_local(tokens)
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": self._tokens, "updated": self._updated}))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    def _take_local(self, tokens: int) -> float:
+        now = time.time()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(platform: str) -> TokenBucket:
+    """Return the process-wide limiter for a platform, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(platform)
+        if limiter is None:
+            settings = config.RATE_LIMITS.get(platform, {})
+            limiter = TokenBucket(
+                platform,
+                requests_per_minute=settings.get("requests_per_minute", 60 / config.REQUEST_DELAY),
+                burst=settings.get("burst", 1),
+                state_dir=config.RATE_LIMIT_STATE_DIR,
+            )
+            _limiters[platform] = limiter
+            logger.debug(
+                f"Rate limit for {platform}: {limiter.rate * 60:g} req/min, burst {limiter.capacity}"
+            )
+        return limiter
@@ -0,0 +1,295 @@
+"""Concurrent scrape scheduler with a separate worker pool per platform."""
+
+import logging
+import queue
+import threading
+from typing import Callable, Optional
+
+import config
+from .base import BaseScraper
+from .circuit import CircuitBreaker
+from .jobs import JobStore
+
+logger = logging.getLogger(__name__)
+
+# Maps each platform to the influencer field holding its profile URL
+PLATFORM_URL_KEYS = {
+    "tiktok": "tiktok_url",
+    "instagram": "instagram_url",
+    "youtube": "youtube_url",
+}
+
+DEFAULT_WORKERS = {"tiktok": 1, "instagram": 1, "youtube": 1}
+
+
+def parse_workers(spec: Optional[str]) -> dict[str, int]:
+    """
+    Parse a worker spec such as "tiktok=4,instagram=1,youtube=3".
+
+    Platforms missing from the spec keep their default of one worker.
+    """
+    workers = dict(DEFAULT_WORKERS)
+    if not spec:
+        return workers
+
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        platform, _, count = part.partition("=")
+        platform = platform.strip().lower()
+        if platform not in PLATFORM_URL_KEYS:
+            raise ValueError(f"Unknown platform in --workers: {platform}")
+        try:
+            workers[platform] = int(count)
+        except ValueError:
+            raise ValueError(f"Invalid worker count for {platform}: {count!r}") from None
+        if workers[platform] < 1:
+            raise ValueError(f"Worker count for {platform} must be at least 1")
+
+    return workers
+
+
+class _QueueJobs:
+    """In-memory jobs of one run: a FIFO of (job_id, index, influencer) per platform."""
+
+    def __init__(self, influencers: list[dict], platforms: list[str]):
+        self.queues = {p: queue.Queue() for p in platforms}
+        for platform in platforms:
+            for index, influencer in enumerate(influencers):
+                if influencer.get(PLATFORM_URL_KEYS[platform]):
+                    self.queues[platform].put((None, index, influencer))
+
+    def pending(self, platform: str) -> int:
+        return self.queues[platform].qsize()
+
+    def next(self, platform: str) -> Optional[tuple]:
+        try:
+            return self.queues[platform].get_nowait()
+        except queue.Empty:
+            return None
+
+    def defer(self, platform: str, job: tuple, error: Optional[str] = None) -> None:
+        """Put a job back at the end of its platform's queue."""
+        self.queues[platform].put(job)
+
+
+class _StoredJobs:
+    """Jobs of the JobStore's current run, claimed from the table."""
+
+    def __init__(self, job_store: JobStore, influencers: list[dict]):
+        self.job_store = job_store
+        self.by_name = {inf["name"]: (index, inf) for index, inf in enumerate(influencers)}
+
+    def pending(self, platform: str) -> int:
+        return self.job_store.pending_count(platform)
+
+    def next(self, platform: str) -> Optional[tuple]:
+        job = self.job_store.claim(platform)
+        if job is None:
+            return None
+        index, influencer = self.by_name[job["influencer"]]
+        return job["id"], index, influencer
+
+    def defer(self, platform: str, job: tuple, error: Optional[str] = None) -> None:
+        """Return a claimed job to pending; it is claimed again after jobs not yet tried."""
+        self.job_store.defer(job[0], error)
+
+
+class ScrapeScheduler:
+    """
+    Runs each platform's scrapes on its own pool of worker threads.
+
+    Every influencer is split into one job per platform. Each platform pool
+    pulls its jobs from the shared influencer list independently, so a slow
+    platform no longer holds up the others. Workers get their own scraper
+    instance from the platform's factory; scrapers of the same platform share
+    one rate budget (see BaseScraper.rate_limit), so adding workers does not
+    raise the request rate on any platform.
+
+    Each platform also has a CircuitBreaker. When its scrapes come back
+    blocked, only that platform's workers pause with exponential backoff,
+    and the blocked accounts go back into the queue (up to
+    config.MAX_BLOCKED_DEFERRALS times) instead of being given up on.
+
+    With a JobStore, workers claim the pending jobs of the store's current
+    run instead of an in-memory queue and record every result in it, so
+    several processes can share the jobs of one run.
+    """
+
+    def __init__(
+        self,
+        scraper_factories: dict[str, Callable[[], BaseScraper]],
+        workers: Optional[dict[str, int]] = None,
+        job_store: Optional[JobStore] = None,
+    ):
+        self.scraper_factories = scraper_factories
+        self.workers = workers or dict(DEFAULT_WORKERS)
+        self.job_store = job_store
+        self.breakers = {
+            platform: CircuitBreaker(platform, **config.CIRCUIT_BREAKER)
+            for platform in scraper_factories
+        }
+        self.max_deferrals = config.MAX_BLOCKED_DEFERRALS
+        self._deferrals: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(
+        self,
+        influencers: list[dict],
+        on_job_done: Optional[Callable[[str, dict, dict], None]] = None,
+    ) -> list[dict]:
+        """
+        Scrape all influencers and return results in input order.
+
+        Args:
+            influencers: Influencer dicts as returned by load_influencers_from_csv
+            on_job_done: Optional callback(platform, influencer, result), called
+                from worker threads after each job (e.g. to advance a progress bar)
+
+        Returns:
+            One {"name", "platforms"} dict per influencer, the same shape that
+            scrape_influencer returns and generate_report expects. With a job
+            store, only the jobs scraped by this process are included.
+        """
+        results = [{"name": inf["name"], "platforms": {}} for inf in influencers]
+        platforms = [p for p in PLATFORM_URL_KEYS if p in self.scraper_factories]
+
+        if self.job_store is not None:
+            jobs = _StoredJobs(self.job_store, influencers)
+        else:
+            jobs = _QueueJobs(influencers, platforms)
+
+        threads = []
+        for platform in platforms:
+            pending = jobs.pending(platform)
+            if not pending:
+                continue
+            count = min(self.workers.get(platform, 1), pending)
+            logger.info(f"Starting {count} {platform} worker(s) for {pending} accounts")
+            for worker_num in range(count):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(platform, jobs, results, on_job_done),
+                    name=f"{platform}-worker-{worker_num}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            logger.info("Interrupted by user, waiting for running scrapes to finish")
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        # Keep the per-influencer platform order of the sequential scraper
+        for result in results:
+            platforms = result["platforms"]
+            result["platforms"] = {p: platforms[p] for p in PLATFORM_URL_KEYS if p in platforms}
+
+        return results
+
+    def _worker(
+        self,
+        platform: str,
+        jobs,
+        results: list[dict],
+        on_job_done: Optional[Callable[[str, dict, dict], None]],
+    ) -> None:
+        """Pull jobs for one platform until none are left."""
+        try:
+            scraper = self.scraper_factories[platform]()
+        except Exception as e:
+            logger.exception(f"Could not start {platform} worker")
+            error = f"Could not initialize {platform} scraper: {e}"
+            self._drain(platform, jobs, results, error, on_job_done)
+            return
+
+        url_key = PLATFORM_URL_KEYS[platform]
+        breaker = self.breakers[platform]
+
+        try:
+            while not self._stop.is_set():
+                job = jobs.next(platform)
+                if job is None:
+                    return
+                job_id, index, influencer = job
+
+                # Hold the job while the platform is backing off
+                if not breaker.acquire(self._stop):
+                    jobs.defer(platform, job)
+                    return
+
+                logger.info(f"Scraping {platform.capitalize()} for {influencer['name']}")
+                try:
+                    result = scraper.scrape(influencer[url_key], influencer["name"])
+                except Exception as e:
+                    logger.exception(f"Error scraping {platform} for {influencer['name']}")
+                    result = {"success": False, "posts_downloaded": 0, "errors": [str(e)]}
+
+                if not result.get("blocked"):
+                    breaker.record_success()
+                else:
+                    breaker.record_blocked()
+                # "retry" asks for another attempt without blaming the platform
+                # (e.g. an Instagram session was retired mid-account)
+                if result.get("blocked") or result.get("retry"):
+                    if self._defer(platform, jobs, job, result):
+                        continue
+
+                self._record(platform, job_id, index, influencer, result, results, on_job_done)
+        finally:
+            scraper.close()
+
+    def _defer(self, platform: str, jobs, job: tuple, result: dict) -> bool:
+        """Put a blocked or retryable job back for a later attempt, unless it was deferred too often."""
+        job_id, index, influencer = job
+        with self._lock:
+            deferrals = self._deferrals.get((platform, index), 0)
+            if deferrals >= self.max_deferrals:
+                return False
+            self._deferrals[(platform, index)] = deferrals + 1
+
+        logger.info(f"Deferring {platform} for {influencer['name']} (attempt {deferrals + 1} put back)")
+        jobs.defer(platform, job, "; ".join(result.get("errors") or []) or None)
+        return True
+
+    def _drain(
+        self,
+        platform: str,
+        jobs,
+        results: list[dict],
+        error: str,
+        on_job_done: Optional[Callable[[str, dict, dict], None]],
+    ) -> None:
+        """Mark every remaining job of a platform as failed."""
+        while True:
+            job = jobs.next(platform)
+            if job is None:
+                return
+            job_id, index, influencer = job
+            result = {"success": False, "posts_downloaded": 0, "errors": [error]}
+            self._record(platform, job_id, index, influencer, result, results, on_job_done)
+
+    def _record(
+        self,
+        platform: str,
+        job_id: Optional[int],
+        index: int,
+        influencer: dict,
+        result: dict,
+        results: list[dict],
+        on_job_done: Optional[Callable[[str, dict, dict], None]],
+    ) -> None:
+        if job_id is not None:
+            self.job_store.finish(job_id, result)
+        with self._lock:
+            results[index]["platforms"][platform] = result
+            if on_job_done:
+                on_job_done(platform, influencer, result)
@@ -0,0 +1,220 @@
+"""Append-only JSON Lines storage for scraped post metadata."""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = "metadata.jsonl"
+LEGACY_METADATA_FILE = "metadata.json"
+
+
+class JsonlStore:
+    """
+    Append-only JSON Lines file with a small id index.
+
+    Each record is one line, so saving is a single append instead of a
+    read-modify-write of the whole file. When `key` is set, the ids already
+    stored are kept in a sidecar `.idx` file (one id per line) and records
+    whose id is already present are skipped. With `key=None` every record
+    is appended (e.g. timestamped snapshots).
+    """
+
+    def __init__(self, path: Path, key: Optional[str] = "id"):
+        self.path = Path(path)
+        self.key = key
+        self.index_path = self.path.with_suffix(".idx")
+        self._ids: Optional[set] = None
+
+    def _load_index(self) -> set:
+        if self._ids is not None:
+            return self._ids
+
+        ids = set()
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                ids = {line.rstrip("\n") for line in f if line.strip()}
+        elif self.path.exists():
+            # Index lost or never written: rebuild it from the records
+            ids = {str(r[self.key]) for r in self if r.get(self.key) is not None}
+            self._write_index(ids)
+
+        self._ids = ids
+        return ids
+
+    def _write_index(self, ids: Iterable[str]) -> None:
+        tmp_path = self.index_path.with_suffix(".idx.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{record_id}\n" for record_id in sorted(ids))
+        tmp_path.replace(self.index_path)
+
+    def __contains__(self, record_id) -> bool:
+        return self.key is not None and str(record_id) in self._load_index()
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield stored records, skipping lines that don't parse (e.g. a torn last write)."""
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed line {line_num} in {self.path}")
+
+    def append(self, records) -> int:
+        """
+        Append one record or a list of records.
+
+        Returns:
+            Number of records written (duplicates are not counted)
+        """
+        if isinstance(records, dict):
+            records = [records]
+
+        new_records = []
+        new_ids = []
+        if self.key is None:
+            new_records = list(records)
+        else:
+            ids = self._load_index()
+            for record in records:
+                record_id = record.get(self.key)
+                if record_id is None:
+                    new_records.append(record)
+                    continue
+                record_id = str(record_id)
+                if record_id in ids or record_id in new_ids:
+                    continue
+                new_records.append(record)
+                new_ids.append(record_id)
+
+        if not new_records:
+            return 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(
+            json.dumps(r, default=str, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for r in new_records
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+        if new_ids:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{record_id}\n" for record_id in new_ids)
+            self._ids.update(new_ids)
+
+        return len(new_records)
+
+    def compact(self) -> dict:
+        """
+        Rewrite the file with one record per id (the last one written wins)
+        and drop unparseable lines, then rebuild the index.
+
+        Returns:
+            Dict with "kept" and "dropped" record counts
+        """
+        if not self.path.exists():
+            return {"kept": 0, "dropped": 0}
+
+        total = 0
+        by_id: dict = {}
+        unkeyed = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            total = sum(1 for line in f if line.strip())
+        for record in self:
+            record_id = record.get(self.key) if self.key else None
+            if record_id is None:
+                unkeyed.append(record)
+            else:
+                by_id.pop(str(record_id), None)
+                by_id[str(record_id)] = record
+
+        records = list(by_id.values()) + unkeyed
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.path)
+
+        if self.key is not None:
+            self._write_index(by_id.keys())
+            self._ids = set(by_id.keys())
+
+        return {"kept": len(records), "dropped": total - len(records)}
+
+
+def metadata_store(output_path: Path, key: str = "id") -> JsonlStore:
+    """
+    Open the metadata store of a platform directory.
+
+    A legacy metadata.json is imported into metadata.jsonl on first use and
+    renamed to metadata.json.bak.
+    """
+    store = JsonlStore(Path(output_path) / METADATA_FILE, key=key)
+    migrate_legacy_metadata(store)
+    return store
+
+
+def migrate_legacy_metadata(store: JsonlStore) -> int:
+    """Import a legacy metadata.json next to the store, if present."""
+    legacy_file = store.path.parent / LEGACY_METADATA_FILE
+    if not legacy_file.exists():
+        return 0
+
+    try:
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        if not isinstance(records, list):
+            records = [records]
+    except json.JSONDecodeError as e:
+        logger.warning(f"Could not import {legacy_file}: {e}")
+        return 0
+
+    written = store.append(records)
+    legacy_file.replace(legacy_file.with_suffix(".json.bak"))
+    logger.info(f"Imported {written} records from {legacy_file}")
+    return written
+
+
+def compact_metadata(output_dir: Path, keys: Optional[dict[str, str]] = None) -> dict:
+    """
+    Compact every metadata store under the output directory.
+
+    Args:
+        output_dir: Scraper output directory (output/<influencer>/<platform>/)
+        keys: Id field per platform directory name (default: "id")
+
+    Returns:
+        Totals of stores, records kept and records dropped
+    """
+    keys = keys or {}
+    totals = {"stores": 0, "kept": 0, "dropped": 0}
+
+    for influencer_dir in sorted(Path(output_dir).iterdir()):
+        if not influencer_dir.is_dir() or influencer_dir.name.startswith("."):
+            continue
+        for platform_dir in sorted(influencer_dir.iterdir()):
+            if not platform_dir.is_dir():
+                continue
+            has_legacy = (platform_dir / LEGACY_METADATA_FILE).exists()
+            if not has_legacy and not (platform_dir / METADATA_FILE).exists():
+                continue
+
+            store = metadata_store(platform_dir, key=keys.get(platform_dir.name, "id"))
+            stats = store.compact()
+            totals["stores"] += 1
+            totals["kept"] += stats["kept"]
+            totals["dropped"] += stats["dropped"]
+            if stats["dropped"]:
+                logger.info(f"Compacted {store.path}: dropped {stats['dropped']} duplicate/bad lines")
+
+    return totals
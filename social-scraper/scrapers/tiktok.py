@@ -3,11 +3,14 @@
 import re
 import logging
 import subprocess
-import json
 from pathlib import Path
 from typing import Optional
 
-from .base import BaseScraper
+import config
+from .base import BaseScraper, YTDLP_DOWNLOADS_STOPPED
+from .media_store import MediaStore
+from .work_queue import WorkQueue
+from .ytdlp_engine import YtDlpEngine
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,19 @@ class TikTokScraper(BaseScraper):
 
     platform_name = "tiktok"
 
+    def __init__(
+        self,
+        output_dir: Path,
+        incremental: bool = config.INCREMENTAL_SCRAPING,
+        engine: str = config.YTDLP_ENGINE,
+        metadata_only: bool = False,
+        work_queue: Optional[WorkQueue] = None,
+        media_store: Optional[MediaStore] = None,
+        download_profile: str = config.DOWNLOAD_PROFILE,
+    ):
+        super().__init__(output_dir, incremental, metadata_only, work_queue, media_store, download_profile)
+        self.engine = YtDlpEngine(engine)
+
     def extract_username(self, url: str) -> Optional[str]:
         """Extract TikTok username from URL."""
         # Patterns: https://www.tiktok.com/@username or https://tiktok.com/@username
@@ -56,65 +72,94 @@ class TikTokScraper(BaseScraper):
             # Use yt-dlp to download videos
             output_template = str(output_path / "%(id)s.%(ext)s")
 
-            cmd = [
-                "yt-dlp",
+            args = [
                 "--no-warnings",
-                "-f", "best",
-                "--max-downloads", str(self.max_posts),
-                "--write-info-json",
-                "--write-thumbnail",
-                "--no-overwrites",
-                "-o", output_template,
+                *self.format_args(),
                 "--playlist-end", str(self.max_posts),
                 "--extractor-args", "tiktok:api_hostname=api22-normal-c-useast2a.tiktokv.com",
-                user_url,
             ]
-
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
+            if self.metadata_only:
+                # Only fetch each video's info for an engagement snapshot
+                args += ["--skip-download", "--dump-json"]
+            else:
+                args += [
+                    "--max-downloads", str(self.max_posts),
+                    "--write-info-json",
+                    "--write-thumbnail",
+                    "--no-overwrites",
+                ]
+            download_archive = None
+            if self.incremental:
+                # Stop at the first video already downloaded on a previous run
+                args.append("--break-on-existing")
+                download_archive = self.get_download_archive(output_path)
+
+            # Take a slot from the platform's shared request budget
+            self.rate_limit()
+
+            run = self.engine.run(
+                args,
+                user_url,
+                output_template,
+                download_archive=download_archive,
+                on_video=self.on_videos,
                 timeout=600,  # 10 minute timeout
             )
+            result["posts_downloaded"] = len(run["files"])
+
+            # Collect metadata of the videos processed by this run
+            metadata = [
+                {
+                    "id": info.get("id"),
+                    "title": info.get("title"),
+                    "description": info.get("description"),
+                    "upload_date": info.get("upload_date"),
+                    "duration": info.get("duration"),
+                    "view_count": info.get("view_count"),
+                    "like_count": info.get("like_count"),
+                    "comment_count": info.get("comment_count"),
+                    "uploader": info.get("uploader"),
+                    "uploader_id": info.get("uploader_id"),
+                    "channel": info.get("channel"),
+                    "channel_id": info.get("channel_id"),
+                    "timestamp": info.get("timestamp"),
+                    "repost_count": info.get("repost_count"),
+                    "webpage_url": info.get("webpage_url"),
+                    "thumbnail": info.get("thumbnail"),
+                }
+                for info in run["infos"]
+            ]
 
-            # Count downloaded files
-            video_files = list(output_path.glob("*.mp4")) + list(output_path.glob("*.webm"))
-            result["posts_downloaded"] = len(video_files)
-
-            # Collect metadata from info.json files
-            metadata = []
-            for json_file in output_path.glob("*.info.json"):
-                try:
-                    with open(json_file, "r", encoding="utf-8") as f:
-                        info = json.load(f)
-                        metadata.append({
-                            "id": info.get("id"),
-                            "title": info.get("title"),
-                            "description": info.get("description"),
-                            "upload_date": info.get("upload_date"),
-                            "duration": info.get("duration"),
-                            "view_count": info.get("view_count"),
-                            "like_count": info.get("like_count"),
-                            "comment_count": info.get("comment_count"),
-                            "uploader": info.get("uploader"),
-                            "uploader_id": info.get("uploader_id"),
-                        })
-                except Exception as e:
-                    logger.warning(f"Error reading metadata file {json_file}: {e}")
-
-            if metadata:
+            if self.metadata_only:
+                result["snapshots"] = self.save_snapshots(output_path, [
+                    {
+                        "id": info.get("id"),
+                        "view_count": info.get("view_count"),
+                        "like_count": info.get("like_count"),
+                        "comment_count": info.get("comment_count"),
+                        "repost_count": info.get("repost_count"),
+                    }
+                    for info in run["infos"]
+                ])
+            elif metadata:
                 self.save_metadata(output_path, metadata)
 
-            if process.returncode != 0 and result["posts_downloaded"] == 0:
-                error_msg = process.stderr or process.stdout or "Unknown error"
+            stopped_early = run["returncode"] == YTDLP_DOWNLOADS_STOPPED
+            nothing_saved = result["posts_downloaded"] == 0 and not result.get("snapshots")
+            if run["returncode"] != 0 and not stopped_early and nothing_saved:
+                error_msg = run["stderr"] or "Unknown error"
                 # Check for common issues
                 if "Unable to download" in error_msg or "HTTP Error" in error_msg:
                     result["errors"].append(f"TikTok may be blocking requests. Try again later.")
+                    result["blocked"] = True
                 else:
                     result["errors"].append(f"yt-dlp error: {error_msg[:500]}")
             else:
                 result["success"] = True
-                logger.info(f"Downloaded {result['posts_downloaded']} TikTok videos for @{username}")
+                if self.metadata_only:
+                    logger.info(f"Saved {result['snapshots']} TikTok engagement snapshots for @{username}")
+                else:
+                    logger.info(f"Downloaded {result['posts_downloaded']} TikTok videos for @{username}")
 
         except subprocess.TimeoutExpired:
             result["errors"].append("Timeout while downloading TikTok videos")
@@ -125,3 +170,7 @@ class TikTokScraper(BaseScraper):
             logger.exception(f"Error scraping TikTok for {username}")
 
         return result
+
+    def close(self) -> None:
+        """Release the yt-dlp engine."""
+        self.engine.close()
@@ -0,0 +1,225 @@
+"""
+Persistent work queue handing downloaded videos to the video processor.
+
+Scrapers enqueue each video as soon as it is on disk, and
+analysis/video_processor/batch_process.py --queue consumes it while
+scraping continues. The queue is a SQLite file, so producer and consumer
+can be separate processes and either side can restart without losing work.
+
+This module only uses the standard library so the video processor can
+import it without the scraper dependencies.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    influencer TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    digest TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_status ON videos (status, id);
+CREATE TABLE IF NOT EXISTS producers (
+    name TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL
+);
+"""
+
+
+def pid_alive(pid: int) -> bool:
+    """Check whether a process on this machine is still running."""
+    if sys.platform == "win32":
+        return True  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def queue_path(output_dir) -> Path:
+    """Location of the video queue inside a scraper output directory."""
+    return Path(output_dir) / ".queue" / "videos.db"
+
+
+class WorkQueue:
+    """
+    SQLite-backed FIFO of video files.
+
+    Every call opens its own short-lived connection, so one WorkQueue can be
+    shared by scraper threads. Items move pending -> processing -> done or
+    failed; claim() is atomic, so several consumers can share a queue.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Queues created before media digests were tracked
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(videos)")}
+            for column in ("digest", "result"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE videos ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_digest ON videos (digest, status)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, path, influencer: str, platform: str, digest: Optional[str] = None) -> bool:
+        """
+        Add a video unless it is already queued.
+
+        Args:
+            digest: Media store digest, so consumers can reuse the result of
+                identical videos
+
+        Returns:
+            True if the video was added
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO videos (path, influencer, platform, digest, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(path), influencer, platform, digest, time.time()),
+            )
+            return cursor.rowcount > 0
+
+    def claim(self, platform: Optional[str] = None) -> Optional[dict]:
+        """Take the oldest pending video (of a platform) and mark it as processing, or return None."""
+        query = "SELECT * FROM videos WHERE status = ?"
+        params = [PENDING]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE videos SET status = ?, attempts = attempts + 1, claimed_at = ? WHERE id = ?",
+                (PROCESSING, time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+            item = dict(row)
+            item["status"] = PROCESSING
+            return item
+
+    def complete(self, item_id: int, result: Optional[dict] = None) -> None:
+        """Mark a claimed video as processed, keeping its result for identical videos."""
+        self._finish(item_id, DONE, None, result)
+
+    def find_result(self, digest: str) -> Optional[dict]:
+        """Result of an already processed video with the same content, if any."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result FROM videos WHERE digest = ? AND status = ? AND result IS NOT NULL LIMIT 1",
+                (digest, DONE),
+            ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def fail(self, item_id: int, error: str) -> None:
+        """Mark a claimed video as failed."""
+        self._finish(item_id, FAILED, error)
+
+    def release(self, item_id: int) -> None:
+        """Put a claimed video back to pending without counting it as done (e.g. on Ctrl+C)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE videos SET status = ?, attempts = attempts - 1 WHERE id = ? AND status = ?",
+                (PENDING, item_id, PROCESSING),
+            )
+
+    def _finish(self, item_id: int, status: str, error: Optional[str], result: Optional[dict] = None) -> None:
+        result_json = json.dumps(result, default=str, ensure_ascii=False) if result is not None else None
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE videos SET status = ?, error = ?, result = ?, finished_at = ? WHERE id = ?",
+                (status, error, result_json, time.time(), item_id),
+            )
+
+    def requeue_stale(self, older_than: float) -> int:
+        """
+        Return videos claimed more than `older_than` seconds ago to pending
+        (e.g. after a consumer crashed mid-video).
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE videos SET status = ? WHERE status = ? AND claimed_at < ?",
+                (PENDING, PROCESSING, time.time() - older_than),
+            )
+            return cursor.rowcount
+
+    def counts(self) -> dict[str, int]:
+        """Number of videos in each state."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM videos GROUP BY status").fetchall()
+        counts = {PENDING: 0, PROCESSING: 0, DONE: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    @contextmanager
+    def producing(self, name: str):
+        """
+        Register a running producer for the duration of the block.
+
+        Consumers keep waiting for new videos while any producer is
+        registered, and exit once the queue is drained and none is left.
+        Producers on this machine whose process has died are ignored.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO producers (name, pid, started_at) VALUES (?, ?, ?)",
+                (name, os.getpid(), time.time()),
+            )
+        try:
+            yield self
+        finally:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM producers WHERE name = ?", (name,))
+
+    def has_producers(self) -> bool:
+        """Check whether a scraper is still adding videos, forgetting ones that died."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, pid FROM producers").fetchall()
+            alive = False
+            for row in rows:
+                if pid_alive(row["pid"]):
+                    alive = True
+                else:
+                    conn.execute("DELETE FROM producers WHERE name = ?", (row["name"],))
+            return alive
@@ -3,11 +3,14 @@
 import re
 import logging
 import subprocess
-import json
 from pathlib import Path
 from typing import Optional
 
-from .base import BaseScraper
+import config
+from .base import BaseScraper, YTDLP_DOWNLOADS_STOPPED
+from .media_store import MediaStore
+from .work_queue import WorkQueue
+from .ytdlp_engine import YtDlpEngine
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,19 @@ class YouTubeScraper(BaseScraper):
 
     platform_name = "youtube"
 
+    def __init__(
+        self,
+        output_dir: Path,
+        incremental: bool = config.INCREMENTAL_SCRAPING,
+        engine: str = config.YTDLP_ENGINE,
+        metadata_only: bool = False,
+        work_queue: Optional[WorkQueue] = None,
+        media_store: Optional[MediaStore] = None,
+        download_profile: str = config.DOWNLOAD_PROFILE,
+    ):
+        super().__init__(output_dir, incremental, metadata_only, work_queue, media_store, download_profile)
+        self.engine = YtDlpEngine(engine)
+
     def extract_username(self, url: str) -> Optional[str]:
         """Extract and normalize YouTube channel URL."""
         # Various YouTube URL patterns
@@ -73,73 +89,97 @@ class YouTubeScraper(BaseScraper):
             # Use yt-dlp to download videos
             output_template = str(output_path / "%(id)s.%(ext)s")
 
-            cmd = [
-                "yt-dlp",
+            args = [
                 "--no-warnings",
-                "-f", "bestvideo[height<=720]+bestaudio/best[height<=720]/best",  # Prefer 720p, fallback to best
-                "--max-downloads", str(self.max_posts),
-                "--write-info-json",
-                "--write-thumbnail",
-                "--write-description",
-                "--no-overwrites",
-                "-o", output_template,
+                *self.format_args(),  # standard profile: prefer 720p, fallback to best
                 "--playlist-end", str(self.max_posts),
-                "--sleep-interval", "1",
-                "--max-sleep-interval", "3",
-                channel_url,
             ]
-
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
+            if self.metadata_only:
+                # Only fetch each video's info for an engagement snapshot
+                args += ["--skip-download", "--dump-json"]
+            else:
+                args += [
+                    "--max-downloads", str(self.max_posts),
+                    "--write-info-json",
+                    "--write-thumbnail",
+                    "--write-description",
+                    "--no-overwrites",
+                    "--sleep-interval", "1",
+                    "--max-sleep-interval", "3",
+                ]
+            download_archive = None
+            if self.incremental:
+                # Stop at the first video already downloaded on a previous run
+                args.append("--break-on-existing")
+                download_archive = self.get_download_archive(output_path)
+
+            # Take a slot from the platform's shared request budget
+            self.rate_limit()
+
+            run = self.engine.run(
+                args,
+                channel_url,
+                output_template,
+                download_archive=download_archive,
+                on_video=self.on_videos,
                 timeout=1800,  # 30 minute timeout for YouTube
             )
+            result["posts_downloaded"] = len(run["files"])
+
+            # Collect metadata of the videos processed by this run
+            metadata = [
+                {
+                    "id": info.get("id"),
+                    "title": info.get("title"),
+                    "description": info.get("description"),
+                    "upload_date": info.get("upload_date"),
+                    "duration": info.get("duration"),
+                    "view_count": info.get("view_count"),
+                    "like_count": info.get("like_count"),
+                    "comment_count": info.get("comment_count"),
+                    "channel": info.get("channel"),
+                    "channel_id": info.get("channel_id"),
+                    "channel_url": info.get("channel_url"),
+                    "uploader": info.get("uploader"),
+                    "timestamp": info.get("timestamp"),
+                    "webpage_url": info.get("webpage_url"),
+                    "thumbnail": info.get("thumbnail"),
+                    "categories": info.get("categories"),
+                    "tags": info.get("tags"),
+                }
+                for info in run["infos"]
+            ]
 
-            # Count downloaded files
-            video_files = (
-                list(output_path.glob("*.mp4"))
-                + list(output_path.glob("*.webm"))
-                + list(output_path.glob("*.mkv"))
-            )
-            result["posts_downloaded"] = len(video_files)
-
-            # Collect metadata from info.json files
-            metadata = []
-            for json_file in output_path.glob("*.info.json"):
-                try:
-                    with open(json_file, "r", encoding="utf-8") as f:
-                        info = json.load(f)
-                        metadata.append({
-                            "id": info.get("id"),
-                            "title": info.get("title"),
-                            "description": info.get("description", "")[:1000],  # Truncate long descriptions
-                            "upload_date": info.get("upload_date"),
-                            "duration": info.get("duration"),
-                            "view_count": info.get("view_count"),
-                            "like_count": info.get("like_count"),
-                            "comment_count": info.get("comment_count"),
-                            "channel": info.get("channel"),
-                            "channel_id": info.get("channel_id"),
-                            "channel_url": info.get("channel_url"),
-                        })
-                except Exception as e:
-                    logger.warning(f"Error reading metadata file {json_file}: {e}")
-
-            if metadata:
+            if self.metadata_only:
+                result["snapshots"] = self.save_snapshots(output_path, [
+                    {
+                        "id": info.get("id"),
+                        "view_count": info.get("view_count"),
+                        "like_count": info.get("like_count"),
+                        "comment_count": info.get("comment_count"),
+                    }
+                    for info in run["infos"]
+                ])
+            elif metadata:
                 self.save_metadata(output_path, metadata)
 
-            if process.returncode != 0 and result["posts_downloaded"] == 0:
-                error_msg = process.stderr or process.stdout or "Unknown error"
+            stopped_early = run["returncode"] == YTDLP_DOWNLOADS_STOPPED
+            nothing_saved = result["posts_downloaded"] == 0 and not result.get("snapshots")
+            if run["returncode"] != 0 and not stopped_early and nothing_saved:
+                error_msg = run["stderr"] or "Unknown error"
                 if "Video unavailable" in error_msg:
                     result["errors"].append("Channel has no available videos")
                 elif "HTTP Error 429" in error_msg:
                     result["errors"].append("YouTube rate limiting. Try again later.")
+                    result["blocked"] = True
                 else:
                     result["errors"].append(f"yt-dlp error: {error_msg[:500]}")
             else:
                 result["success"] = True
-                logger.info(f"Downloaded {result['posts_downloaded']} YouTube videos")
+                if self.metadata_only:
+                    logger.info(f"Saved {result['snapshots']} YouTube engagement snapshots")
+                else:
+                    logger.info(f"Downloaded {result['posts_downloaded']} YouTube videos")
 
         except subprocess.TimeoutExpired:
             result["errors"].append("Timeout while downloading YouTube videos")
@@ -150,3 +190,7 @@ class YouTubeScraper(BaseScraper):
             logger.exception(f"Error scraping YouTube")
 
         return result
+
+    def close(self) -> None:
+        """Release the yt-dlp engine."""
+        self.engine.close()
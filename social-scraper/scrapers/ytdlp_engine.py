@@ -0,0 +1,232 @@
+"""Runs yt-dlp either as a subprocess or in-process with a long-lived YoutubeDL."""
+
+import json
+import logging
+import subprocess
+from pathlib import Path
+from typing import Callable, Optional
+
+import config
+from .base import MEDIA_SUFFIXES, YTDLP_DOWNLOADS_STOPPED
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("subprocess", "inprocess")
+
+MEDIA_PATTERNS = tuple(f"*{suffix}" for suffix in MEDIA_SUFFIXES)
+
+DUMP_JSON_ARGS = {"-j", "--dump-json"}
+
+
+class _ErrorCollector:
+    """yt-dlp logger that keeps error messages for the scrape result."""
+
+    def __init__(self):
+        self.errors: list[str] = []
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        logger.debug(f"yt-dlp: {msg}")
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+
+def _info_collector(infos: list, engine: "YtDlpEngine"):
+    """Build a postprocessor that records each processed video's info_dict."""
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class InfoCollector(PostProcessor):
+        def run(self, info):
+            infos.append(self._downloader.sanitize_info(info))
+            if engine._on_video is not None:
+                files = [d["filepath"] for d in info.get("requested_downloads") or [] if d.get("filepath")]
+                # Extracted audio (-x) replaces the downloaded file
+                if info.get("filepath") and info["filepath"] not in files:
+                    files.append(info["filepath"])
+                if files:
+                    engine._on_video(files)
+            return [], info
+
+    return InfoCollector()
+
+
+class YtDlpEngine:
+    """
+    Runs yt-dlp for one scraper.
+
+    In "subprocess" mode every call starts the yt-dlp executable, as the
+    scrapers always did. In "inprocess" mode the engine keeps one
+    yt_dlp.YoutubeDL for its lifetime, so extractor setup and HTTP
+    connections are reused across accounts, and each video's info_dict is
+    collected as it is processed instead of being re-read from *.info.json.
+
+    An engine is not thread-safe; give each worker its own (the scheduler
+    already builds one scraper per worker).
+
+    run() returns a dict with:
+        - returncode: yt-dlp exit code (101 when it stopped early on purpose)
+        - infos: info dicts of the videos processed by this run
+        - files: video (or extracted audio) files written by this run
+        - stderr: error output, for the scraper's error message
+    """
+
+    def __init__(self, mode: str = config.YTDLP_ENGINE):
+        if mode not in ENGINES:
+            raise ValueError(f"Unknown yt-dlp engine: {mode} (expected one of {', '.join(ENGINES)})")
+        self.mode = mode
+        self._ydl = None
+        self._ydl_args: Optional[tuple] = None
+        self._infos: list = []
+        self._errors: Optional[_ErrorCollector] = None
+        self._on_video: Optional[Callable[[list], None]] = None
+
+    def run(
+        self,
+        args: list[str],
+        url: str,
+        output_template: str,
+        download_archive: Optional[Path] = None,
+        timeout: Optional[int] = None,
+        on_video: Optional[Callable[[list], None]] = None,
+    ) -> dict:
+        """
+        Download `url` with the given yt-dlp options.
+
+        Args:
+            args: yt-dlp command-line options, without the output template,
+                download archive or URL
+            url: Profile or channel URL
+            output_template: yt-dlp output template (-o)
+            download_archive: Per-account archive file (--download-archive)
+            timeout: Seconds before the subprocess is killed (subprocess mode only)
+            on_video: Called with the file paths of each finished video. In
+                inprocess mode this happens as soon as the video is written;
+                the subprocess engine reports all new files when it exits.
+        """
+        output_dir = Path(output_template).parent
+        existing_media = self._media_files(output_dir)
+
+        if self.mode == "subprocess":
+            result = self._run_subprocess(args, url, output_template, download_archive, timeout)
+        else:
+            self._on_video = on_video
+            try:
+                result = self._run_inprocess(args, url, output_template, download_archive)
+            finally:
+                self._on_video = None
+
+        result["files"] = sorted(self._media_files(output_dir) - existing_media)
+        if on_video is not None and self.mode == "subprocess" and result["files"]:
+            on_video(result["files"])
+        return result
+
+    def _run_subprocess(self, args, url, output_template, download_archive, timeout) -> dict:
+        output_dir = Path(output_template).parent
+        existing_info = set(output_dir.glob("*.info.json"))
+
+        cmd = ["yt-dlp", *args, "-o", output_template]
+        if download_archive is not None:
+            cmd += ["--download-archive", str(download_archive)]
+        cmd.append(url)
+
+        process = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+        infos = []
+        if DUMP_JSON_ARGS.intersection(args):
+            # --dump-json prints one info JSON per line instead of writing files
+            for line in process.stdout.splitlines():
+                if line.startswith("{"):
+                    try:
+                        infos.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Error parsing yt-dlp JSON output: {e}")
+            return {"returncode": process.returncode, "infos": infos, "stderr": process.stderr or ""}
+
+        # Collect metadata from info.json files written by this run
+        for json_file in sorted(set(output_dir.glob("*.info.json")) - existing_info):
+            try:
+                with open(json_file, "r", encoding="utf-8") as f:
+                    infos.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Error reading metadata file {json_file}: {e}")
+
+        return {
+            "returncode": process.returncode,
+            "infos": infos,
+            "stderr": process.stderr or process.stdout or "",
+        }
+
+    def _run_inprocess(self, args, url, output_template, download_archive) -> dict:
+        from yt_dlp.utils import DownloadCancelled, DownloadError
+
+        ydl = self._get_ydl(args)
+        self._infos.clear()
+        self._errors.errors.clear()
+
+        # Point the shared instance at this account
+        ydl.params["outtmpl"]["default"] = output_template
+        ydl.params["download_archive"] = str(download_archive) if download_archive else None
+        ydl.archive = self._load_archive(download_archive)
+        ydl._num_downloads = 0
+        ydl._download_retcode = 0
+
+        try:
+            returncode = ydl.download([url])
+        except DownloadCancelled:
+            returncode = YTDLP_DOWNLOADS_STOPPED
+        except DownloadError as e:
+            if not self._errors.errors:
+                self._errors.errors.append(str(e))
+            returncode = 1
+
+        return {
+            "returncode": returncode,
+            "infos": list(self._infos),
+            "stderr": "\n".join(self._errors.errors),
+        }
+
+    def _get_ydl(self, args: list[str]):
+        """Return the long-lived YoutubeDL, rebuilding it only if the options change."""
+        if self._ydl is not None and self._ydl_args == tuple(args):
+            return self._ydl
+
+        try:
+            import yt_dlp
+        except ImportError:
+            raise ImportError("yt-dlp not found. Please install it: pip install yt-dlp")
+
+        self.close()
+        ydl_opts = yt_dlp.parse_options(list(args)).ydl_opts
+        # Info dicts come from the postprocessor, so don't print them too
+        ydl_opts["forcejson"] = False
+        self._errors = _ErrorCollector()
+        ydl_opts["logger"] = self._errors
+
+        self._ydl = yt_dlp.YoutubeDL(ydl_opts)
+        self._ydl.add_post_processor(_info_collector(self._infos, self), when="after_video")
+        self._ydl_args = tuple(args)
+        return self._ydl
+
+    @staticmethod
+    def _load_archive(download_archive: Optional[Path]) -> set:
+        if download_archive is None or not Path(download_archive).exists():
+            return set()
+        with open(download_archive, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    @staticmethod
+    def _media_files(output_dir: Path) -> set:
+        return {p for pattern in MEDIA_PATTERNS for p in output_dir.glob(pattern)}
+
+    def close(self) -> None:
+        """Release the in-process YoutubeDL and its HTTP connections."""
+        if self._ydl is not None:
+            self._ydl.close()
+            self._ydl = None
+            self._ydl_args = None
@@ -0,0 +1,686 @@
+"""
+Tests for the analysis modules.
+"""
+
+import pytest
+import os
+import sys
+import json
+
+# The analysis scripts import their siblings by module name
+ANALYSIS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "analysis")
+sys.path.insert(0, ANALYSIS_DIR)
+sys.path.insert(0, os.path.join(ANALYSIS_DIR, "content_analysis"))
+
+
+def write_tiktok_post(output_dir, video_id, views=10, influencer="Garden State"):
+    """Write a minimal yt-dlp .info.json for a TikTok post and return its path."""
+    platform_dir = output_dir / influencer / "tiktok"
+    platform_dir.mkdir(parents=True, exist_ok=True)
+    path = platform_dir / f"{video_id}.info.json"
+    path.write_text(json.dumps({"id": video_id, "timestamp": 1735787045, "view_count": views}))
+    return path
+
+
+def scripted_analyzer(answer, pack_tokens=0):
+    """A CombinedAnalyzer without a provider client, answering each prompt with answer(prompt)."""
+    import threading
+    from combined_analyzer import CombinedAnalyzer
+    from request_engine import RequestEngine
+
+    analyzer = CombinedAnalyzer.__new__(CombinedAnalyzer)
+    analyzer.provider = "claude"
+    analyzer.model_id = "test-model"
+    analyzer.cache = None
+    analyzer.pack_tokens = pack_tokens
+    analyzer.total_api_calls = 0
+    analyzer._calls_lock = threading.Lock()
+    analyzer.engine = RequestEngine(concurrency=1)
+    analyzer.prompts = []
+
+    def call_api(prompt, max_tokens=2048):
+        analyzer.prompts.append(prompt)
+        analyzer.total_api_calls += 1
+        return answer(prompt)
+
+    analyzer._call_api = call_api
+    return analyzer
+
+
+def short_post(video_id, title="Boardwalk fries ranked"):
+    """A content dict for a caption-only post."""
+    return {"video_id": video_id, "influencer": "a", "platform": "tiktok", "title": title}
+
+
+def packed_entry(video_id, sentiment_score=0.5):
+    """One post's object in a packed answer."""
+    return {
+        "video_id": video_id,
+        "semantic": {"main_topic": f"Topic {video_id}"},
+        "sentiment": {"sentiment_score": sentiment_score},
+    }
+
+
+def combined_answer(main_topic="Shore towns", sentiment_score=0.5):
+    """The JSON text of a combined semantic + sentiment answer."""
+    return json.dumps({
+        "semantic": {"main_topic": main_topic, "nj_relevance_score": 0.9},
+        "sentiment": {"sentiment_score": sentiment_score, "sentiment_label": "positive"},
+    })
+
+
+class TestManifest:
+    """Test the consolidation manifest."""
+
+    def consolidate(self, output_dir, manifest_path):
+        from consolidate import consolidate_all_posts
+        from manifest import Manifest
+
+        manifest = Manifest(str(manifest_path), str(output_dir))
+        posts = consolidate_all_posts(str(output_dir), workers=1, manifest=manifest)
+        manifest.save()
+        return manifest, posts
+
+    def test_first_run_parses_everything(self, tmp_path):
+        """Test that every file is new to an empty manifest."""
+        write_tiktok_post(tmp_path / "out", "1")
+        write_tiktok_post(tmp_path / "out", "2")
+
+        manifest, posts = self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+        assert manifest.changed
+        assert sorted(p.post_id for p in posts) == ["1", "2"]
+        assert len(manifest) == 2
+
+    def test_unchanged_run_plans_nothing(self, tmp_path):
+        """Test that a re-run with no changes parses nothing and changes nothing."""
+        from consolidate import scan_output
+        from manifest import Manifest
+
+        write_tiktok_post(tmp_path / "out", "1")
+        self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+
+        manifest = Manifest(str(tmp_path / "manifest.json"), str(tmp_path / "out"))
+        assert manifest.plan(scan_output(str(tmp_path / "out"))) == []
+        assert not manifest.changed and not manifest.dirty
+
+    def test_added_and_removed_files(self, tmp_path):
+        """Test that added files are parsed and removed files dropped."""
+        write_tiktok_post(tmp_path / "out", "1")
+        old = write_tiktok_post(tmp_path / "out", "2")
+        self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+
+        old.unlink()
+        write_tiktok_post(tmp_path / "out", "3")
+        manifest, posts = self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+        assert manifest.changed
+        assert sorted(p.post_id for p in posts) == ["1", "3"]
+        assert len(manifest) == 2
+
+    def test_touched_file_is_not_a_change(self, tmp_path):
+        """Test that a new mtime with the same contents keeps the posts and only updates the manifest."""
+        from consolidate import scan_output
+        from manifest import Manifest
+
+        path = write_tiktok_post(tmp_path / "out", "1")
+        self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        manifest = Manifest(str(tmp_path / "manifest.json"), str(tmp_path / "out"))
+        assert manifest.plan(scan_output(str(tmp_path / "out"))) == []
+        assert manifest.dirty and not manifest.changed
+        assert manifest.files[str(path)]["mtime_ns"] == 1_000_000_000
+
+    def test_edited_file_is_reparsed(self, tmp_path):
+        """Test that a file with new contents is parsed again and marks the manifest changed."""
+        path = write_tiktok_post(tmp_path / "out", "1", views=10)
+        self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+
+        write_tiktok_post(tmp_path / "out", "1", views=99)
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        manifest, posts = self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+        assert manifest.changed
+        assert [p.view_count for p in posts] == [99]
+
+    def test_reparsed_file_with_same_posts_is_not_a_change(self, tmp_path):
+        """Test that recording the same posts again leaves `changed` unset."""
+        from consolidate import scan_output
+        from manifest import Manifest
+        from tiktok_parser import parse_tiktok_files
+
+        write_tiktok_post(tmp_path / "out", "1")
+        self.consolidate(tmp_path / "out", tmp_path / "manifest.json")
+
+        manifest = Manifest(str(tmp_path / "manifest.json"), str(tmp_path / "out"))
+        for _, platform_dir, influencer, filenames in scan_output(str(tmp_path / "out")):
+            posts, _ = parse_tiktok_files(platform_dir, filenames, influencer)
+            manifest.record(platform_dir, filenames, influencer, posts)
+        assert not manifest.changed
+
+
+class TestConsolidate:
+    """Test scanning and parsing the output tree."""
+
+    def test_pool_parse_matches_serial_parse(self, tmp_path, monkeypatch):
+        """Test that parsing chunks on a process pool gives the same posts, in order, as one process."""
+        import consolidate
+
+        output_dir = tmp_path / "out"
+        for influencer in ("Garden State", "Pine Barrens"):
+            for i in range(5):
+                write_tiktok_post(output_dir, f"{influencer[0]}{i}", views=i, influencer=influencer)
+            youtube_dir = output_dir / influencer / "youtube"
+            youtube_dir.mkdir(parents=True)
+            for i in range(3):
+                (youtube_dir / f"y{i}.info.json").write_text(json.dumps({"id": f"y{i}", "view_count": i}))
+            instagram_dir = output_dir / influencer / "instagram"
+            instagram_dir.mkdir(parents=True)
+            for i in range(3):
+                node = {"id": f"ig{i}", "shortcode": f"s{i}", "taken_at_timestamp": 1735787045 + i}
+                (instagram_dir / f"2025-01-0{i + 1}_12-00-00_UTC.json").write_text(json.dumps({"node": node}))
+            (instagram_dir / "cursor.json").write_text(json.dumps({"last_post_date": "2025-01-03"}))
+
+        # Small chunks, so each directory is split across several tasks
+        monkeypatch.setattr(consolidate, "CHUNK_SIZE", 2)
+        tasks = consolidate.scan_output(str(output_dir))
+        assert all(len(task[3]) <= 2 for task in tasks)
+        assert [task[0] for task in tasks] == sorted((task[0] for task in tasks),
+                                                     key=list(consolidate.PLATFORM_PARSERS).index)
+
+        serial = consolidate.consolidate_all_posts(str(output_dir), workers=1)
+        pooled = consolidate.consolidate_all_posts(str(output_dir), workers=3)
+        assert len(serial) == 22
+        assert pooled == serial
+
+
+class TestPost:
+    """Test the parsed post record."""
+
+    def test_null_count_stays_none(self, tmp_path):
+        """Test that a null count is kept as None and a missing one is 0, as the CSVs always had."""
+        from instagram_parser import instagram_post_from_record
+        from tiktok_parser import parse_tiktok_files, parse_tiktok_post
+
+        path = tmp_path / "1.info.json"
+        path.write_text(json.dumps({"id": "1", "view_count": None, "like_count": 5}))
+        post = parse_tiktok_post(str(path))
+        assert post.view_count is None
+        assert (post.like_count, post.comment_count) == (5, 0)
+
+        # The same from a metadata.jsonl record
+        record = {
+            "id": "1", "timestamp": 1735787045, "view_count": None, "like_count": 5, "comment_count": None,
+            "repost_count": None, "webpage_url": "", "thumbnail": "", "channel_id": "",
+        }
+        (tmp_path / "metadata.jsonl").write_text(json.dumps(record) + "\n")
+        (post,), _ = parse_tiktok_files(str(tmp_path), ["1.info.json"], "Garden State")
+        assert (post.view_count, post.like_count, post.comment_count, post.repost_count) == (None, 5, None, None)
+
+        post = instagram_post_from_record(
+            {"id": "2", "date": "2025-01-02T03:04:05", "likes": None, "comments": 3,
+             "is_video": True, "video_view_count": None},
+            "2025-01-02_03-04-05_UTC.json",
+        )
+        assert (post.like_count, post.comment_count, post.video_view_count) == (None, 3, None)
+
+        # A key the record doesn't have is 0, as for a missing .info.json key
+        post = instagram_post_from_record({"id": "3", "date": "2025-01-02T03:04:05", "is_video": True}, "")
+        assert (post.like_count, post.comment_count, post.video_view_count) == (0, 0, 0)
+
+    def test_metadata_record_matches_info_json(self, tmp_path):
+        """Test that a post parsed from metadata.jsonl equals the one parsed from its .info.json."""
+        from tiktok_parser import parse_tiktok_files
+        from youtube_parser import parse_youtube_files
+
+        # The fields the scrapers copy from yt-dlp's info into metadata.jsonl
+        info = {
+            "id": "7", "title": "Pork roll or Taylor ham", "description": "", "upload_date": "20250101",
+            "duration": 30, "view_count": None, "like_count": 12, "comment_count": None,
+            "uploader": "gardenstate", "uploader_id": "gs", "channel": "Garden State", "channel_id": "c1",
+            "channel_url": None, "timestamp": 1735787045, "repost_count": None,
+            "webpage_url": "https://example.com/7", "thumbnail": "https://example.com/7.jpg",
+            "categories": ["Food"], "tags": [],
+        }
+        for platform, parse in (("tiktok", parse_tiktok_files), ("youtube", parse_youtube_files)):
+            platform_dir = tmp_path / platform
+            platform_dir.mkdir()
+            (platform_dir / "7.info.json").write_text(json.dumps(info))
+            from_info, _ = parse(str(platform_dir), ["7.info.json"], "Garden State")
+
+            (platform_dir / "metadata.jsonl").write_text(json.dumps(info) + "\n")
+            from_record, _ = parse(str(platform_dir), ["7.info.json"], "Garden State")
+
+            assert from_record == from_info
+            assert from_record[0].view_count is None and from_record[0].like_count == 12
+
+    def test_info_keys_match_full_parse(self, tmp_path, monkeypatch):
+        """Test that reading only the builder's keys gives the same post as decoding the whole file."""
+        import info_extract
+        from metadata_store import load_json
+        from youtube_parser import INFO_FIELDS, parse_youtube_post, youtube_post_from_info
+
+        path = tmp_path / "7.info.json"
+        path.write_text(json.dumps({
+            "id": "7", "title": "Pork roll or Taylor ham", "formats": [{"format_id": "18", "url": "u"}],
+            "thumbnails": [{"url": "t"}], "automatic_captions": {"en": [{"ext": "vtt"}]}, "heatmap": [],
+            "view_count": None, "timestamp": 1735787045, "categories": ["Food"], "tags": ["nj"],
+        }))
+        expected = youtube_post_from_info(load_json(str(path)), str(path))
+
+        assert parse_youtube_post(str(path)) == expected
+        assert set(info_extract.load_info(str(path), INFO_FIELDS)) == {
+            "id", "title", "view_count", "timestamp", "categories", "tags"}
+
+        # Without pysimdjson the whole file is decoded instead
+        monkeypatch.setattr(info_extract, "_parser", None)
+        assert parse_youtube_post(str(path)) == expected
+
+        path.write_text("[]")
+        with pytest.raises(ValueError):
+            info_extract.load_info(str(path), INFO_FIELDS)
+
+    def test_equal_posts_are_unhashable(self):
+        """Test that posts compare by value and can't be hashed."""
+        from post import Post
+
+        assert Post("tiktok", post_id="1") == Post("tiktok", post_id="1")
+        with pytest.raises(TypeError):
+            hash(Post("tiktok", post_id="1"))
+
+
+class TestCorpus:
+    """Test the Parquet corpus and the CSV fallback give the same table."""
+
+    def write_both(self, tmp_path):
+        """Write one set of posts as a Parquet corpus and as all_posts.csv, in separate directories."""
+        pytest.importorskip("pyarrow")
+        from consolidate import export_to_csv
+        from corpus import write_corpus
+        from post import Post
+
+        posts = [
+            Post("tiktok", influencer_name="a", post_id="1", title="Pork roll", description=None,
+                 view_count=None, like_count=5, comment_count=2, repost_count=1, upload_date="2025-01-02"),
+            Post("instagram", influencer_name="b", post_id="2", caption="Shore", like_count=7,
+                 comment_count=None, video_view_count=30, is_video=True, upload_date="2025-02-03"),
+            Post("youtube", influencer_name="a", post_id="3", title="Diners", view_count=100,
+                 like_count=None, comment_count=0, tags=["nj"], upload_date="2025-03-04"),
+        ]
+        write_corpus(posts, str(tmp_path / "parquet"))
+        (tmp_path / "csv").mkdir()
+        export_to_csv([p.to_dict() for p in posts], str(tmp_path / "csv" / "all_posts.csv"))
+        return tmp_path / "parquet", tmp_path / "csv"
+
+    def test_parquet_and_csv_load_the_same(self, tmp_path):
+        """Test that both sources give the same dtypes, '' for missing text and NaN for missing counts."""
+        import pandas as pd
+        from corpus import LIST_COLUMNS, load_posts
+
+        parquet_dir, csv_dir = self.write_both(tmp_path)
+        from_parquet = load_posts(str(parquet_dir)).sort_values("post_id", ignore_index=True)
+        from_csv = load_posts(str(csv_dir)).sort_values("post_id", ignore_index=True)
+
+        # Lists stay lists only in Parquet; the CSV has their string form
+        scalars = [c for c in from_parquet.columns if c not in LIST_COLUMNS]
+        assert list(from_parquet.columns) == list(from_csv.columns)
+        assert from_parquet[scalars].dtypes.to_dict() == from_csv[scalars].dtypes.to_dict()
+        pd.testing.assert_frame_equal(from_parquet[scalars], from_csv[scalars])
+
+        assert list(from_parquet["title"]) == ["Pork roll", "", "Diners"]
+        assert list(from_parquet["description"]) == ["", "", ""]
+        assert from_parquet["view_count"].isna().tolist() == [True, True, False]
+        assert from_parquet["comment_count"].isna().tolist() == [False, True, False]
+        assert list(from_parquet.loc[2, "tags"]) == ["nj"]
+
+    def test_platform_and_column_filters(self, tmp_path):
+        """Test that platforms= and columns= select the same rows and columns from both sources."""
+        from corpus import load_posts
+
+        for data_dir in self.write_both(tmp_path):
+            df = load_posts(str(data_dir), columns=["post_id", "like_count"], platforms=["tiktok", "youtube"])
+            assert list(df.columns) == ["post_id", "like_count"]
+            assert sorted(df["post_id"]) == ["1", "3"]
+
+        with pytest.raises(ValueError):
+            load_posts(str(data_dir), columns=["post_id", "followers"])
+
+
+class TestInfluencerMetrics:
+    """Test the per-influencer metrics."""
+
+    def test_posts_and_table_agree(self):
+        """Test that parsed posts and a posts_frame table give the same metrics."""
+        from consolidate import calculate_influencer_metrics, posts_frame
+        from post import Post
+
+        posts = [
+            Post("tiktok", influencer_name="a", post_id="1", view_count=100, like_count=10, repost_count=2),
+            Post("youtube", influencer_name="b", post_id="2", view_count=50, like_count=None, comment_count=3),
+            Post("instagram", influencer_name="a", post_id="3", like_count=5, video_view_count=None),
+            Post("tiktok", influencer_name="a", post_id="4", view_count=None, like_count=1),
+        ]
+        from_posts = calculate_influencer_metrics(posts)
+        assert from_posts == calculate_influencer_metrics(posts_frame(posts))
+
+        a = from_posts[0]
+        assert a["influencer_name"] == "a"
+        assert (a["total_posts"], a["tiktok_posts"], a["instagram_posts"]) == (3, 2, 1)
+        assert (a["total_views"], a["total_likes"], a["tiktok_reposts"]) == (100, 16, 2)
+
+
+class TestCorpusDB:
+    """Test rebuilding the corpus database when its result files change."""
+
+    def write_results(self, results_dir, video_id="1"):
+        path = results_dir / "ai_results" / "semantic" / "semantic_analysis_full.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps([{"video_id": video_id, "platform": "tiktok", "influencer": "a"}]))
+        return path
+
+    def test_current_until_results_change(self, tmp_path):
+        """Test that added, edited and removed result files make the database out of date."""
+        from corpus_db import build_corpus_db, corpus_db_current
+
+        data_dir, output_dir, results_dir = tmp_path / "data", tmp_path / "out", tmp_path / "analysis"
+        data_dir.mkdir()
+        output_dir.mkdir()
+        assert not corpus_db_current(str(data_dir), str(output_dir), str(results_dir))
+
+        build_corpus_db([], str(data_dir), str(output_dir), str(results_dir))
+        assert corpus_db_current(str(data_dir), str(output_dir), str(results_dir))
+
+        path = self.write_results(results_dir)
+        assert not corpus_db_current(str(data_dir), str(output_dir), str(results_dir))
+        build_corpus_db([], str(data_dir), str(output_dir), str(results_dir))
+        assert corpus_db_current(str(data_dir), str(output_dir), str(results_dir))
+
+        self.write_results(results_dir, video_id="22")
+        assert not corpus_db_current(str(data_dir), str(output_dir), str(results_dir))
+        build_corpus_db([], str(data_dir), str(output_dir), str(results_dir))
+
+        path.unlink()
+        assert not corpus_db_current(str(data_dir), str(output_dir), str(results_dir))
+
+
+class TestRequestEngine:
+    """Test the rate-limited request engine."""
+
+    def test_cached_items_skip_the_limiter(self):
+        """Test that cached items neither wait on nor use up the rate limits."""
+        import time
+        from request_engine import RequestEngine
+
+        # One request a minute: a second limited item would block for a minute
+        engine = RequestEngine(concurrency=2, rpm=1)
+        requested = []
+
+        def fn(item):
+            requested.append(item)
+            return f"answer {item}"
+
+        start = time.monotonic()
+        results = engine.map(fn, [1, 2, 3, 4], cached=lambda item: f"cached {item}" if item != 3 else None)
+        assert time.monotonic() - start < 5
+        assert results == ["cached 1", "cached 2", "answer 3", "cached 4"]
+        assert requested == [3]
+        assert len(engine.limiter._sent) == 1
+
+
+class TestCheckpointLog:
+    """Test the append-only analysis checkpoint log."""
+
+    def test_replay_keeps_last_record_per_key(self, tmp_path):
+        """Test that replay returns one record per key, the last logged, in first-logged order."""
+        from checkpoint_log import CheckpointLog
+
+        with CheckpointLog(tmp_path / "log.jsonl", fsync_every=1) as log:
+            log.append({"video_id": "a", "score": 1})
+            log.append({"video_id": "b", "score": 2})
+            log.append({"video_id": "a", "score": 3})
+
+        assert CheckpointLog(tmp_path / "log.jsonl").replay() == [
+            {"video_id": "a", "score": 3},
+            {"video_id": "b", "score": 2},
+        ]
+
+    def test_torn_final_line_is_dropped(self, tmp_path):
+        """Test that a partial last line is ignored on replay and cut before the next append."""
+        from checkpoint_log import CheckpointLog
+
+        path = tmp_path / "log.jsonl"
+        path.write_text('{"video_id": "a"}\n{"video_id": "b", "sco')
+        log = CheckpointLog(path)
+        assert log.replay() == [{"video_id": "a"}]
+
+        log.append({"video_id": "c"})
+        log.close()
+        assert path.read_text() == '{"video_id": "a"}\n{"video_id": "c"}\n'
+
+    def test_compact_writes_json_and_rewrites_log(self, tmp_path):
+        """Test that compaction writes the full JSON and leaves one log line per record."""
+        from checkpoint_log import CheckpointLog
+
+        log = CheckpointLog(tmp_path / "log.jsonl")
+        for score in range(3):
+            log.append({"video_id": "a", "score": score})
+        log.append({"video_id": "b", "score": 0})
+
+        records = log.compact(tmp_path / "full.json")
+        assert records == [{"video_id": "a", "score": 2}, {"video_id": "b", "score": 0}]
+        assert json.loads((tmp_path / "full.json").read_text()) == records
+        assert len((tmp_path / "log.jsonl").read_text().splitlines()) == 2
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_legacy_checkpoint_is_migrated(self, tmp_path):
+        """Test that an old <name>.json checkpoint seeds the log once and counts as completed."""
+        from checkpoint_log import count_completed, open_checkpoint
+
+        legacy = {"completed_ids": ["a", "b"], "results": [{"video_id": "a"}, {"video_id": "b"}]}
+        (tmp_path / "analysis_checkpoint.json").write_text(json.dumps(legacy))
+        assert count_completed(str(tmp_path), "analysis_checkpoint") == 2
+
+        log = open_checkpoint(str(tmp_path), "analysis_checkpoint")
+        assert log.replay() == legacy["results"]
+
+        # The log now exists, so the legacy file isn't read again
+        log.append({"video_id": "c"})
+        log.close()
+        log = open_checkpoint(str(tmp_path), "analysis_checkpoint")
+        assert [r["video_id"] for r in log.replay()] == ["a", "b", "c"]
+        assert count_completed(str(tmp_path), "analysis_checkpoint") == 3
+
+
+class TestResponseCache:
+    """Test the persistent LLM response cache."""
+
+    def test_key_covers_provider_model_template_and_prompt(self):
+        """Test that changing any part of a request changes its key."""
+        from response_cache import cache_key
+
+        key = cache_key("claude", "model-a", "semantic:1", "prompt")
+        assert key == cache_key("claude", "model-a", "semantic:1", "prompt")
+        assert len({
+            key,
+            cache_key("gemini", "model-a", "semantic:1", "prompt"),
+            cache_key("claude", "model-b", "semantic:1", "prompt"),
+            cache_key("claude", "model-a", "semantic:2", "prompt"),
+            cache_key("claude", "model-a", "semantic:1", "prompt!"),
+        }) == 5
+
+    def test_hits_and_misses_per_template(self, tmp_path):
+        """Test that lookups are counted per template, and peeks with count=False not at all."""
+        from response_cache import ResponseCache
+
+        cache = ResponseCache(tmp_path / "responses.db")
+        assert cache.get("claude", "m", "semantic:1", "p") is None
+        cache.put("claude", "m", "semantic:1", "p", "answer")
+        assert cache.get("claude", "m", "semantic:1", "p") == "answer"
+        assert cache.get("claude", "m", "sentiment:1", "p") is None
+        assert cache.get("claude", "m", "semantic:1", "p", count=False) == "answer"
+
+        assert cache.stats() == {
+            "semantic:1": {"hits": 1, "misses": 1},
+            "sentiment:1": {"hits": 0, "misses": 1},
+        }
+        cache.close()
+
+        # Responses outlive the process; counts are per run
+        cache = ResponseCache(tmp_path / "responses.db")
+        assert cache.get("claude", "m", "semantic:1", "p") == "answer"
+        assert cache.stats() == {"semantic:1": {"hits": 1, "misses": 0}}
+        cache.close()
+
+    def test_least_recently_used_is_evicted(self, tmp_path, monkeypatch):
+        """Test that going past max_bytes drops the least recently used responses first."""
+        import itertools
+        import response_cache
+        from response_cache import ResponseCache
+
+        clock = itertools.count(1)
+        monkeypatch.setattr(response_cache.time, "time", lambda: next(clock))
+
+        cache = ResponseCache(tmp_path / "responses.db", max_bytes=250)
+        cache.put("claude", "m", "t", "a", "x" * 100)
+        cache.put("claude", "m", "t", "b", "x" * 100)
+        assert cache.get("claude", "m", "t", "a") is not None
+
+        cache.put("claude", "m", "t", "c", "x" * 100)
+        assert cache.get("claude", "m", "t", "b", count=False) is None
+        assert cache.get("claude", "m", "t", "a", count=False) is not None
+        assert cache.get("claude", "m", "t", "c", count=False) is not None
+        cache.close()
+
+
+class TestCombinedAnalyzer:
+    """Test the combined semantic + sentiment analyzer."""
+
+    def test_analyze_keeps_provider_text(self):
+        """Test that the analysis keeps the provider's own answer as raw_response."""
+        answer = "```json\n" + combined_answer() + "\n```"
+        analysis, sentiment = scripted_analyzer(lambda prompt: answer).analyze("1", "a", "tiktok", title="Hi")
+
+        assert analysis.main_topic == "Shore towns"
+        assert analysis.raw_response == answer
+        assert sentiment.sentiment_score == 0.5
+
+    def test_analyze_records_non_numeric_score_as_error(self):
+        """Test that a null score gives error results instead of raising."""
+        analyzer = scripted_analyzer(lambda prompt: combined_answer(sentiment_score=None))
+        analysis, sentiment = analyzer.analyze("1", "a", "tiktok", title="Hi")
+
+        assert analysis.main_topic == "Parse Error"
+        assert sentiment.sentiment_label == "error"
+
+    def test_batch_exports_both_halves(self, tmp_path):
+        """Test that a batch writes the semantic and sentiment exports without a second analyzer."""
+        analyzer = scripted_analyzer(lambda prompt: combined_answer())
+        content = [{"video_id": "1", "influencer": "a", "platform": "tiktok", "title": "Hi"}]
+        analyses, sentiments = analyzer.batch_analyze(content, str(tmp_path))
+
+        assert [a.video_id for a in analyses] == [s.video_id for s in sentiments] == ["1"]
+        assert (tmp_path / "semantic" / "semantic_analysis_full.json").exists()
+        assert (tmp_path / "sentiment" / "sentiment_summary.csv").exists()
+        assert (tmp_path / "sentiment" / "sentiment_aggregate_stats.json").exists()
+
+
+class TestPacking:
+    """Test packing short posts into one combined request."""
+
+    def sizes(self):
+        from combined_analyzer import PACKED_PROMPT, _packed_post
+        from request_engine import estimate_tokens
+
+        return estimate_tokens(PACKED_PROMPT.format(posts="")), estimate_tokens(_packed_post(short_post("1")))
+
+    def test_packs_fill_up_to_the_token_budget(self):
+        """Test that a pack takes posts while its prompt fits pack_tokens, and a lone post goes alone."""
+        from combined_analyzer import pack_content
+
+        overhead, size = self.sizes()
+        posts = [short_post(str(i)) for i in range(1, 6)]
+
+        packs, singles = pack_content(posts, pack_tokens=overhead + 2 * size, post_tokens=size)
+        assert [[c["video_id"] for c in pack] for pack in packs] == [["1", "2"], ["3", "4"]]
+        assert [c["video_id"] for c in singles] == ["5"]
+
+        # One token short of two posts: every pack would hold one, so nothing is packed
+        packs, singles = pack_content(posts, pack_tokens=overhead + 2 * size - 1, post_tokens=size)
+        assert packs == []
+        assert len(singles) == 5
+
+    def test_max_posts_and_long_posts(self):
+        """Test that packs hold at most max_posts posts and long posts are sent on their own."""
+        from combined_analyzer import pack_content
+
+        overhead, size = self.sizes()
+        posts = [short_post(str(i)) for i in range(1, 6)]
+        posts.insert(2, short_post("long", title="x" * 4000))
+
+        packs, singles = pack_content(posts, pack_tokens=100000, max_posts=3, post_tokens=size)
+        assert [[c["video_id"] for c in pack] for pack in packs] == [["1", "2", "3"], ["4", "5"]]
+        assert [c["video_id"] for c in singles] == ["long"]
+
+    def test_packed_response_skips_missing_duplicate_and_malformed_entries(self):
+        """Test that only well-formed entries for the pack's posts, each taken once, are parsed."""
+        from combined_analyzer import parse_packed_response
+
+        pack = [short_post(str(i)) for i in range(1, 6)]
+        answer = json.dumps([
+            packed_entry("1"),
+            packed_entry("1", sentiment_score=0.9),  # repeated: the first one counts
+            {"video_id": "2", "semantic": "not an object", "sentiment": {}},
+            packed_entry("3", sentiment_score=None),  # not a number
+            packed_entry("99"),  # not in the pack
+            "not an object",
+            packed_entry(5),  # ids are matched as text
+        ])  # no entry for 4
+
+        results = parse_packed_response(pack, "Here you go:\n```json\n" + answer + "\n```")
+        assert sorted(results) == ["1", "5"]
+        assert results["1"][1].sentiment_score == 0.5
+        assert results["5"][0].main_topic == "Topic 5"
+        assert results["1"][0].raw_response.startswith("Here you go")
+
+    def test_packed_response_must_be_an_array(self):
+        """Test that an answer that isn't a JSON array raises ValueError."""
+        from combined_analyzer import parse_packed_response
+
+        with pytest.raises(ValueError):
+            parse_packed_response([short_post("1")], json.dumps(packed_entry("1")))
+        with pytest.raises(ValueError):
+            parse_packed_response([short_post("1")], "[not json")
+
+    def test_combined_response(self):
+        """Test that a combined answer is split into its halves, and a half missing raises ValueError."""
+        from combined_analyzer import parse_combined_response
+
+        analysis, sentiment = parse_combined_response("1", "a", "tiktok", "Sure!\n" + combined_answer())
+        assert (analysis.video_id, analysis.influencer, analysis.platform) == ("1", "a", "tiktok")
+        assert analysis.main_topic == "Shore towns"
+        assert sentiment.sentiment_score == 0.5
+
+        with pytest.raises(ValueError):
+            parse_combined_response("1", "a", "tiktok", json.dumps({"semantic": {}}))
+        with pytest.raises(ValueError):
+            parse_combined_response("1", "a", "tiktok", "no JSON here")
+
+    def test_posts_missing_from_a_packed_answer_are_sent_alone(self, tmp_path):
+        """Test that packed posts the answer missed fall back to one request each."""
+        from combined_analyzer import PACK_TOKENS
+
+        def answer(prompt):
+            if "POSTS TO ANALYZE" in prompt:
+                return json.dumps([packed_entry("1"), {"video_id": "2", "semantic": None}])
+            return combined_answer(main_topic="Alone")
+
+        analyzer = scripted_analyzer(answer, pack_tokens=PACK_TOKENS)
+        content = [short_post(str(i)) for i in range(1, 4)]
+        analyses, sentiments = analyzer.batch_analyze(content, str(tmp_path))
+
+        assert len(analyzer.prompts) == 3  # the pack, then posts 2 and 3
+        assert sorted(a.video_id for a in analyses) == ["1", "2", "3"]
+        assert {a.video_id: a.main_topic for a in analyses} == {"1": "Topic 1", "2": "Alone", "3": "Alone"}
+        assert len(sentiments) == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])